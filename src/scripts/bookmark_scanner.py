@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Scan PBIR bookmarks for distinct visual formatting states captured in bookmark exploration state."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from output_writer import open_output
+from pbir_scanner import find_report_roots, flatten_visual_objects, repo_path, report_label, signature_digest
+from theme_cascade import split_card
+
+BOOKMARK_FIELDNAMES = [
+    "report_path",
+    "state_id",
+    "visual_type",
+    "operation",
+    "attribute_key",
+    "attribute_name",
+    "attribute_value",
+    "value_type",
+    "bookmarks",
+    "visuals",
+    "first_bookmark",
+    "source_path",
+]
+
+# singleVisual keys holding card/property state, mapped onto the visual.json blocks they mirror.
+STATE_BLOCKS = {"objects": "objects", "vcObjects": "visualContainerObjects"}
+
+# Slicer selections ride along in ``general.filter``; they are data state, not formatting.
+SKIP_PROPERTIES = {"filter"}
+
+
+def iter_bookmark_files(report_root: Path) -> Iterator[Path]:
+    yield from sorted((report_root / "definition" / "bookmarks").glob("*.bookmark.json"))
+
+
+@dataclass
+class BookmarkState:
+    """One distinct formatting state: a visual type plus its flattened (operation, property) values."""
+
+    report_path: str
+    visual_type: str
+    properties: List[Tuple[str, str, str, str, str]]
+    first_bookmark: str
+    source_path: str
+    bookmarks: set = field(default_factory=set)
+    visuals: set = field(default_factory=set)
+
+
+def formatting_properties(single_visual: Dict[str, object]) -> List[Tuple[str, str, str, str, str]]:
+    """Flatten bookmark ``merge``/``remove`` card state to (operation, key, name, value, type) tuples."""
+    properties: List[Tuple[str, str, str, str, str]] = []
+    for state_key, block in STATE_BLOCKS.items():
+        operations = single_visual.get(state_key)
+        if not isinstance(operations, dict):
+            continue
+        for operation, cards in operations.items():
+            if not isinstance(cards, dict):
+                continue
+            for key, name, value, value_type in flatten_visual_objects({block: cards}):
+                if split_card(key)[1].split(".", 1)[0] not in SKIP_PROPERTIES:
+                    properties.append((operation, key, name, value, value_type))
+    properties.sort()
+    return properties
+
+
+class BookmarkStateIndex:
+    """Distinct formatting states across bookmarks, hashing subtrees so repeats are parsed and flattened once.
+
+    Identical bookmark files are recognised by content hash before decoding, and identical
+    ``singleVisual`` object subtrees (common across near-duplicate bookmarks) by the hash of
+    their canonical JSON, so each distinct subtree is flattened once however many bookmarks
+    carry it.
+    """
+
+    def __init__(self) -> None:
+        self.states: Dict[str, BookmarkState] = {}
+        self._files: Dict[str, Tuple[str, List[Tuple[str, str, List[Tuple[str, str, str, str, str]]]]]] = {}
+        self._subtrees: Dict[str, List[Tuple[str, str, str, str, str]]] = {}
+        self.files_scanned = 0
+        self.duplicate_files = 0
+        self.subtrees_seen = 0
+        self.duplicate_subtrees = 0
+
+    def add_file(self, path: Path, report_path: str, source_path: str) -> None:
+        try:
+            raw = path.read_bytes()
+        except OSError:
+            return
+        self.files_scanned += 1
+        # Cached by content alone: a copy in another report reuses the flattening, but its
+        # states are still keyed (and attributed) per report below.
+        file_digest = hashlib.sha256(raw).hexdigest()
+        cached = self._files.get(file_digest)
+        if cached is None:
+            try:
+                bookmark = json.loads(raw.decode("utf-8-sig"))
+            except (UnicodeDecodeError, ValueError):
+                return
+            name = bookmark.get("displayName") or bookmark.get("name") if isinstance(bookmark, dict) else None
+            cached = self._files[file_digest] = (str(name or ""), list(self._file_visuals(bookmark)))
+        else:
+            self.duplicate_files += 1
+        display_name, visuals = cached
+        display_name = display_name or Path(source_path).name
+        for visual_id, visual_type, properties in visuals:
+            digest = signature_digest([(report_path, visual_type)] + [(f"{op}:{key}", value) for op, key, _, value, _ in properties])
+            state = self.states.get(digest)
+            if state is None:
+                state = self.states[digest] = BookmarkState(report_path, visual_type, properties, display_name, source_path)
+            state.bookmarks.add(source_path)
+            state.visuals.add(visual_id)
+
+    def _file_visuals(self, bookmark: object) -> Iterator[Tuple[str, str, List[Tuple[str, str, str, str, str]]]]:
+        exploration = bookmark.get("explorationState") if isinstance(bookmark, dict) else None
+        sections = exploration.get("sections") if isinstance(exploration, dict) else None
+        for section in (sections.values() if isinstance(sections, dict) else []):
+            containers = section.get("visualContainers") if isinstance(section, dict) else None
+            for visual_id, container in (containers.items() if isinstance(containers, dict) else []):
+                single_visual = container.get("singleVisual") if isinstance(container, dict) else None
+                if not isinstance(single_visual, dict):
+                    continue
+                visual_type = str(single_visual.get("visualType") or "")
+                subtree = {key: single_visual[key] for key in STATE_BLOCKS if key in single_visual}
+                self.subtrees_seen += 1
+                subtree_digest = hashlib.sha1(
+                    json.dumps([visual_type, subtree], sort_keys=True, separators=(",", ":")).encode("utf-8")
+                ).hexdigest()
+                properties = self._subtrees.get(subtree_digest)
+                if properties is None:
+                    properties = self._subtrees[subtree_digest] = formatting_properties(single_visual)
+                else:
+                    self.duplicate_subtrees += 1
+                if properties:
+                    yield visual_id, visual_type, properties
+
+    def rows(self) -> Iterator[Dict[str, str]]:
+        for digest, state in sorted(self.states.items(), key=lambda item: (item[1].report_path, item[1].visual_type, item[0])):
+            for operation, key, name, value, value_type in state.properties:
+                yield {
+                    "report_path": state.report_path,
+                    "state_id": digest[:12],
+                    "visual_type": state.visual_type,
+                    "operation": operation,
+                    "attribute_key": key,
+                    "attribute_name": name,
+                    "attribute_value": value,
+                    "value_type": value_type,
+                    "bookmarks": str(len(state.bookmarks)),
+                    "visuals": str(len(state.visuals)),
+                    "first_bookmark": state.first_bookmark,
+                    "source_path": state.source_path,
+                }
+
+
+def bookmark_files(paths: Iterable[Path]) -> List[Path]:
+    return [path for report_root in find_report_roots(paths) for path in iter_bookmark_files(report_root)]
+
+
+def scan_bookmarks(paths: Iterable[Path], repo_root: Path) -> BookmarkStateIndex:
+    """Decode each report's bookmarks one at a time, keeping only their distinct formatting states."""
+    repo_root = repo_root.resolve()
+    index = BookmarkStateIndex()
+    for report_root in find_report_roots(paths):
+        report_path = report_label(report_root, repo_root)
+        for path in iter_bookmark_files(report_root):
+            index.add_file(path, report_path, repo_path(path, repo_root))
+    return index
+
+
+def write_bookmark_csv(rows: Iterable[Dict[str, str]], output_path: Path) -> int:
+    count = 0
+    with open_output(output_path, newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=BOOKMARK_FIELDNAMES)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Scan PBIR bookmarks into distinct visual formatting states.")
+    parser.add_argument("reports", nargs="+", type=Path, help="Report folders or directories containing reports.")
+    parser.add_argument("--repo-root", type=Path, default=Path(__file__).resolve().parents[2])
+    parser.add_argument("--output", type=Path, default=Path("reports/datasets/bookmark_formatting.csv"))
+    args = parser.parse_args(argv)
+
+    index = scan_bookmarks(args.reports, args.repo_root)
+    count = write_bookmark_csv(index.rows(), args.output)
+    print(
+        f"Scanned {index.files_scanned} bookmark(s) ({index.duplicate_files} duplicate file(s), "
+        f"{index.duplicate_subtrees} of {index.subtrees_seen} visual subtree(s) repeated); "
+        f"wrote {len(index.states)} distinct state(s) as {count} row(s) to {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
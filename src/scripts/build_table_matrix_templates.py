@@ -8,7 +8,11 @@ import csv
 import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Sequence
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from output_writer import open_output, write_text_if_changed
+from pipeline_metrics import MetricsLog, add_metrics_arguments, metrics_log_from_args, record_rows
+from theme_schema import DEFAULT_CACHE_DIR, render_schema_section, schema_summary_line, validate_theme
 
 
 def solid(color: str) -> Dict[str, Dict[str, str]]:
@@ -28,6 +32,7 @@ def matrix_properties(
     subtotal_position: str,
     expand_buttons: bool,
     row_header_weight: str,
+    font_family: str = "Calibri",
 ) -> Dict[str, object]:
     return {
         "*": {
@@ -45,7 +50,7 @@ def matrix_properties(
             ],
             "columnHeaders": [
                 {
-                    "fontFamily": "Calibri",
+                    "fontFamily": font_family,
                     "fontSize": 13 if name in {"Teal Summit Totals", "Slate Beacon Matrix", "Frosted Harbor Cells"} else 12,
                     "fontColor": solid(header_font),
                     "backColor": solid(header_bg),
@@ -56,7 +61,7 @@ def matrix_properties(
             ],
             "rowHeaders": [
                 {
-                    "fontFamily": "Calibri",
+                    "fontFamily": font_family,
                     "fontSize": 12,
                     "fontColor": solid(highlight_font),
                     "outline": row_header_weight,
@@ -65,7 +70,7 @@ def matrix_properties(
             ],
             "values": [
                 {
-                    "fontFamily": "Calibri",
+                    "fontFamily": font_family,
                     "fontSize": 12,
                     "fontColor": solid(value_font),
                     "wrapText": True,
@@ -84,7 +89,7 @@ def matrix_properties(
                     "id": "Row",
                     "applyToHeaders": True,
                     "rowSubtotalsPosition": subtotal_position,
-                    "fontFamily": "Calibri",
+                    "fontFamily": font_family,
                     "fontSize": 12,
                     "fontColor": solid(highlight_font),
                     "backColor": solid(subtotal_bg),
@@ -92,7 +97,7 @@ def matrix_properties(
                 {
                     "id": "Column",
                     "applyToHeaders": True,
-                    "fontFamily": "Calibri",
+                    "fontFamily": font_family,
                     "fontSize": 12,
                     "fontColor": solid(highlight_font),
                     "backColor": solid(subtotal_bg),
@@ -101,7 +106,7 @@ def matrix_properties(
             "totals": [
                 {
                     "show": True,
-                    "fontFamily": "Calibri",
+                    "fontFamily": font_family,
                     "fontSize": 12,
                     "fontColor": solid(highlight_font),
                     "labelColor": solid(highlight_font),
@@ -123,6 +128,7 @@ def table_properties(
     show_background: bool,
     totals_background: str,
     totals_font: str,
+    font_family: str = "Calibri",
 ) -> Dict[str, object]:
     return {
         "*": {
@@ -140,7 +146,7 @@ def table_properties(
             ],
             "columnHeaders": [
                 {
-                    "fontFamily": "Calibri",
+                    "fontFamily": font_family,
                     "fontSize": 12,
                     "fontColor": solid(header_font),
                     "backColor": solid(header_bg),
@@ -150,7 +156,7 @@ def table_properties(
             ],
             "values": [
                 {
-                    "fontFamily": "Calibri",
+                    "fontFamily": font_family,
                     "fontSize": 11,
                     "fontColor": solid(value_font),
                     "backColor": solid(banding_color),
@@ -166,7 +172,7 @@ def table_properties(
             ],
             "total": [
                 {
-                    "fontFamily": "Calibri",
+                    "fontFamily": font_family,
                     "fontSize": 12,
                     "fontColor": solid(totals_font),
                     "backColor": solid(totals_background),
@@ -454,17 +460,17 @@ def build_templates(schema: str) -> Dict[str, object]:
     }
 
 
-def flatten_properties(prefix: str, value: object, rows: List[Dict[str, str]]) -> None:
-    if isinstance(value, dict):
-        for key, child in value.items():
-            new_prefix = f"{prefix}.{key}" if prefix else key
-            flatten_properties(new_prefix, child, rows)
-    elif isinstance(value, list):
-        for idx, item in enumerate(value):
-            new_prefix = f"{prefix}[{idx}]"
-            flatten_properties(new_prefix, item, rows)
-    else:
-        rows.append({"path": prefix, "value": json.dumps(value)})
+def iter_property_leaves(value: object, prefix: str = "") -> Iterator[Tuple[str, object]]:
+    """Yield ``(path, value)`` for every scalar leaf in document order, paths as ``a.b[0].c``."""
+    stack: List[Tuple[str, object]] = [(prefix, value)]
+    while stack:
+        path, node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend((f"{path}.{key}" if path else key, child) for key, child in reversed(list(node.items())))
+        elif isinstance(node, list):
+            stack.extend((f"{path}[{idx}]", item) for idx, item in reversed(list(enumerate(node))))
+        else:
+            yield path, node
 
 
 def write_outputs(
@@ -478,79 +484,93 @@ def write_outputs(
 ) -> None:
     schema = schema_file.read_text(encoding="utf-8").splitlines()[0] if schema_file.exists() else ""
     data = build_templates(schema)
-    templates: List[TemplateSpec] = data["templates"]
-    visual_styles = data["visual_styles"]
+    write_template_set(
+        repo_root,
+        schema_file,
+        data["templates"],
+        manifest_json,
+        manifest_md,
+        template_json,
+        change_log_csv,
+        validation_md,
+    )
 
-    template_payload = {
-        "$schema": "https://github.com/microsoft/powerbi-desktop-samples/blob/main/Report%20Theme%20JSON%20Schema/reportThemeSchema-2.114.json",
-        "name": "Rainwater TableMatrix Templates",
-        "visualStyles": visual_styles,
-    }
-    template_json.parent.mkdir(parents=True, exist_ok=True)
-    template_json.write_text(json.dumps(template_payload, indent=2), encoding="utf-8")
-
-    manifest_json.parent.mkdir(parents=True, exist_ok=True)
-    manifest = [
-        {
-            "visual_type": t.visual_type,
-            "style_variant": t.style_variant,
-            "template_name": t.name,
-            "description": t.description,
-            "features": t.features,
-        }
-        for t in templates
-    ]
-    manifest_json.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
 
+def write_template_set(
+    repo_root: Path,
+    schema_file: Path,
+    templates: Sequence[TemplateSpec],
+    manifest_json: Path,
+    manifest_md: Path,
+    template_json: Path,
+    change_log_csv: Path,
+    validation_md: Path,
+    theme_name: str = "Rainwater TableMatrix Templates",
+    font_family: str = "Calibri",
+    family: str = "Rainwater",
+) -> int:
+    """Write one family's template theme, manifest, change log and validation report; returns change rows.
+
+    Each template's properties are walked once: every leaf goes straight to the change log and
+    is checked against the family font on the way, while manifest entries are collected alongside.
+    """
+    visual_styles: Dict[str, Dict[str, object]] = {}
+    manifest: List[Dict[str, object]] = []
     lines = [
         "# Table & Matrix Template Manifest",
         "",
         "Creative naming follows the three-word brief and reflects the look and feel captured from catalog insights.",
     ]
-    for template in templates:
-        lines.append("")
-        lines.append(f"## {template.name}")
-        lines.append("")
-        lines.append(f"- Visual type: `{template.visual_type}` ({template.style_variant})")
-        lines.append(f"- Description: {template.description}")
-        lines.append("- Highlights:")
-        for feature in template.features:
-            lines.append(f"  - {feature}")
-    manifest_md.parent.mkdir(parents=True, exist_ok=True)
-    manifest_md.write_text("\n".join(lines), encoding="utf-8")
-
-    change_log_csv.parent.mkdir(parents=True, exist_ok=True)
-    change_rows: List[Dict[str, str]] = []
-    for template in templates:
-        entries: List[Dict[str, str]] = []
-        flatten_properties("", template.properties, entries)
-        for entry in entries:
-            change_rows.append(
+    font_issues: List[str] = []
+    change_count = 0
+    with open_output(change_log_csv, newline="") as handle:
+        fieldnames = ["template_name", "visual_type", "style_variant", "property_path", "value", "note"]
+        writer = csv.DictWriter(handle, fieldnames=fieldnames)
+        writer.writeheader()
+        for template in templates:
+            visual_styles.setdefault(template.visual_type, {})[template.name] = template.properties
+            manifest.append(
                 {
-                    "template_name": template.name,
                     "visual_type": template.visual_type,
                     "style_variant": template.style_variant,
-                    "property_path": entry["path"],
-                    "value": entry["value"],
-                    "note": "Derived from curated template design",
+                    "template_name": template.name,
+                    "description": template.description,
+                    "features": template.features,
                 }
             )
-    with change_log_csv.open("w", encoding="utf-8", newline="") as handle:
-        fieldnames = ["template_name", "visual_type", "style_variant", "property_path", "value", "note"]
-        writer = csv.DictWriter(handle, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(change_rows)
-
-    # Validation
-    def font_check(properties: Dict[str, object]) -> List[str]:
-        messages: List[str] = []
-        entries: List[Dict[str, str]] = []
-        flatten_properties("", properties, entries)
-        for entry in entries:
-            if entry["path"].endswith("fontFamily"):
-                if json.loads(entry["value"]) != "Calibri":
-                    messages.append(entry["path"])
-        return messages
+            lines.append("")
+            lines.append(f"## {template.name}")
+            lines.append("")
+            lines.append(f"- Visual type: `{template.visual_type}` ({template.style_variant})")
+            lines.append(f"- Description: {template.description}")
+            lines.append("- Highlights:")
+            for feature in template.features:
+                lines.append(f"  - {feature}")
+
+            for path, value in iter_property_leaves(template.properties):
+                writer.writerow(
+                    {
+                        "template_name": template.name,
+                        "visual_type": template.visual_type,
+                        "style_variant": template.style_variant,
+                        "property_path": path,
+                        "value": json.dumps(value),
+                        "note": "Derived from curated template design",
+                    }
+                )
+                change_count += 1
+                if path.endswith("fontFamily") and value != font_family:
+                    font_issues.append(f"{template.name}: {path}")
+    record_rows(change_count)
+
+    template_payload = {
+        "$schema": "https://github.com/microsoft/powerbi-desktop-samples/blob/main/Report%20Theme%20JSON%20Schema/reportThemeSchema-2.114.json",
+        "name": theme_name,
+        "visualStyles": visual_styles,
+    }
+    write_text_if_changed(template_json, json.dumps(template_payload, indent=2))
+    write_text_if_changed(manifest_json, json.dumps(manifest, indent=2))
+    write_text_if_changed(manifest_md, "\n".join(lines))
 
     validation_lines = [
         "# Table & Matrix Template Validation",
@@ -560,38 +580,44 @@ def write_outputs(
         f"- Templates generated: {len(templates)}",
         "- Schema reference: reportThemeSchema-2.114.json",
     ]
-    font_issues: List[str] = []
-    for template in templates:
-        issues = font_check(template.properties)
-        if issues:
-            font_issues.extend(f"{template.name}: {issue}" for issue in issues)
+    schema_errors = validate_theme(template_payload, schema_file, repo_root / DEFAULT_CACHE_DIR)
+    validation_lines.append(schema_summary_line(schema_errors, schema_file))
     validation_lines.append(f"- Font verification issues: {len(font_issues)}")
     validation_lines.append("")
     validation_lines.append("## Checks Performed")
     validation_lines.append("")
-    validation_lines.append("- Ensured each template uses Calibri for all fontFamily properties.")
+    validation_lines.append(f"- Ensured each template uses {font_family} for all fontFamily properties.")
     validation_lines.append("- Flattened property trees to confirm structured paths for change logging.")
-    validation_lines.append("- Recorded palette selections to align with Rainwater theme colors.")
+    validation_lines.append(f"- Recorded palette selections to align with {family} theme colors.")
+    validation_lines.append("- Validated the template theme payload against the report theme schema.")
     validation_lines.append("")
     if font_issues:
         validation_lines.append("## Font Issues")
         validation_lines.extend(f"- {issue}" for issue in font_issues)
     else:
-        validation_lines.append("All font families resolved to Calibri as required.")
-    validation_md.parent.mkdir(parents=True, exist_ok=True)
-    validation_md.write_text("\n".join(validation_lines), encoding="utf-8")
+        validation_lines.append(f"All font families resolved to {font_family} as required.")
+    if schema_errors:
+        validation_lines.append("")
+        validation_lines.extend(render_schema_section(schema_errors))
+    write_text_if_changed(validation_md, "\n".join(validation_lines))
+    return change_count
 
 
-def main(argv: Sequence[str] | None = None) -> None:
-    parser = argparse.ArgumentParser(description="Build table/matrix templates and related artifacts.")
-    parser.add_argument("--prompt", default="docs/prompts/table_matrix_template_creation.xml", type=Path)
-    args = parser.parse_args(argv)
+@dataclass
+class BuildConfig:
+    repo_root: Path
+    schema_file: Path
+    manifest_json: Path
+    manifest_md: Path
+    template_json: Path
+    change_log_csv: Path
+    validation_md: Path
 
-    prompt_path: Path = args.prompt.resolve()
-    tree = None
-    try:
-        import xml.etree.ElementTree as ET
 
+def load_config(prompt_path: Path) -> BuildConfig:
+    import xml.etree.ElementTree as ET
+
+    try:
         tree = ET.parse(prompt_path)
     except FileNotFoundError:
         raise SystemExit("Prompt file not found.")
@@ -605,23 +631,49 @@ def main(argv: Sequence[str] | None = None) -> None:
         return node.text.strip()
 
     repo_root = prompt_path.parents[1]
-    schema_file = repo_root / text("./context/schemaFile")
-    manifest_json = repo_root / text("./outputs/path[1]")
-    manifest_md = repo_root / text("./outputs/path[2]")
-    template_json = repo_root / text("./outputs/path[3]")
-    change_log_csv = repo_root / text("./outputs/path[4]")
-    validation_md = repo_root / text("./outputs/path[5]")
-
-    write_outputs(
+    return BuildConfig(
         repo_root=repo_root,
-        schema_file=schema_file,
-        manifest_json=manifest_json,
-        manifest_md=manifest_md,
-        template_json=template_json,
-        change_log_csv=change_log_csv,
-        validation_md=validation_md,
+        schema_file=repo_root / text("./context/schemaFile"),
+        manifest_json=repo_root / text("./outputs/path[1]"),
+        manifest_md=repo_root / text("./outputs/path[2]"),
+        template_json=repo_root / text("./outputs/path[3]"),
+        change_log_csv=repo_root / text("./outputs/path[4]"),
+        validation_md=repo_root / text("./outputs/path[5]"),
     )
 
 
+def run_build(config: BuildConfig, metrics: MetricsLog | None = None) -> None:
+    metrics = metrics or MetricsLog()
+    metrics.run(
+        "write_outputs",
+        write_outputs,
+        config.repo_root,
+        config.schema_file,
+        config.manifest_json,
+        config.manifest_md,
+        config.template_json,
+        config.change_log_csv,
+        config.validation_md,
+        outputs=[
+            config.manifest_json,
+            config.manifest_md,
+            config.template_json,
+            config.change_log_csv,
+            config.validation_md,
+        ],
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Build table/matrix templates and related artifacts.")
+    parser.add_argument("--prompt", default="docs/prompts/table_matrix_template_creation.xml", type=Path)
+    add_metrics_arguments(parser)
+    args = parser.parse_args(argv)
+
+    metrics = metrics_log_from_args(args)
+    run_build(load_config(args.prompt.resolve()), metrics)
+    metrics.save()
+
+
 if __name__ == "__main__":
     main()
@@ -10,6 +10,17 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Sequence
 
+from output_writer import write_text_if_changed
+from pipeline_metrics import add_metrics_arguments, metrics_log_from_args, record_rows
+from theme_rules import RewriteRule, RuleSet, rewrite_tree
+from theme_schema import (
+    DEFAULT_CACHE_DIR,
+    SchemaError,
+    render_schema_section,
+    schema_summary_line,
+    validate_theme,
+)
+
 
 @dataclass
 class IntegrationConfig:
@@ -88,33 +99,37 @@ def collect_added_pointers(visual_styles: Dict[str, object], presets: Dict[str,
     return entries
 
 
-def font_issues(data: Dict[str, object]) -> List[str]:
-    issues: List[str] = []
+FONT_FAMILY_RULES = RuleSet(
+    [
+        RewriteRule(
+            name="calibri-font-family",
+            key="fontFamily",
+            value_type="string",
+            not_equals="Calibri",
+            set="Calibri",
+        )
+    ]
+)
 
-    def recurse(node: object, pointer: List[str]) -> None:
-        if isinstance(node, dict):
-            for key, value in node.items():
-                new_pointer = pointer + [key]
-                if key == "fontFamily" and isinstance(value, str):
-                    if value != "Calibri":
-                        issues.append("/" + "/".join(new_pointer))
-                recurse(value, new_pointer)
-        elif isinstance(node, list):
-            for idx, value in enumerate(node):
-                recurse(value, pointer + [str(idx)])
 
-    recurse(data, [])
-    return issues
+def font_issues(data: Dict[str, object]) -> List[str]:
+    return [change["json_pointer"] for change in rewrite_tree(data, FONT_FAMILY_RULES).changes]
 
 
-def write_validation_report(path: Path, added_entries: List[Dict[str, object]], font_paths: List[str]) -> None:
+def write_validation_report(
+    path: Path,
+    added_entries: List[Dict[str, object]],
+    font_paths: List[str],
+    schema_errors: List[SchemaError] | None,
+    schema_file: Path,
+) -> None:
     lines = [
         "# Table & Matrix Integration Validation",
         "",
         "## Summary",
         "",
         f"- New presets merged: {len(added_entries)}",
-        "- Schema validation: not executed (jsonschema library unavailable in environment).",
+        schema_summary_line(schema_errors, schema_file),
         f"- Font issues detected: {len(font_paths)}",
         "",
         "## Checks Performed",
@@ -122,6 +137,7 @@ def write_validation_report(path: Path, added_entries: List[Dict[str, object]],
         "- Verified Calibri usage across merged presets.",
         "- Ensured integration limited to table and matrix visual styles.",
         "- Recorded JSON Pointers for all inserted presets.",
+        "- Validated the integrated theme against the report theme schema.",
     ]
     if font_paths:
         lines.append("")
@@ -130,23 +146,18 @@ def write_validation_report(path: Path, added_entries: List[Dict[str, object]],
     else:
         lines.append("")
         lines.append("All fontFamily values in merged presets are set to Calibri.")
+    if schema_errors:
+        lines.append("")
+        lines.extend(render_schema_section(schema_errors))
 
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text("\n".join(lines), encoding="utf-8")
+    write_text_if_changed(path, "\n".join(lines))
 
 
 def write_diff_output(path: Path, entries: List[Dict[str, object]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(entries, indent=2), encoding="utf-8")
-
-
-def main(argv: Sequence[str] | None = None) -> None:
-    parser = argparse.ArgumentParser(description="Integrate table/matrix style presets into a new theme file.")
-    parser.add_argument("--prompt", type=Path, default=Path("docs/prompts/table_matrix_integration.xml"))
-    args = parser.parse_args(argv)
+    write_text_if_changed(path, json.dumps(entries, indent=2))
 
-    config = load_config(args.prompt.resolve())
 
+def run_integration(config: IntegrationConfig) -> None:
     base_text = config.base_theme.read_text(encoding="utf-8")
     newline = detect_newline(base_text)
     base_theme = json.loads(base_text)
@@ -157,17 +168,17 @@ def main(argv: Sequence[str] | None = None) -> None:
     merge_visual_styles(base_theme, template_styles)
 
     added_entries = collect_added_pointers(base_theme.get("visualStyles", {}), template_styles)
+    record_rows(len(added_entries))
 
     integrated_path = config.outputs.get("rainwater_theme_v4_1_with_table_matrix.json")
     if not integrated_path:
         raise ValueError("Output path for integrated theme not defined in prompt.")
-    integrated_path.parent.mkdir(parents=True, exist_ok=True)
     integrated_text = json.dumps(base_theme, indent=2)
     if newline != "\n":
         integrated_text = integrated_text.replace("\n", newline)
     if not integrated_text.endswith(newline):
         integrated_text += newline
-    integrated_path.write_text(integrated_text, encoding="utf-8")
+    write_text_if_changed(integrated_path, integrated_text)
 
     diff_path = config.outputs.get("integration_diff.json")
     if not diff_path:
@@ -178,7 +189,20 @@ def main(argv: Sequence[str] | None = None) -> None:
     validation_path = config.outputs.get("integration_validation.md")
     if not validation_path:
         raise ValueError("Validation report output path missing in prompt.")
-    write_validation_report(validation_path, added_entries, font_paths)
+    schema_errors = validate_theme(base_theme, config.schema_file, config.repo_root / DEFAULT_CACHE_DIR)
+    write_validation_report(validation_path, added_entries, font_paths, schema_errors, config.schema_file)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Integrate table/matrix style presets into a new theme file.")
+    parser.add_argument("--prompt", type=Path, default=Path("docs/prompts/table_matrix_integration.xml"))
+    add_metrics_arguments(parser)
+    args = parser.parse_args(argv)
+
+    metrics = metrics_log_from_args(args)
+    config = load_config(args.prompt.resolve())
+    metrics.run("run_integration", run_integration, config, outputs=list(config.outputs.values()))
+    metrics.save()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Write generated artifacts atomically, leaving files whose content is unchanged untouched."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, TextIO
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def temp_path(path: Path) -> Path:
+    """Same-folder temp name, so ``os.replace`` stays a rename on one filesystem."""
+    return path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+
+def publish(tmp_path: Path, path: Path) -> bool:
+    """Swap ``tmp_path`` in as ``path`` unless both hash the same; returns ``True`` when ``path`` changed."""
+    try:
+        unchanged = path.stat().st_size == tmp_path.stat().st_size and hash_file(path) == hash_file(tmp_path)
+    except OSError:
+        unchanged = False
+    if unchanged:
+        tmp_path.unlink()
+        return False
+    os.replace(tmp_path, path)
+    return True
+
+
+def write_bytes_if_changed(path: Path, data: bytes) -> bool:
+    """Replace ``path`` with ``data`` via a temp file; returns ``False`` when the file already holds ``data``."""
+    try:
+        if path.stat().st_size == len(data) and hash_file(path) == hashlib.sha256(data).hexdigest():
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = temp_path(path)
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def write_text_if_changed(path: Path, text: str, encoding: str = "utf-8") -> bool:
+    return write_bytes_if_changed(path, text.encode(encoding))
+
+
+@contextmanager
+def open_output(path: Path, encoding: str = "utf-8", newline: str | None = None) -> Iterator[TextIO]:
+    """Stream text to a temp file and publish it on success, for outputs too large to render in memory.
+
+    On error the temp file is discarded and ``path`` keeps its previous content.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = temp_path(path)
+    try:
+        with tmp_path.open("w", encoding=encoding, newline=newline) as handle:
+            yield handle
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    publish(tmp_path, path)
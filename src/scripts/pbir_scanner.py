@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""Scan PBIR report definitions into visual property rows for catalog ingestion."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from output_writer import open_output, write_text_if_changed
+
+SCAN_FIELDNAMES = [
+    "report_path",
+    "page_id",
+    "visual_id",
+    "visual_type",
+    "style_variant",
+    "property_path",
+    "property_name",
+    "property_value",
+    "value_type",
+    "source_file",
+]
+
+OBJECT_BLOCKS = ("objects", "visualContainerObjects")
+
+
+@dataclass
+class VisualScan:
+    report_path: str
+    page_id: str
+    visual_id: str
+    visual_type: str
+    source_file: str
+    properties: List[Tuple[str, str, str, str]]
+
+    def signature(self) -> str:
+        return signature_digest((path, value) for path, _, value, _ in self.properties)
+
+
+def find_report_roots(paths: Iterable[Path]) -> List[Path]:
+    """Resolve report roots (folders holding ``definition/pages``) beneath each path."""
+    roots: List[Path] = []
+    seen: set[Path] = set()
+    for path in paths:
+        path = path.resolve()
+        if (path / "definition" / "pages").is_dir():
+            candidates = [path]
+        else:
+            candidates = sorted(pages.parents[1] for pages in path.rglob("definition/pages") if pages.is_dir())
+        for candidate in candidates:
+            if candidate not in seen:
+                seen.add(candidate)
+                roots.append(candidate)
+    return roots
+
+
+def iter_visual_files(report_root: Path) -> Iterator[Path]:
+    yield from sorted((report_root / "definition" / "pages").glob("*/visuals/*/visual.json"))
+
+
+def repo_path(path: Path, repo_root: Path) -> str:
+    """POSIX path relative to ``repo_root``, or the absolute POSIX path for files outside the repo."""
+    try:
+        return path.relative_to(repo_root).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def report_label(report_root: Path, repo_root: Path) -> str:
+    """``report_path`` column value: the report folder as a rooted POSIX path."""
+    return "/" + repo_path(report_root, repo_root).lstrip("/")
+
+
+def decode_literal(raw: object) -> Tuple[str, str]:
+    if not isinstance(raw, str):
+        return stringify_scalar(raw)
+    if len(raw) >= 2 and raw.startswith("'") and raw.endswith("'"):
+        return raw[1:-1], "string"
+    if raw in {"true", "false"}:
+        return raw, "boolean"
+    if raw == "null":
+        return raw, "null"
+    number = raw[:-1] if raw[-1:] in {"D", "L", "M"} else raw
+    try:
+        int(number)
+        return number, "integer"
+    except ValueError:
+        pass
+    try:
+        float(number)
+        return number, "number"
+    except ValueError:
+        return raw, "string"
+
+
+def stringify_scalar(value: object) -> Tuple[str, str]:
+    if isinstance(value, bool):
+        return ("true" if value else "false"), "boolean"
+    if isinstance(value, int):
+        return str(value), "integer"
+    if isinstance(value, float):
+        return str(value), "number"
+    if value is None:
+        return "null", "null"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value), "object"
+    return str(value), "string"
+
+
+def simplify_expr(node: object) -> object:
+    """Collapse nested ``Literal`` wrappers to native values so compound expressions stay readable."""
+    if isinstance(node, dict):
+        literal = node.get("Literal")
+        if len(node) == 1 and isinstance(literal, dict) and "Value" in literal:
+            value, value_type = decode_literal(literal["Value"])
+            if value_type == "integer":
+                return int(value)
+            if value_type == "number":
+                return float(value)
+            if value_type == "boolean":
+                return value == "true"
+            if value_type == "null":
+                return None
+            return value
+        return {key: simplify_expr(child) for key, child in node.items()}
+    if isinstance(node, list):
+        return [simplify_expr(item) for item in node]
+    return node
+
+
+def describe_expr(expr: object) -> Tuple[str, str]:
+    if isinstance(expr, dict):
+        if "Literal" in expr and isinstance(expr["Literal"], dict):
+            return decode_literal(expr["Literal"].get("Value"))
+        theme_color = expr.get("ThemeDataColor")
+        if isinstance(theme_color, dict):
+            color_id = theme_color.get("ColorId", 0)
+            percent = theme_color.get("Percent", 0)
+            return f"ThemeDataColor(ColorId={color_id},Percent={percent})", "string"
+    return stringify_scalar(simplify_expr(expr))
+
+
+def format_selector(selector: object) -> str:
+    if not isinstance(selector, dict) or not selector:
+        return ""
+    if "id" in selector:
+        return f"[id={selector['id']}]"
+    if "metadata" in selector:
+        return f"[metadata={selector['metadata']}]"
+    if "data" in selector:
+        return f"[data={selector['data']}]"
+    return f"[selector={json.dumps(selector, sort_keys=True)}]"
+
+
+def flatten_property(node: object, parts: List[str], out: List[Tuple[str, str, str, str]]) -> None:
+    if isinstance(node, dict) and "expr" in node:
+        value, value_type = describe_expr(node["expr"])
+        out.append((".".join(parts), parts[-1], value, value_type))
+    elif isinstance(node, dict):
+        for key, child in node.items():
+            flatten_property(child, parts + [key], out)
+    else:
+        value, value_type = stringify_scalar(node)
+        out.append((".".join(parts), parts[-1], value, value_type))
+
+
+def flatten_visual_objects(visual: Dict[str, object]) -> List[Tuple[str, str, str, str]]:
+    """Flatten ``visual.objects`` and ``visualContainerObjects`` into (path, name, value, type) tuples."""
+    properties: List[Tuple[str, str, str, str]] = []
+    for block in OBJECT_BLOCKS:
+        cards = visual.get(block)
+        if not isinstance(cards, dict):
+            continue
+        for card_name, entries in cards.items():
+            if not isinstance(entries, list):
+                continue
+            for entry in entries:
+                if not isinstance(entry, dict):
+                    continue
+                card_label = card_name + format_selector(entry.get("selector"))
+                for prop_name, prop_node in (entry.get("properties") or {}).items():
+                    flatten_property(prop_node, [card_label, prop_name], properties)
+    properties.sort(key=lambda item: item[0])
+    return properties
+
+
+def parse_visual(raw: bytes, path: Path, report_root: Path, repo_root: Path) -> VisualScan | None:
+    try:
+        data = json.loads(raw.decode("utf-8-sig"))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+    visual = data.get("visual") if isinstance(data, dict) else None
+    if not isinstance(visual, dict) or not visual.get("visualType"):
+        return None
+    return VisualScan(
+        report_path=report_label(report_root, repo_root),
+        page_id=path.parents[2].name,
+        visual_id=data.get("name") or path.parent.name,
+        visual_type=str(visual["visualType"]),
+        source_file=repo_path(path, repo_root),
+        properties=flatten_visual_objects(visual),
+    )
+
+
+def scan_visual_file(visual_path: str, report_root: str, repo_root: str) -> VisualScan | None:
+    """Read a single ``visual.json`` once and return its flattened formatting properties."""
+    path = Path(visual_path)
+    try:
+        raw = path.read_bytes()
+    except OSError:
+        return None
+    return parse_visual(raw, path, Path(report_root), Path(repo_root))
+
+
+@dataclass
+class FileStamp:
+    size: int
+    mtime_ns: int
+    sha256: str
+
+
+@dataclass
+class ScannedFile:
+    source_file: str
+    stamp: FileStamp | None
+    scan: VisualScan | None
+
+
+def _scan_task(args: Tuple[str, str, str]) -> ScannedFile:
+    visual_path, report_root, repo_root = args
+    path = Path(visual_path)
+    source_file = repo_path(path, Path(repo_root))
+    try:
+        stat = path.stat()
+        raw = path.read_bytes()
+    except OSError:
+        return ScannedFile(source_file, None, None)
+    stamp = FileStamp(stat.st_size, stat.st_mtime_ns, hashlib.sha256(raw).hexdigest())
+    return ScannedFile(source_file, stamp, parse_visual(raw, path, Path(report_root), Path(repo_root)))
+
+
+def scan_files(tasks: Sequence[Tuple[str, str, str]], workers: int | None = None) -> List[ScannedFile]:
+    """Hash and parse each (visual path, report root, repo root) task, fanning out to a process pool."""
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            return list(executor.map(_scan_task, tasks, chunksize=chunksize))
+    return [_scan_task(task) for task in tasks]
+
+
+class ScanManifest:
+    """Per-source-file size, mtime and SHA-256 recorded alongside the catalog outputs."""
+
+    VERSION = 1
+
+    def __init__(self, files: Dict[str, FileStamp] | None = None) -> None:
+        self.files: Dict[str, FileStamp] = files or {}
+
+    @classmethod
+    def load(cls, path: Path) -> "ScanManifest" | None:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != cls.VERSION:
+            return None
+        return cls({name: FileStamp(*values) for name, values in data.get("files", {}).items()})
+
+    def save(self, path: Path) -> None:
+        payload = {
+            "version": self.VERSION,
+            "files": {
+                name: [stamp.size, stamp.mtime_ns, stamp.sha256] for name, stamp in sorted(self.files.items())
+            },
+        }
+        write_text_if_changed(path, json.dumps(payload, indent=2))
+
+
+@dataclass
+class RescanPlan:
+    tasks: List[Tuple[str, str, str]]
+    deleted: List[str]
+    unchanged: int
+
+
+def plan_rescan(paths: Iterable[Path], repo_root: Path, manifest: ScanManifest) -> RescanPlan:
+    """Compare report files with ``manifest``; stat first and hash only when size or mtime moved."""
+    repo_root = repo_root.resolve()
+    report_roots = find_report_roots(paths)
+    tasks: List[Tuple[str, str, str]] = []
+    present: set[str] = set()
+    unchanged = 0
+    for report_root in report_roots:
+        for visual_path in iter_visual_files(report_root):
+            source_file = repo_path(visual_path, repo_root)
+            present.add(source_file)
+            previous = manifest.files.get(source_file)
+            if previous is not None:
+                stat = visual_path.stat()
+                if stat.st_size == previous.size and stat.st_mtime_ns == previous.mtime_ns:
+                    unchanged += 1
+                    continue
+                if stat.st_size == previous.size:
+                    digest = hashlib.sha256(visual_path.read_bytes()).hexdigest()
+                    if digest == previous.sha256:
+                        previous.mtime_ns = stat.st_mtime_ns
+                        unchanged += 1
+                        continue
+            tasks.append((str(visual_path), str(report_root), str(repo_root)))
+    scanned_roots = {repo_path(root, repo_root) for root in report_roots}
+    deleted = sorted(
+        name
+        for name in manifest.files
+        if name not in present and any(name.startswith(root + "/") for root in scanned_roots)
+    )
+    return RescanPlan(tasks=tasks, deleted=deleted, unchanged=unchanged)
+
+
+def signature_digest(pairs: Iterable[Tuple[str, str]]) -> str:
+    return hashlib.sha1(json.dumps(sorted(pairs)).encode("utf-8")).hexdigest()
+
+
+def assign_style_variants(visuals: Sequence[Tuple[str, str, str, str]]) -> Dict[Tuple[str, str], str]:
+    """Number distinct property signatures per report and visual type, most common first.
+
+    ``visuals`` holds (report_path, visual_type, visual_id, signature) in scan order; ties keep
+    the order in which a signature was first seen.
+    """
+    grouped: Dict[Tuple[str, str], Counter] = defaultdict(Counter)
+    first_seen: Dict[Tuple[str, str, str], int] = {}
+    for position, (report_path, visual_type, _, signature) in enumerate(visuals):
+        grouped[(report_path, visual_type)][signature] += 1
+        first_seen.setdefault((report_path, visual_type, signature), position)
+
+    variant_by_signature: Dict[Tuple[str, str, str], str] = {}
+    for (report_path, visual_type), counter in grouped.items():
+        ordered = sorted(
+            counter.items(),
+            key=lambda item: (-item[1], first_seen[(report_path, visual_type, item[0])]),
+        )
+        for index, (signature, _) in enumerate(ordered, start=1):
+            variant_by_signature[(report_path, visual_type, signature)] = f"Style {index}"
+    return {
+        (report_path, visual_id): variant_by_signature[(report_path, visual_type, signature)]
+        for report_path, visual_type, visual_id, signature in visuals
+    }
+
+
+def scan_rows(scan: VisualScan, style_variant: str) -> Iterator[Dict[str, str]]:
+    for property_path, property_name, value, value_type in scan.properties:
+        yield {
+            "report_path": scan.report_path,
+            "page_id": scan.page_id,
+            "visual_id": scan.visual_id,
+            "visual_type": scan.visual_type,
+            "style_variant": style_variant,
+            "property_path": property_path,
+            "property_name": property_name,
+            "property_value": value,
+            "value_type": value_type,
+            "source_file": scan.source_file,
+        }
+
+
+def scan_reports(
+    paths: Iterable[Path],
+    repo_root: Path,
+    workers: int | None = None,
+    manifest: ScanManifest | None = None,
+) -> Iterator[Dict[str, str]]:
+    """Walk one or many PBIR report trees and yield rows in the ``visual_properties.csv`` layout.
+
+    When ``manifest`` is given it is filled with a stamp for every file scanned.
+    """
+    repo_root = repo_root.resolve()
+    tasks: List[Tuple[str, str, str]] = []
+    for report_root in find_report_roots(paths):
+        for visual_path in iter_visual_files(report_root):
+            tasks.append((str(visual_path), str(report_root), str(repo_root)))
+
+    results = scan_files(tasks, workers)
+    if manifest is not None:
+        for result in results:
+            if result.stamp is not None:
+                manifest.files[result.source_file] = result.stamp
+    # Visuals without formatting properties emit no rows, so they take no part in style numbering.
+    scans = [result.scan for result in results if result.scan is not None and result.scan.properties]
+
+    variants = assign_style_variants(
+        [(scan.report_path, scan.visual_type, scan.visual_id, scan.signature()) for scan in scans]
+    )
+    for scan in scans:
+        yield from scan_rows(scan, variants[(scan.report_path, scan.visual_id)])
+
+
+def write_scan_csv(rows: Iterable[Dict[str, str]], output_path: Path) -> int:
+    count = 0
+    with open_output(output_path, newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=SCAN_FIELDNAMES)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Scan PBIR report definitions into a visual properties CSV.")
+    parser.add_argument("reports", nargs="+", type=Path, help="Report folders or directories containing reports.")
+    parser.add_argument("--repo-root", type=Path, default=Path(__file__).resolve().parents[2])
+    parser.add_argument("--output", type=Path, default=Path("reports/spend_cube/visual_properties.csv"))
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    rows = scan_reports(args.reports, args.repo_root, workers=args.workers)
+    count = write_scan_csv(rows, args.output)
+    print(f"Wrote {count} property rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
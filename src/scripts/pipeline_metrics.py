@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Per-stage wall time, CPU time, peak memory, row and byte counters for the pipeline scripts."""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import json
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from output_writer import write_text_if_changed
+
+METRICS_VERSION = 1
+
+
+@dataclass
+class StageMetrics:
+    stage: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_memory_bytes: int | None = None
+    rows: int = 0
+    bytes_written: int = 0
+    outputs: List[str] = field(default_factory=list)
+    profile: str | None = None
+
+
+_ACTIVE: List[StageMetrics] = []
+
+FileState = Tuple[int, int, int]
+
+
+def file_state(path: Path) -> FileState | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def record_rows(count: int) -> None:
+    """Add ``count`` to the row counter of the stage currently being measured, if any."""
+    if _ACTIVE:
+        _ACTIVE[-1].rows += count
+
+
+def measure(
+    stage: str,
+    func: Callable[..., object],
+    args: Sequence[object] = (),
+    outputs: Sequence[Path] = (),
+    profile_dir: Path | None = None,
+    trace_memory: bool = False,
+) -> Tuple[object, StageMetrics]:
+    """Call ``func(*args)`` and return its result with the stage's metrics.
+
+    CPU time covers the calling process only; work done in worker pools is visible through wall
+    time. Peak memory is the tracemalloc high-water mark above the allocation level at entry;
+    tracing slows allocation-heavy stages several times over, so it is off unless requested.
+    ``bytes_written`` counts only outputs the stage replaced: the output layer leaves unchanged
+    files in place, so their inode and mtime survive, including files written by worker processes.
+    """
+    metrics = StageMetrics(stage)
+    before = {path: file_state(path) for path in outputs}
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if trace_memory:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    profiler = cProfile.Profile() if profile_dir is not None else None
+    _ACTIVE.append(metrics)
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        if profiler is not None:
+            result = profiler.runcall(func, *args)
+        else:
+            result = func(*args)
+    finally:
+        metrics.wall_seconds = round(time.perf_counter() - wall_start, 6)
+        metrics.cpu_seconds = round(time.process_time() - cpu_start, 6)
+        _ACTIVE.pop()
+        if trace_memory:
+            metrics.peak_memory_bytes = max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+            if started_tracing:
+                tracemalloc.stop()
+    for path in outputs:
+        state = file_state(path)
+        if state is None:
+            continue
+        metrics.outputs.append(path.as_posix())
+        if state != before[path]:
+            metrics.bytes_written += state[1]
+    if profiler is not None:
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        profile_path = profile_dir / f"{stage}.prof"
+        profiler.dump_stats(str(profile_path))
+        metrics.profile = profile_path.as_posix()
+    return result, metrics
+
+
+class MetricsLog:
+    """Collect stage metrics for one run and write them as JSON.
+
+    A log without a ``path`` is disabled: ``run`` calls straight through with no tracing cost.
+    """
+
+    def __init__(self, path: Path | None = None, profile_dir: Path | None = None, trace_memory: bool = False) -> None:
+        self.path = path
+        self.profile_dir = profile_dir
+        self.trace_memory = trace_memory
+        self.stages: List[StageMetrics] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def run(self, stage: str, func: Callable[..., object], *args: object, outputs: Sequence[Path] = ()) -> object:
+        if not self.enabled:
+            return func(*args)
+        result, metrics = measure(stage, func, args, outputs, self.profile_dir, self.trace_memory)
+        self.stages.append(metrics)
+        return result
+
+    def wrap(self, stage: str, func: Callable[..., object], *args: object, outputs: Sequence[Path] = ()) -> Callable[[], object]:
+        """Return a picklable callable for process pools; its result carries the stage metrics."""
+        if not self.enabled:
+            return partial(func, *args)
+        return partial(measure, stage, func, args, list(outputs), self.profile_dir, self.trace_memory)
+
+    def collect(self, results: Iterable[object]) -> None:
+        """Keep metrics returned by callables produced with ``wrap``."""
+        for result in results:
+            if isinstance(result, tuple) and len(result) == 2 and isinstance(result[1], StageMetrics):
+                self.stages.append(result[1])
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        payload: Dict[str, object] = {
+            "version": METRICS_VERSION,
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "memory_traced": self.trace_memory,
+            "profiled": self.profile_dir is not None,
+            "stages": [asdict(metrics) for metrics in self.stages],
+        }
+        write_text_if_changed(self.path, json.dumps(payload, indent=2))
+
+
+def add_metrics_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--metrics", type=Path, default=None, help="Write per-stage timing, memory and row metrics to this JSON file.")
+    parser.add_argument("--profile-dir", type=Path, default=None, help="Also dump a cProfile file per stage into this folder (inflates timings).")
+    parser.add_argument(
+        "--metrics-memory",
+        action="store_true",
+        help="Also record peak traced memory per stage; tracemalloc inflates the recorded timings.",
+    )
+
+
+def metrics_log_from_args(args: argparse.Namespace) -> MetricsLog:
+    path = args.metrics
+    if path is None and args.profile_dir is not None:
+        path = args.profile_dir / "metrics.json"
+    return MetricsLog(path, args.profile_dir, args.metrics_memory)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Run pipeline stages as a small dependency graph, skipping stages whose inputs and outputs are unchanged."""
+
+from __future__ import annotations
+
+import json
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from output_writer import hash_file, write_text_if_changed
+from pbir_scanner import FileStamp
+
+STATE_VERSION = 1
+
+
+@dataclass
+class Stage:
+    """A pipeline step with the files it reads and writes.
+
+    ``action`` must be picklable (a module-level function or ``functools.partial`` of one) so
+    independent stages can run in separate processes. ``params`` records options that change
+    the outputs without touching any input file.
+    """
+
+    name: str
+    action: Callable[[], object]
+    inputs: Sequence[Path]
+    outputs: Sequence[Path]
+    depends: Tuple[str, ...] = ()
+    params: Dict[str, object] = field(default_factory=dict)
+
+
+def stamp_file(path: Path) -> FileStamp | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return FileStamp(stat.st_size, stat.st_mtime_ns, hash_file(path))
+
+
+def stamp_matches(path: Path, recorded: List[object] | None) -> bool:
+    """Check ``path`` against a recorded [size, mtime_ns, sha256]; hash only when mtime moved."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return recorded is None
+    if recorded is None:
+        return False
+    size, mtime_ns, sha256 = recorded
+    if stat.st_size != size:
+        return False
+    if stat.st_mtime_ns == mtime_ns:
+        return True
+    if hash_file(path) != sha256:
+        return False
+    recorded[1] = stat.st_mtime_ns
+    return True
+
+
+class StageRunner:
+    """Execute stages in dependency order with independent stages running concurrently.
+
+    Each stage's input and output stamps are stored in ``state_path``. A stage is skipped when
+    its params, every input and every output still match the recorded stamps; stages listing an
+    upstream output as an input rerun only when that output actually changed.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Stage],
+        state_path: Path,
+        repo_root: Path,
+        workers: int | None = None,
+        force: bool = False,
+    ) -> None:
+        names = {stage.name for stage in stages}
+        for stage in stages:
+            missing = [dep for dep in stage.depends if dep not in names]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stage(s): {', '.join(missing)}")
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_path = state_path
+        self.repo_root = repo_root
+        self.workers = workers
+        self.force = force
+        self.state = self.load_state()
+        self.results: Dict[str, object] = {}
+
+    def load_state(self) -> Dict[str, Dict[str, object]]:
+        try:
+            data = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != STATE_VERSION:
+            return {}
+        return data.get("stages", {})
+
+    def save_state(self) -> None:
+        payload = {"version": STATE_VERSION, "stages": dict(sorted(self.state.items()))}
+        write_text_if_changed(self.state_path, json.dumps(payload, indent=2))
+
+    def label(self, path: Path) -> str:
+        try:
+            return path.resolve().relative_to(self.repo_root).as_posix()
+        except ValueError:
+            return path.resolve().as_posix()
+
+    def is_current(self, stage: Stage) -> bool:
+        record = self.state.get(stage.name)
+        if self.force or not record:
+            return False
+        if record.get("params") != json.loads(json.dumps(stage.params)):
+            return False
+        for key, paths in (("inputs", stage.inputs), ("outputs", stage.outputs)):
+            recorded = record.get(key, {})
+            if set(recorded) != {self.label(path) for path in paths}:
+                return False
+            if not all(stamp_matches(path, recorded[self.label(path)]) for path in paths):
+                return False
+        return not any(recorded is None for recorded in record["outputs"].values())
+
+    def stamps(self, paths: Sequence[Path]) -> Dict[str, List[object] | None]:
+        stamps: Dict[str, List[object] | None] = {}
+        for path in paths:
+            stamp = stamp_file(path)
+            stamps[self.label(path)] = None if stamp is None else [stamp.size, stamp.mtime_ns, stamp.sha256]
+        return stamps
+
+    def run(self) -> Dict[str, str]:
+        """Run every stale stage and return ``{stage name: "ran" | "skipped"}``.
+
+        Return values of the stages that ran are kept in ``results``.
+        """
+        status: Dict[str, str] = {}
+        pending = dict(self.stages)
+        running: Dict[Future, Tuple[Stage, Dict[str, List[object] | None]]] = {}
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers != 1 else None
+        try:
+            while pending or running:
+                progressed = False
+                for name, stage in list(pending.items()):
+                    if not all(dep in status for dep in stage.depends):
+                        continue
+                    del pending[name]
+                    progressed = True
+                    if self.is_current(stage):
+                        status[name] = "skipped"
+                        continue
+                    input_stamps = self.stamps(stage.inputs)
+                    if executor is None:
+                        self.results[name] = stage.action()
+                        self.finish(stage, input_stamps)
+                        status[name] = "ran"
+                    else:
+                        running[executor.submit(stage.action)] = (stage, input_stamps)
+                if progressed:
+                    continue
+                if not running:
+                    raise ValueError(f"Stage dependency cycle among: {', '.join(sorted(pending))}")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, input_stamps = running.pop(future)
+                    self.results[stage.name] = future.result()
+                    self.finish(stage, input_stamps)
+                    status[stage.name] = "ran"
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            self.save_state()
+        return status
+
+    def finish(self, stage: Stage, input_stamps: Dict[str, List[object] | None]) -> None:
+        self.state[stage.name] = {
+            "params": json.loads(json.dumps(stage.params)),
+            "inputs": input_stamps,
+            "outputs": self.stamps(stage.outputs),
+        }
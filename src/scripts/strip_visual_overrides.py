@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""Strip visual-level formatting that repeats the effective theme value and report the bytes saved."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from output_writer import open_output, write_bytes_if_changed, write_text_if_changed
+from pbir_scanner import OBJECT_BLOCKS, find_report_roots, flatten_property, format_selector, iter_visual_files
+from theme_cascade import ResolvedValue, ThemeCascade, report_theme_paths, visual_style_preset
+from theme_rules import detect_indent, detect_newline
+
+STRIP_LOG_FIELDS = ["path", "visual_type", "style_preset", "block", "attribute_key", "value", "inherited_from"]
+
+# Cards that carry identity rather than formatting; removing them would change what the theme applies.
+KEEP_CARDS = {"stylePreset"}
+
+
+@dataclass
+class StripResult:
+    path: str
+    visual_type: str = ""
+    style_preset: str = ""
+    bytes_before: int = 0
+    bytes_after: int = 0
+    removed: List[Dict[str, str]] = field(default_factory=list)
+    error: str = ""
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+
+def values_equal(visual_value: str, visual_type: str, theme: ResolvedValue) -> bool:
+    if visual_value == theme.value:
+        return True
+    numeric = {"integer", "number"}
+    if visual_type in numeric and theme.value_type in numeric:
+        try:
+            return float(visual_value) == float(theme.value)
+        except ValueError:
+            return False
+    return False
+
+
+def plain_overrides(visual: Dict[str, object]) -> Dict[str, ResolvedValue]:
+    """Visual values set without a selector; selector entries inherit from these before the theme."""
+    values: Dict[str, ResolvedValue] = {}
+    for block in OBJECT_BLOCKS:
+        cards = visual.get(block)
+        for card_name, entries in (cards.items() if isinstance(cards, dict) else []):
+            for entry in entries if isinstance(entries, list) else []:
+                if isinstance(entry, dict) and not entry.get("selector"):
+                    leaves: List[Tuple[str, str, str, str]] = []
+                    for prop_name, prop_node in (entry.get("properties") or {}).items():
+                        flatten_property(prop_node, [card_name, prop_name], leaves)
+                    for path, _, value, value_type in leaves:
+                        values[path] = ResolvedValue(value, value_type, "visual")
+    return values
+
+
+def strip_visual(
+    visual: Dict[str, object], cascade: ThemeCascade
+) -> Tuple[Dict[str, object], List[Dict[str, str]]]:
+    """Return a copy of ``visual`` without properties whose every leaf equals the inherited value."""
+    visual_type = str(visual.get("visualType", ""))
+    preset = visual_style_preset(visual)
+    plain = plain_overrides(visual)
+    removed: List[Dict[str, str]] = []
+    slimmed = dict(visual)
+    for block in OBJECT_BLOCKS:
+        cards = visual.get(block)
+        if not isinstance(cards, dict):
+            continue
+        kept_cards: Dict[str, object] = {}
+        for card_name, entries in cards.items():
+            if card_name in KEEP_CARDS or not isinstance(entries, list) or not entries:
+                kept_cards[card_name] = entries
+                continue
+            kept_entries: List[object] = []
+            for entry in entries:
+                properties = entry.get("properties") if isinstance(entry, dict) else None
+                if not isinstance(properties, dict) or not properties:
+                    kept_entries.append(entry)
+                    continue
+                card_label = card_name + format_selector(entry.get("selector"))
+                inherited_from = plain if entry.get("selector") else None
+                kept_properties: Dict[str, object] = {}
+                for prop_name, prop_node in properties.items():
+                    leaves: List[Tuple[str, str, str, str]] = []
+                    flatten_property(prop_node, [card_label, prop_name], leaves)
+                    matches = [
+                        (path, value, cascade.resolve(visual_type, path, preset, inherited_from))
+                        for path, _, value, value_type in leaves
+                    ]
+                    redundant = bool(leaves) and all(
+                        inherited is not None and values_equal(value, value_type, inherited)
+                        for (_, value, inherited), (_, _, _, value_type) in zip(matches, leaves)
+                    )
+                    if not redundant:
+                        kept_properties[prop_name] = prop_node
+                        continue
+                    removed.extend(
+                        {
+                            "visual_type": visual_type,
+                            "style_preset": preset,
+                            "block": block,
+                            "attribute_key": path,
+                            "value": value,
+                            "inherited_from": inherited.source,
+                        }
+                        for path, value, inherited in matches
+                    )
+                # Entries are only dropped when this pass emptied them; anything left as found stays.
+                if len(kept_properties) == len(properties):
+                    kept_entries.append(entry)
+                elif kept_properties:
+                    kept_entries.append({**entry, "properties": kept_properties})
+                elif set(entry) - {"properties", "selector"}:
+                    kept_entries.append({key: value for key, value in entry.items() if key != "properties"})
+            if kept_entries:
+                kept_cards[card_name] = kept_entries
+        if kept_cards or not cards:
+            slimmed[block] = kept_cards
+        else:
+            del slimmed[block]
+    return slimmed, removed
+
+
+class NumberLiteral(float):
+    """A parsed JSON number that remembers its source text, so untouched values re-serialize byte for byte."""
+
+    literal: str
+
+    def __new__(cls, text: str) -> "NumberLiteral":
+        number = super().__new__(cls, text)
+        number.literal = text
+        return number
+
+
+LITERAL_MARK = re.compile(r'"\\u0000(\d+)\\u0000"')
+
+
+def load_json_literals(text: str) -> object:
+    """``json.loads`` keeping each float's original spelling for ``render_visual``."""
+    return json.loads(text, parse_float=NumberLiteral)
+
+
+def _mark_literals(node: object, literals: List[str]) -> object:
+    if isinstance(node, dict):
+        return {key: _mark_literals(child, literals) for key, child in node.items()}
+    if isinstance(node, list):
+        return [_mark_literals(child, literals) for child in node]
+    if isinstance(node, NumberLiteral) and node.literal != repr(float(node)):
+        literals.append(node.literal)
+        return f"\x00{len(literals) - 1}\x00"
+    return node
+
+
+def render_visual(data: object, original_text: str) -> str:
+    """Serialize like Power BI Desktop: detected indent and newline, no added trailing newline.
+
+    Numbers parsed with ``load_json_literals`` are written with their original spelling
+    (``95.430995960588078`` stays as is rather than becoming ``95.43099596058808``).
+    """
+    newline = detect_newline(original_text)
+    literals: List[str] = []
+    if not LITERAL_MARK.search(original_text):
+        data = _mark_literals(data, literals)
+    text = json.dumps(data, indent=detect_indent(original_text, default=2), ensure_ascii=False)
+    if literals:
+        text = LITERAL_MARK.sub(lambda match: literals[int(match.group(1))], text)
+    if newline != "\n":
+        text = text.replace("\n", newline)
+    if original_text.endswith(newline):
+        text += newline
+    return text
+
+
+_CASCADES: Dict[Tuple[str, str], ThemeCascade] = {}
+
+
+def cascade_for(base_theme: str, custom_theme: str) -> ThemeCascade:
+    key = (base_theme, custom_theme)
+    cascade = _CASCADES.get(key)
+    if cascade is None:
+        cascade = ThemeCascade.from_files(Path(base_theme) if base_theme else None, Path(custom_theme) if custom_theme else None)
+        _CASCADES[key] = cascade
+    return cascade
+
+
+def _strip_task(task: Tuple[str, str, str, str, str | None]) -> StripResult:
+    visual_path, label, base_theme, custom_theme, output_path = task
+    result = StripResult(path=label)
+    try:
+        raw = Path(visual_path).read_bytes()
+        text = raw.decode("utf-8-sig")
+        data = load_json_literals(text)
+    except (OSError, UnicodeDecodeError, ValueError) as exc:
+        result.error = str(exc)
+        return result
+    visual = data.get("visual") if isinstance(data, dict) else None
+    result.bytes_before = result.bytes_after = len(raw)
+    if not isinstance(visual, dict):
+        return result
+    result.visual_type = str(visual.get("visualType", ""))
+    result.style_preset = visual_style_preset(visual)
+    slimmed, removed = strip_visual(visual, cascade_for(base_theme, custom_theme))
+    if not removed:
+        return result
+    rendered = render_visual({**data, "visual": slimmed}, text).encode("utf-8")
+    if len(rendered) >= len(raw):
+        return result
+    result.removed = removed
+    result.bytes_after = len(rendered)
+    if output_path:
+        write_bytes_if_changed(Path(output_path), rendered)
+    return result
+
+
+def strip_reports(
+    paths: Sequence[Path],
+    repo_root: Path,
+    output_dir: Path | None = None,
+    in_place: bool = False,
+    custom_theme: Path | None = None,
+    workers: int | None = None,
+) -> List[StripResult]:
+    """Strip redundant overrides from every visual under ``paths``; files are written only when they shrink."""
+    tasks: List[Tuple[str, str, str, str, str | None]] = []
+    for report_root in find_report_roots(paths):
+        base_path, report_custom = report_theme_paths(report_root)
+        theme_path = custom_theme or report_custom
+        for visual_path in iter_visual_files(report_root):
+            try:
+                relative = visual_path.relative_to(repo_root)
+                label = relative.as_posix()
+            except ValueError:
+                # Mirror files outside the repo under output_dir too, instead of joining an absolute path.
+                relative = visual_path.relative_to(visual_path.anchor)
+                label = visual_path.as_posix()
+            if in_place:
+                output_path: str | None = str(visual_path)
+            elif output_dir is not None:
+                output_path = str(output_dir / relative)
+            else:
+                output_path = None
+            tasks.append(
+                (str(visual_path), label, str(base_path or ""), str(theme_path.resolve()) if theme_path else "", output_path)
+            )
+
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            return list(executor.map(_strip_task, tasks, chunksize=max(1, len(tasks) // (workers * 8))))
+    return [_strip_task(task) for task in tasks]
+
+
+def write_strip_log(results: Sequence[StripResult], path: Path) -> None:
+    with open_output(path, newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=STRIP_LOG_FIELDS)
+        writer.writeheader()
+        for result in results:
+            for row in result.removed:
+                writer.writerow({"path": result.path, **row})
+
+
+def render_strip_report(results: Sequence[StripResult], written: bool) -> str:
+    slimmed = [result for result in results if result.removed]
+    failed = [result for result in results if result.error]
+    bytes_before = sum(result.bytes_before for result in results)
+    bytes_saved = sum(result.bytes_saved for result in slimmed)
+    removed = sum(len(result.removed) for result in slimmed)
+    by_source: Dict[str, int] = {}
+    for result in slimmed:
+        for row in result.removed:
+            by_source[row["inherited_from"]] = by_source.get(row["inherited_from"], 0) + 1
+
+    lines: List[str] = []
+    lines.append("# Visual Override Strip Report")
+    lines.append("")
+    lines.append("Visual-level properties whose value equals the effective theme value (or, for selector entries, the visual's own unselected value) are removed.")
+    lines.append("")
+    lines.append("## Overview")
+    lines.append("")
+    lines.append(f"- Visuals scanned: {len(results)}")
+    lines.append(f"- Visuals slimmed: {len(slimmed)}")
+    lines.append(f"- Property values removed: {removed}")
+    share = bytes_saved / bytes_before if bytes_before else 0.0
+    lines.append(f"- Bytes before: {bytes_before:,}")
+    lines.append(f"- Bytes saved: {bytes_saved:,} ({share:.1%})")
+    lines.append(f"- Slimmed files written: {'yes' if written else 'no (report only)'}")
+    lines.append("")
+    lines.append("## Removed Values by Inherited Layer")
+    lines.append("")
+    lines.append("| Layer | Values |")
+    lines.append("| --- | ---: |")
+    for source, count in sorted(by_source.items(), key=lambda item: (-item[1], item[0])) or [("—", 0)]:
+        lines.append(f"| {source} | {count} |")
+    lines.append("")
+    lines.append("## Largest Savings")
+    lines.append("")
+    lines.append("| Visual | Type | Removed | Bytes Before | Bytes Saved |")
+    lines.append("| --- | --- | ---: | ---: | ---: |")
+    top = sorted(slimmed, key=lambda result: (-result.bytes_saved, result.path))[:15]
+    for result in top:
+        lines.append(
+            f"| {result.path} | {result.visual_type} | {len(result.removed)} | {result.bytes_before:,} | {result.bytes_saved:,} |"
+        )
+    if not top:
+        lines.append("| — | — | 0 | 0 | 0 |")
+    if failed:
+        lines.append("")
+        lines.append("## Visuals Not Processed")
+        lines.append("")
+        lines.extend(f"- {result.path}: {result.error}" for result in failed)
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Strip visual formatting that repeats the effective theme value.")
+    parser.add_argument("reports", nargs="+", type=Path, help="Report folders or directories containing reports.")
+    parser.add_argument("--repo-root", type=Path, default=Path(__file__).resolve().parents[2])
+    parser.add_argument("--theme", type=Path, default=None, help="Compare against this custom theme instead of each report's own.")
+    parser.add_argument("--output-dir", type=Path, default=None, help="Write slimmed visual.json files under this folder.")
+    parser.add_argument("--in-place", action="store_true", help="Overwrite the visual.json files that shrink.")
+    parser.add_argument("--report", type=Path, default=Path("reports/spend_cube/override_strip_report.md"))
+    parser.add_argument("--log", type=Path, default=Path("reports/spend_cube/override_strip_log.csv"))
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    results = strip_reports(
+        args.reports,
+        args.repo_root.resolve(),
+        output_dir=args.output_dir.resolve() if args.output_dir else None,
+        in_place=args.in_place,
+        custom_theme=args.theme,
+        workers=args.workers,
+    )
+    write_strip_log(results, args.log)
+    write_text_if_changed(args.report, render_strip_report(results, bool(args.output_dir or args.in_place)))
+    saved = sum(result.bytes_saved for result in results if result.removed)
+    print(f"{sum(1 for result in results if result.removed)} of {len(results)} visual(s) slimmed, {saved:,} bytes saved; report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,10 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Iterable, List, Sequence, Tuple
 
+from output_writer import open_output, write_text_if_changed
+from pipeline_metrics import MetricsLog, add_metrics_arguments, metrics_log_from_args, record_rows
+from theme_schema import DEFAULT_CACHE_DIR, UNKNOWN_THEMEABILITY, SchemaPropertyIndex, load_property_index
+
 
 TARGET_VISUALS = {
     "tableEx": "Table",
@@ -127,7 +131,9 @@ def gather_styles(
             }
             styles[style_key]["display_name"] = style_label(style_key)
 
+    row_count = 0
     for row in catalog_rows:
+        row_count += 1
         visual_type = row.get("visual_type", "")
         if visual_type not in TARGET_VISUALS:
             continue
@@ -139,6 +145,7 @@ def gather_styles(
         if key:
             catalog_attributes[style_label(style_key)][key].update([row.get("attribute_value", "")])
 
+    record_rows(row_count)
     return styles, catalog_attributes
 
 
@@ -149,7 +156,6 @@ def style_label(style_key: Tuple[str, str]) -> str:
 
 
 def write_styles_json(styles: Dict[Tuple[str, str], Dict[str, object]], output_path: Path) -> None:
-    output_path.parent.mkdir(parents=True, exist_ok=True)
     data = []
     for style_key, info in sorted(styles.items(), key=lambda item: style_label(item[0])):
         data.append(
@@ -161,16 +167,18 @@ def write_styles_json(styles: Dict[Tuple[str, str], Dict[str, object]], output_p
                 "theme_attribute_count": len(info.get("attributes", {})),
             }
         )
-    with output_path.open("w", encoding="utf-8") as handle:
-        json.dump(data, handle, indent=2)
+    write_text_if_changed(output_path, json.dumps(data, indent=2))
 
 
 def write_attributes_csv(
     styles: Dict[Tuple[str, str], Dict[str, object]],
     catalog_attributes: Dict[str, Dict[str, Counter]],
     output_path: Path,
+    properties: SchemaPropertyIndex | None = None,
 ) -> None:
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    def themeable(visual_type: str, key: str) -> str:
+        return properties.classify(visual_type, key) if properties is not None else UNKNOWN_THEMEABILITY
+
     fieldnames = [
         "visual_type",
         "style_variant",
@@ -180,8 +188,9 @@ def write_attributes_csv(
         "source",
         "count",
         "example_value",
+        "themeable",
     ]
-    with output_path.open("w", encoding="utf-8", newline="") as handle:
+    with open_output(output_path, newline="") as handle:
         writer = csv.DictWriter(handle, fieldnames=fieldnames)
         writer.writeheader()
         for style_key, info in sorted(styles.items(), key=lambda item: style_label(item[0])):
@@ -198,6 +207,7 @@ def write_attributes_csv(
                         "source": "theme",
                         "count": 1,
                         "example_value": value,
+                        "themeable": themeable(style_key[0], key),
                     }
                 )
             # Catalog attributes
@@ -215,6 +225,7 @@ def write_attributes_csv(
                         "source": "catalog",
                         "count": sum(counter.values()),
                         "example_value": sample_value,
+                        "themeable": themeable(style_key[0], key),
                     }
                 )
 
@@ -225,8 +236,6 @@ def build_markdown_report(
     output_path: Path,
     theme_present: bool,
 ) -> None:
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
     columns = [info.get("display_name") or style_label(key) for key, info in sorted(styles.items(), key=lambda item: style_label(item[0]))]
     attribute_keys = set()
     for info in styles.values():
@@ -282,19 +291,17 @@ def build_markdown_report(
         lines.append("")
         lines.append("> Note: The current Rainwater theme does not define explicit table or matrix style blocks; all attributes above originate from catalog observations.")
 
-    output_path.write_text("\n".join(lines), encoding="utf-8")
-
-
-def main(argv: Sequence[str] | None = None) -> None:
-    parser = argparse.ArgumentParser(description="Generate table/matrix style attribute report.")
-    parser.add_argument("--prompt", type=Path, default=Path("docs/prompts/table_matrix_style_report.xml"))
-    args = parser.parse_args(argv)
+    write_text_if_changed(output_path, "\n".join(lines))
 
-    config = load_prompt(args.prompt.resolve())
-    theme_data = json.loads(config.theme_path.read_text(encoding="utf-8"))
-    catalog_rows = load_catalog_rows(config.catalog_json_path)
 
-    styles, catalog_attributes = gather_styles(theme_data, catalog_rows)
+def generate_report(
+    config: PromptConfig,
+    theme_data: Dict[str, object],
+    catalog_rows: Iterable[Dict[str, str]],
+    metrics: MetricsLog | None = None,
+) -> None:
+    metrics = metrics or MetricsLog()
+    styles, catalog_attributes = metrics.run("gather_styles", gather_styles, theme_data, catalog_rows)
 
     styles_json = config.outputs.get("table_matrix_style_styles.json")
     attributes_csv = config.outputs.get("table_matrix_style_attributes.csv")
@@ -303,11 +310,46 @@ def main(argv: Sequence[str] | None = None) -> None:
     if not styles_json or not attributes_csv or not markdown_path:
         raise ValueError("Output paths missing in prompt outputs block.")
 
-    write_styles_json(styles, styles_json)
-    write_attributes_csv(styles, catalog_attributes, attributes_csv)
     theme_present = any("theme" in info.get("sources", set()) for info in styles.values())
+    properties = load_property_index(config.schema_path, config.repo_root / DEFAULT_CACHE_DIR)
+    metrics.run(
+        "write_report",
+        write_report_files,
+        styles,
+        catalog_attributes,
+        (styles_json, attributes_csv, markdown_path),
+        theme_present,
+        properties,
+        outputs=[styles_json, attributes_csv, markdown_path],
+    )
+
+
+def write_report_files(
+    styles: Dict[Tuple[str, str], Dict[str, object]],
+    catalog_attributes: Dict[str, Dict[str, Counter]],
+    paths: Tuple[Path, Path, Path],
+    theme_present: bool,
+    properties: SchemaPropertyIndex | None = None,
+) -> None:
+    styles_json, attributes_csv, markdown_path = paths
+    write_styles_json(styles, styles_json)
+    write_attributes_csv(styles, catalog_attributes, attributes_csv, properties)
     build_markdown_report(styles, catalog_attributes, markdown_path, theme_present)
 
 
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate table/matrix style attribute report.")
+    parser.add_argument("--prompt", type=Path, default=Path("docs/prompts/table_matrix_style_report.xml"))
+    add_metrics_arguments(parser)
+    args = parser.parse_args(argv)
+
+    metrics = metrics_log_from_args(args)
+    config = load_prompt(args.prompt.resolve())
+    theme_data = json.loads(config.theme_path.read_text(encoding="utf-8"))
+    catalog_rows = load_catalog_rows(config.catalog_json_path)
+    generate_report(config, theme_data, catalog_rows, metrics)
+    metrics.save()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""Apply a custom theme to many PBIR reports, writing only the files whose bytes change."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from output_writer import open_output, write_bytes_if_changed, write_text_if_changed
+from pbir_scanner import find_report_roots
+from strip_visual_overrides import load_json_literals, render_visual
+from theme_cascade import THEME_FOLDERS
+
+APPLY_LOG_FIELDS = ["report_path", "old_theme", "new_theme", "theme_resource", "report_json", "removed", "error"]
+
+REGISTERED = "RegisteredResources"
+WRITTEN = "written"
+UNCHANGED = "unchanged"
+PLANNED = "planned"
+
+
+@dataclass
+class ApplyResult:
+    report_path: str
+    old_theme: str = ""
+    new_theme: str = ""
+    theme_resource: str = UNCHANGED
+    report_json: str = UNCHANGED
+    removed: str = ""
+    error: str = ""
+
+    @property
+    def changed(self) -> bool:
+        return self.theme_resource != UNCHANGED or self.report_json != UNCHANGED or bool(self.removed)
+
+
+def resource_name(theme_path: Path, theme_bytes: bytes) -> str:
+    """Name a registered theme like Power BI Desktop (theme name plus digits), stable for the same bytes."""
+    try:
+        data = json.loads(theme_bytes.decode("utf-8-sig"))
+    except (UnicodeDecodeError, ValueError):
+        data = {}
+    name = data.get("name") if isinstance(data, dict) else None
+    stem = re.sub(r"[^A-Za-z0-9_]", "", str(name or theme_path.stem)) or "Theme"
+    digits = int(hashlib.sha256(theme_bytes).hexdigest(), 16) % 10**14
+    return f"{stem}{digits:014d}.json"
+
+
+def point_report_at_theme(report: Dict[str, object], name: str) -> Tuple[Dict[str, object], str]:
+    """Return ``report.json`` data naming ``name`` as the registered custom theme, and the previous name."""
+    collection = report.setdefault("themeCollection", {})
+    custom = collection.get("customTheme")
+    old_name = ""
+    if isinstance(custom, dict) and custom.get("type", REGISTERED) == REGISTERED:
+        old_name = str(custom.get("name") or "")
+    base = collection.get("baseTheme") if isinstance(collection.get("baseTheme"), dict) else {}
+    if not isinstance(custom, dict):
+        custom = {"name": name, "reportVersionAtImport": base.get("reportVersionAtImport", {}), "type": REGISTERED}
+    collection["customTheme"] = {**custom, "name": name, "type": REGISTERED}
+
+    packages = report.setdefault("resourcePackages", [])
+    package = next((item for item in packages if isinstance(item, dict) and item.get("type") == REGISTERED), None)
+    if package is None:
+        package = {"name": REGISTERED, "type": REGISTERED, "items": []}
+        packages.append(package)
+    items = package.setdefault("items", [])
+    swapped = old_name if old_name != name else ""
+    previous = next((item for item in items if isinstance(item, dict) and swapped and item.get("name") == swapped), None)
+    if any(isinstance(item, dict) and item.get("name") == name for item in items):
+        if previous is not None:
+            items.remove(previous)
+    elif previous is not None:
+        previous.update({"name": name, "path": name})
+    else:
+        items.append({"name": name, "path": name, "type": "CustomTheme"})
+    return report, old_name
+
+
+def apply_to_report(
+    report_root: Path, label: str, theme_bytes: bytes, name: str, keep_old: bool = False, dry_run: bool = False
+) -> ApplyResult:
+    result = ApplyResult(report_path=label, new_theme=name)
+    report_json = report_root / "definition" / "report.json"
+    try:
+        original_text = report_json.read_bytes().decode("utf-8-sig")
+        report = load_json_literals(original_text)
+    except (OSError, UnicodeDecodeError, ValueError) as exc:
+        result.error = str(exc)
+        return result
+    if not isinstance(report, dict):
+        result.error = "report.json root is not an object"
+        return result
+
+    before = json.dumps(report, sort_keys=True)
+    report, result.old_theme = point_report_at_theme(report, name)
+    resources = report_root / THEME_FOLDERS[REGISTERED]
+    target = resources / name
+    old_path = resources / result.old_theme if result.old_theme and result.old_theme != name else None
+
+    if dry_run:
+        result.theme_resource = UNCHANGED if target.exists() and target.read_bytes() == theme_bytes else PLANNED
+        result.report_json = PLANNED if json.dumps(report, sort_keys=True) != before else UNCHANGED
+        result.removed = old_path.name if old_path is not None and not keep_old and old_path.exists() else ""
+        return result
+
+    # Resource first, then the reference, so report.json never names a theme that is not on disk.
+    if write_bytes_if_changed(target, theme_bytes):
+        result.theme_resource = WRITTEN
+    if json.dumps(report, sort_keys=True) != before and write_bytes_if_changed(
+        report_json, render_visual(report, original_text).encode("utf-8")
+    ):
+        result.report_json = WRITTEN
+    if old_path is not None and not keep_old and old_path.exists():
+        old_path.unlink()
+        result.removed = old_path.name
+    return result
+
+
+def _apply_task(task: Tuple[str, str, bytes, str, bool, bool]) -> ApplyResult:
+    report_root, label, theme_bytes, name, keep_old, dry_run = task
+    return apply_to_report(Path(report_root), label, theme_bytes, name, keep_old, dry_run)
+
+
+def apply_theme(
+    paths: Sequence[Path],
+    theme_path: Path,
+    repo_root: Path,
+    name: str | None = None,
+    keep_old: bool = False,
+    dry_run: bool = False,
+    workers: int | None = None,
+) -> List[ApplyResult]:
+    """Install ``theme_path`` as the registered custom theme of every report under ``paths``."""
+    theme_bytes = theme_path.read_bytes()
+    name = name or resource_name(theme_path, theme_bytes)
+    tasks: List[Tuple[str, str, bytes, str, bool, bool]] = []
+    for report_root in find_report_roots(paths):
+        try:
+            label = report_root.relative_to(repo_root).as_posix()
+        except ValueError:
+            label = report_root.as_posix()
+        tasks.append((str(report_root), label, theme_bytes, name, keep_old, dry_run))
+
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            return list(executor.map(_apply_task, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    return [_apply_task(task) for task in tasks]
+
+
+def write_apply_log(results: Sequence[ApplyResult], path: Path) -> None:
+    with open_output(path, newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=APPLY_LOG_FIELDS)
+        writer.writeheader()
+        writer.writerows(asdict(result) for result in results)
+
+
+def render_apply_report(results: Sequence[ApplyResult], theme_label: str, dry_run: bool) -> str:
+    lines: List[str] = []
+    lines.append("# Theme Apply Report")
+    lines.append("")
+    lines.append(f"Theme: `{theme_label}`" + (" (dry run, nothing written)" if dry_run else ""))
+    lines.append("")
+    failed = [result for result in results if result.error]
+    changed = [result for result in results if result.changed and not result.error]
+    lines.append(f"- Reports: {len(results)}")
+    lines.append(f"- Reports changed: {len(changed)}")
+    lines.append(f"- Reports already on this theme: {len(results) - len(changed) - len(failed)}")
+    lines.append(f"- Reports failed: {len(failed)}")
+    lines.append("")
+    lines.append("| Report | Previous Theme | Theme Resource | report.json | Removed |")
+    lines.append("| --- | --- | --- | --- | --- |")
+    for result in changed:
+        lines.append(
+            f"| {result.report_path} | {result.old_theme or '—'} | {result.theme_resource} | {result.report_json} | {result.removed or '—'} |"
+        )
+    if not changed:
+        lines.append("| — | — | — | — | — |")
+    if failed:
+        lines.append("")
+        lines.append("## Reports Not Updated")
+        lines.append("")
+        lines.extend(f"- {result.report_path}: {result.error}" for result in failed)
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Apply a custom theme to every PBIR report under the given folders.")
+    parser.add_argument("theme", type=Path, help="Theme JSON to register as each report's custom theme.")
+    parser.add_argument("reports", nargs="+", type=Path, help="Report folders or directories containing reports.")
+    parser.add_argument("--repo-root", type=Path, default=Path(__file__).resolve().parents[2])
+    parser.add_argument("--name", default=None, help="Registered resource file name (default: theme name plus digits).")
+    parser.add_argument("--keep-old", action="store_true", help="Leave the previous custom theme resource on disk.")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing.")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--log", type=Path, default=Path("reports/datasets/theme_apply_log.csv"))
+    parser.add_argument("--report", type=Path, default=Path("reports/summaries/theme_apply_report.md"))
+    args = parser.parse_args(argv)
+
+    results = apply_theme(
+        args.reports,
+        args.theme,
+        args.repo_root.resolve(),
+        name=args.name,
+        keep_old=args.keep_old,
+        dry_run=args.dry_run,
+        workers=args.workers,
+    )
+    write_apply_log(results, args.log)
+    write_text_if_changed(args.report, render_apply_report(results, args.theme.as_posix(), args.dry_run))
+    changed = sum(1 for result in results if result.changed and not result.error)
+    print(f"{changed} of {len(results)} report(s) {'would change' if args.dry_run else 'changed'}; report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
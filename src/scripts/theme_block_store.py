@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Content-addressed store of canonical ``visualStyles`` blocks shared across the theme corpus."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from output_writer import write_bytes_if_changed, write_text_if_changed
+from pbir_scanner import FileStamp
+from theme_recommendations import markdown_cell
+from theme_rules import collect_theme_files
+
+DEFAULT_STORE = Path("reports/datasets/style_block_store")
+DEFAULT_THEMES = Path("themes/outputs")
+
+
+@dataclass(frozen=True)
+class BlockRef:
+    theme: str
+    visual_type: str
+    preset: str
+
+
+@dataclass
+class IndexedTheme:
+    stamp: FileStamp
+    blocks: List[Tuple[str, str, str]]
+
+
+def canonical_block(block: object) -> bytes:
+    """Key-sorted compact JSON, so blocks that differ only in key order or whitespace share a digest."""
+    return json.dumps(block, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def block_digest(canonical: bytes) -> str:
+    return hashlib.sha256(canonical).hexdigest()
+
+
+class BlockStore:
+    """Unique style blocks stored once under ``blocks/<aa>/<sha256>.json`` plus a per-theme index.
+
+    ``index.json`` records each theme's size, mtime and SHA-256 with its (visual type, preset,
+    digest) triples, so re-indexing reparses only themes that changed and every query runs over
+    digests rather than file contents.
+    """
+
+    VERSION = 1
+
+    def __init__(self, root: Path, themes: Dict[str, IndexedTheme] | None = None) -> None:
+        self.root = root
+        self.themes: Dict[str, IndexedTheme] = themes or {}
+        self._users: Dict[str, List[BlockRef]] | None = None
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / "index.json"
+
+    @classmethod
+    def load(cls, root: Path) -> "BlockStore":
+        try:
+            data = json.loads((root / "index.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(root)
+        if not isinstance(data, dict) or data.get("version") != cls.VERSION:
+            return cls(root)
+        themes = {
+            name: IndexedTheme(FileStamp(*entry["stamp"]), [tuple(block) for block in entry["blocks"]])
+            for name, entry in data.get("themes", {}).items()
+        }
+        return cls(root, themes)
+
+    def save(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": self.VERSION,
+            "themes": {
+                name: {
+                    "stamp": [entry.stamp.size, entry.stamp.mtime_ns, entry.stamp.sha256],
+                    "blocks": [list(block) for block in entry.blocks],
+                }
+                for name, entry in sorted(self.themes.items())
+            },
+        }
+        write_text_if_changed(self.index_path, json.dumps(payload, indent=2))
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / "blocks" / digest[:2] / f"{digest}.json"
+
+    def put(self, block: object) -> str:
+        canonical = canonical_block(block)
+        digest = block_digest(canonical)
+        path = self.blob_path(digest)
+        if not path.exists():
+            write_bytes_if_changed(path, canonical)
+        return digest
+
+    def get(self, digest: str) -> object:
+        return json.loads(self.blob_path(digest).read_text(encoding="utf-8"))
+
+    def index_theme(self, path: Path, label: str) -> bool:
+        """Index one theme file; returns ``False`` when the recorded stamp shows it is unchanged."""
+        stat = path.stat()
+        previous = self.themes.get(label)
+        if previous is not None and stat.st_size == previous.stamp.size and stat.st_mtime_ns == previous.stamp.mtime_ns:
+            return False
+        raw = path.read_bytes()
+        sha256 = hashlib.sha256(raw).hexdigest()
+        if previous is not None and sha256 == previous.stamp.sha256:
+            previous.stamp.mtime_ns = stat.st_mtime_ns
+            return False
+        try:
+            data = json.loads(raw.decode("utf-8-sig"))
+        except (UnicodeDecodeError, ValueError):
+            data = None
+        styles = data.get("visualStyles") if isinstance(data, dict) else None
+        blocks: List[Tuple[str, str, str]] = []
+        for visual_type, presets in (styles.items() if isinstance(styles, dict) else []):
+            if isinstance(presets, dict):
+                for preset, block in presets.items():
+                    blocks.append((visual_type, preset, self.put(block)))
+        self.themes[label] = IndexedTheme(FileStamp(stat.st_size, stat.st_mtime_ns, sha256), blocks)
+        self._users = None
+        return True
+
+    def update(self, paths: Iterable[Path], repo_root: Path) -> Dict[str, int]:
+        """Index theme files under ``paths`` and forget indexed themes that no longer exist."""
+        indexed = unchanged = 0
+        for path in collect_theme_files(paths):
+            try:
+                label = path.relative_to(repo_root).as_posix()
+            except ValueError:
+                label = path.as_posix()
+            if self.index_theme(path, label):
+                indexed += 1
+            else:
+                unchanged += 1
+        missing = [label for label in self.themes if not (repo_root / label).exists()]
+        for label in missing:
+            del self.themes[label]
+        if missing:
+            self._users = None
+        return {"indexed": indexed, "unchanged": unchanged, "removed": len(missing)}
+
+    def users(self) -> Dict[str, List[BlockRef]]:
+        """Reverse index: digest -> every (theme, visual type, preset) holding that exact block."""
+        if self._users is None:
+            users: Dict[str, List[BlockRef]] = defaultdict(list)
+            for theme, entry in sorted(self.themes.items()):
+                for visual_type, preset, digest in entry.blocks:
+                    users[digest].append(BlockRef(theme, visual_type, preset))
+            self._users = dict(users)
+        return self._users
+
+    def find(self, digest: str) -> List[BlockRef]:
+        """Users of a digest; a unique prefix (as printed in reports) is accepted."""
+        users = self.users()
+        if digest in users:
+            return users[digest]
+        matches = [full for full in users if full.startswith(digest)]
+        return users[matches[0]] if len(matches) == 1 else []
+
+    def lookup(self, theme: str, visual_type: str, preset: str = "*") -> str | None:
+        entry = self.themes.get(theme)
+        if entry is None:
+            return None
+        return next((digest for block_type, block_preset, digest in entry.blocks if (block_type, block_preset) == (visual_type, preset)), None)
+
+    def prune(self) -> int:
+        """Delete stored blocks no indexed theme references."""
+        referenced = set(self.users())
+        removed = 0
+        for path in (self.root / "blocks").glob("*/*.json"):
+            if path.stem not in referenced:
+                path.unlink()
+                removed += 1
+        return removed
+
+
+def render_store_report(store: BlockStore, limit: int = 25) -> str:
+    users = store.users()
+    total_blocks = sum(len(refs) for refs in users.values())
+    sizes = {digest: store.blob_path(digest).stat().st_size for digest in users}
+    unique_bytes = sum(sizes.values())
+    total_bytes = sum(sizes[digest] * len(refs) for digest, refs in users.items())
+    shared = sorted(
+        ((digest, refs) for digest, refs in users.items() if len({ref.theme for ref in refs}) > 1),
+        key=lambda item: (-sizes[item[0]] * (len(item[1]) - 1), item[0]),
+    )
+    lines: List[str] = []
+    lines.append("# Style Block Store")
+    lines.append("")
+    lines.append(f"- Themes indexed: {len(store.themes)}")
+    lines.append(f"- Style blocks (visual type / preset): {total_blocks}")
+    lines.append(f"- Unique blocks stored: {len(users)}")
+    lines.append(f"- Canonical bytes: {unique_bytes:,} stored for {total_bytes:,} referenced ({1 - unique_bytes / total_bytes if total_bytes else 0.0:.1%} deduplicated)")
+    lines.append(f"- Blocks shared by more than one theme: {len(shared)}")
+    lines.append("")
+    lines.append("## Most Shared Blocks")
+    lines.append("")
+    lines.append("| Digest | Visual Type / Preset | Themes | Bytes | Used By |")
+    lines.append("| --- | --- | ---: | ---: | --- |")
+    for digest, refs in shared[:limit]:
+        slots = sorted({f"{ref.visual_type}/{ref.preset}" for ref in refs})
+        themes = sorted({ref.theme for ref in refs})
+        lines.append(
+            f"| `{digest[:12]}` | {markdown_cell(', '.join(slots))} | {len(themes)} | {sizes[digest]:,} | {markdown_cell(', '.join(Path(theme).name for theme in themes), 120)} |"
+        )
+    if not shared:
+        lines.append("| — | — | 0 | 0 | — |")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Index theme style blocks into a content-addressed store and query shared blocks.")
+    parser.add_argument("themes", nargs="*", type=Path, default=[DEFAULT_THEMES], help="Theme files or folders to index.")
+    parser.add_argument("--repo-root", type=Path, default=Path(__file__).resolve().parents[2])
+    parser.add_argument("--store", type=Path, default=DEFAULT_STORE)
+    parser.add_argument("--report", type=Path, default=Path("reports/summaries/style_block_store.md"))
+    parser.add_argument("--prune", action="store_true", help="Delete stored blocks no indexed theme references.")
+    parser.add_argument("--digest", default=None, help="List the themes that use this block digest (or unique prefix).")
+    parser.add_argument("--theme", default=None, help="With --visual-type: list the themes sharing this theme's block.")
+    parser.add_argument("--visual-type", default=None)
+    parser.add_argument("--preset", default="*")
+    args = parser.parse_args(argv)
+
+    repo_root = args.repo_root.resolve()
+    store = BlockStore.load(args.store)
+    stats = store.update(args.themes, repo_root)
+    store.save()
+    pruned = store.prune() if args.prune else 0
+    write_text_if_changed(args.report, render_store_report(store))
+    print(
+        f"Indexed {stats['indexed']} theme(s), {stats['unchanged']} unchanged, {stats['removed']} removed; "
+        f"{len(store.users())} unique block(s), {pruned} pruned; report written to {args.report}"
+    )
+
+    digest = args.digest
+    if args.theme is not None and args.visual_type is not None:
+        theme = Path(args.theme).resolve()
+        label = theme.relative_to(repo_root).as_posix() if theme.is_relative_to(repo_root) else args.theme
+        digest = store.lookup(label, args.visual_type, args.preset)
+        if digest is None:
+            print(f"No {args.visual_type}/{args.preset} block indexed for {label}")
+            return
+    if digest is not None:
+        refs = store.find(digest)
+        print(f"{len(refs)} use(s) of block {digest[:12]}:")
+        for ref in refs:
+            print(f"  {ref.theme}  {ref.visual_type}/{ref.preset}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""Resolve effective visual property values through the base theme, custom theme and visual overrides."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import fnmatch
+import json
+from collections import ChainMap
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+from output_writer import open_output
+from pbir_scanner import (
+    describe_expr,
+    find_report_roots,
+    flatten_visual_objects,
+    iter_visual_files,
+    report_label,
+    stringify_scalar,
+)
+
+GLOBAL = "*"
+DEFAULT_PRESET = "*"
+
+EFFECTIVE_FIELDNAMES = [
+    "report_path",
+    "page_id",
+    "visual_id",
+    "visual_type",
+    "style_preset",
+    "attribute_key",
+    "effective_value",
+    "value_type",
+    "source",
+]
+
+THEME_FOLDERS = {
+    "SharedResources": Path("StaticResources/SharedResources/BaseThemes"),
+    "RegisteredResources": Path("StaticResources/RegisteredResources"),
+}
+DEFAULT_BASE_THEME = Path("themes/samples/spend_cube_report/StaticResources/SharedResources/BaseThemes/CY24SU10.json")
+
+
+@dataclass(frozen=True)
+class ResolvedValue:
+    """An effective property value and the layer that supplied it (``visual``, ``custom:<type>/<preset>``...)."""
+
+    value: str
+    value_type: str
+    source: str
+
+
+StyleBlock = Dict[str, ResolvedValue]
+
+
+def theme_entry_card(card_name: str, entry: Dict[str, object]) -> str:
+    """Card label matching ``pbir_scanner.format_selector``: a theme ``$id`` maps to ``[id=...]``."""
+    selector_id = entry.get("$id")
+    return f"{card_name}[id={selector_id}]" if selector_id is not None else card_name
+
+
+def flatten_style_block(block: object, source: str) -> StyleBlock:
+    """Flatten one ``visualStyles[type][preset]`` block into catalog-style ``card.property`` keys."""
+    flattened: StyleBlock = {}
+    if not isinstance(block, dict):
+        return flattened
+
+    def walk(node: object, parts: List[str]) -> None:
+        if isinstance(node, dict):
+            for key, child in node.items():
+                walk(child, parts + [key])
+            return
+        value, value_type = stringify_scalar(node)
+        flattened[".".join(parts)] = ResolvedValue(value, value_type, source)
+
+    for card_name, entries in block.items():
+        for entry in entries if isinstance(entries, list) else [entries]:
+            if not isinstance(entry, dict):
+                continue
+            card = theme_entry_card(card_name, entry)
+            for prop_name, prop_value in entry.items():
+                if prop_name != "$id":
+                    walk(prop_value, [card, prop_name])
+    return flattened
+
+
+@lru_cache(maxsize=None)
+def _load_theme_styles(path: str, size: int, mtime_ns: int) -> Dict[Tuple[str, str], Dict[str, object]]:
+    data = json.loads(Path(path).read_text(encoding="utf-8-sig"))
+    styles = data.get("visualStyles", {}) if isinstance(data, dict) else {}
+    blocks: Dict[Tuple[str, str], Dict[str, object]] = {}
+    for visual_type, presets in styles.items():
+        if isinstance(presets, dict):
+            for preset, block in presets.items():
+                blocks[(visual_type, preset)] = block
+    return blocks
+
+
+def load_theme_styles(path: Path | None) -> Dict[Tuple[str, str], Dict[str, object]]:
+    """Return ``{(visual type, preset): block}`` for a theme file, parsed once per file version."""
+    if path is None or not path.exists():
+        return {}
+    stat = path.stat()
+    return _load_theme_styles(str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+
+
+class ThemeCascade:
+    """Effective values for (visual type, style preset, card, property) across the theme layers.
+
+    The custom theme is merged over the base theme block by block; the merged blocks then
+    cascade ``*/*`` < ``<type>/*`` < ``<type>/<preset>``, and a visual's own objects win over
+    all of them. Flattened blocks and resolved (type, preset) layers are memoized, so bulk
+    queries cost one dictionary lookup per property after the first visual of each type.
+    """
+
+    def __init__(
+        self,
+        base: Dict[Tuple[str, str], Dict[str, object]] | None = None,
+        custom: Dict[Tuple[str, str], Dict[str, object]] | None = None,
+    ) -> None:
+        self.themes = (("base", base or {}), ("custom", custom or {}))
+        self._blocks: Dict[Tuple[str, str, str], StyleBlock] = {}
+        self._layers: Dict[Tuple[str, str], Mapping[str, ResolvedValue]] = {}
+
+    @classmethod
+    def from_files(cls, base_path: Path | None, custom_path: Path | None) -> "ThemeCascade":
+        return cls(load_theme_styles(base_path), load_theme_styles(custom_path))
+
+    def block(self, theme: str, visual_type: str, preset: str) -> StyleBlock:
+        key = (theme, visual_type, preset)
+        flattened = self._blocks.get(key)
+        if flattened is None:
+            blocks = dict(self.themes)[theme]
+            flattened = flatten_style_block(blocks.get((visual_type, preset)), f"{theme}:{visual_type}/{preset}")
+            self._blocks[key] = flattened
+        return flattened
+
+    def preset_known(self, visual_type: str, preset: str) -> bool:
+        return any((visual_type, preset) in blocks for _, blocks in self.themes)
+
+    def layer(self, visual_type: str, preset: str = DEFAULT_PRESET) -> Mapping[str, ResolvedValue]:
+        """Theme-only effective values for a visual type and preset (an unknown preset falls back to ``*``)."""
+        if preset != DEFAULT_PRESET and not self.preset_known(visual_type, preset):
+            preset = DEFAULT_PRESET
+        key = (visual_type, preset)
+        resolved = self._layers.get(key)
+        if resolved is None:
+            levels = [(GLOBAL, DEFAULT_PRESET)]
+            if visual_type != GLOBAL:
+                levels.append((visual_type, DEFAULT_PRESET))
+            if preset != DEFAULT_PRESET:
+                levels.append((visual_type, preset))
+            merged: Dict[str, ResolvedValue] = {}
+            for level_type, level_preset in levels:
+                for theme, _ in self.themes:
+                    merged.update(self.block(theme, level_type, level_preset))
+            resolved = merged
+            self._layers[key] = resolved
+        return resolved
+
+    def effective(
+        self, visual_type: str, preset: str = DEFAULT_PRESET, overrides: Mapping[str, ResolvedValue] | None = None
+    ) -> Mapping[str, ResolvedValue]:
+        """Effective values with ``overrides`` (a visual's own objects) on top, without copying the layer."""
+        layer = self.layer(visual_type, preset)
+        return ChainMap(overrides, layer) if overrides else layer
+
+    def resolve(
+        self,
+        visual_type: str,
+        attribute_key: str,
+        preset: str = DEFAULT_PRESET,
+        overrides: Mapping[str, ResolvedValue] | None = None,
+    ) -> ResolvedValue | None:
+        """Effective value of ``card.property``; ``[...]`` selectors fall back to the plain card, then ``*``."""
+        values = self.effective(visual_type, preset, overrides)
+        for candidate in candidate_keys(attribute_key):
+            found = values.get(candidate)
+            if found is not None:
+                return found
+        return None
+
+
+def split_card(attribute_key: str) -> Tuple[str, str]:
+    """Split ``card[selector].property`` at the first dot outside a selector."""
+    depth = 0
+    for position, char in enumerate(attribute_key):
+        if char == "[":
+            depth += 1
+        elif char == "]" and depth:
+            depth -= 1
+        elif char == "." and depth == 0:
+            return attribute_key[:position], attribute_key[position + 1 :]
+    return attribute_key, ""
+
+
+def candidate_keys(attribute_key: str) -> List[str]:
+    card, rest = split_card(attribute_key)
+    candidates = [attribute_key]
+    plain = card.split("[", 1)[0]
+    if plain != card:
+        candidates.append(f"{plain}.{rest}")
+    if plain != GLOBAL and rest:
+        candidates.append(f"{GLOBAL}.{rest}")
+    return candidates
+
+
+def report_theme_paths(report_root: Path) -> Tuple[Path | None, Path | None]:
+    """Return (base theme, custom theme) files named in ``definition/report.json``'s ``themeCollection``."""
+    report_json = report_root / "definition" / "report.json"
+    try:
+        data = json.loads(report_json.read_text(encoding="utf-8-sig"))
+    except (OSError, ValueError):
+        return None, None
+    collection = data.get("themeCollection", {}) if isinstance(data, dict) else {}
+
+    def theme_path(entry: object) -> Path | None:
+        if not isinstance(entry, dict) or not entry.get("name"):
+            return None
+        folder = THEME_FOLDERS.get(str(entry.get("type")), THEME_FOLDERS["RegisteredResources"])
+        path = report_root / folder / str(entry["name"])
+        # Base themes are referenced by name only ("CY24SU10"); the file carries the extension.
+        return path if path.suffix == ".json" else path.with_name(path.name + ".json")
+
+    return theme_path(collection.get("baseTheme")), theme_path(collection.get("customTheme"))
+
+
+def visual_style_preset(visual: Dict[str, object]) -> str:
+    objects = visual.get("objects")
+    entries = objects.get("stylePreset") if isinstance(objects, dict) else None
+    for entry in entries if isinstance(entries, list) else []:
+        name = (entry.get("properties") or {}).get("name") if isinstance(entry, dict) else None
+        if isinstance(name, dict) and "expr" in name:
+            value, _ = describe_expr(name["expr"])
+            return value or DEFAULT_PRESET
+    return DEFAULT_PRESET
+
+
+def visual_overrides(visual: Dict[str, object]) -> Dict[str, ResolvedValue]:
+    return {
+        path: ResolvedValue(value, value_type, "visual")
+        for path, _, value, value_type in flatten_visual_objects(visual)
+    }
+
+
+def resolve_report(
+    report_root: Path,
+    repo_root: Path,
+    custom_theme: Path | None = None,
+    key_patterns: Sequence[str] = (),
+    visual_types: Sequence[str] = (),
+) -> Iterator[Dict[str, str]]:
+    """Yield one row per (visual, effective property) for every visual in a PBIR report.
+
+    ``custom_theme`` replaces the report's registered custom theme, which answers "what would
+    this report look like under another theme" without touching the report.
+    """
+    base_path, report_custom = report_theme_paths(report_root)
+    cascade = ThemeCascade.from_files(base_path, custom_theme or report_custom)
+    patterns = [pattern.lower() for pattern in key_patterns]
+    report_path = report_label(report_root, repo_root)
+    for visual_path in iter_visual_files(report_root):
+        try:
+            data = json.loads(visual_path.read_text(encoding="utf-8-sig"))
+        except (OSError, ValueError):
+            continue
+        visual = data.get("visual") if isinstance(data, dict) else None
+        if not isinstance(visual, dict) or not visual.get("visualType"):
+            continue
+        visual_type = str(visual["visualType"])
+        if visual_types and visual_type not in visual_types:
+            continue
+        preset = visual_style_preset(visual)
+        values = cascade.effective(visual_type, preset, visual_overrides(visual))
+        for attribute_key in sorted(values):
+            if patterns and not any(fnmatch.fnmatchcase(attribute_key.lower(), pattern) for pattern in patterns):
+                continue
+            resolved = values[attribute_key]
+            yield {
+                "report_path": report_path,
+                "page_id": visual_path.parents[2].name,
+                "visual_id": data.get("name") or visual_path.parent.name,
+                "visual_type": visual_type,
+                "style_preset": preset,
+                "attribute_key": attribute_key,
+                "effective_value": resolved.value,
+                "value_type": resolved.value_type,
+                "source": resolved.source,
+            }
+
+
+def write_effective_csv(rows: Iterable[Dict[str, str]], output_path: Path) -> int:
+    count = 0
+    with open_output(output_path, newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=EFFECTIVE_FIELDNAMES)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Resolve effective visual property values through the theme cascade.")
+    parser.add_argument("reports", nargs="+", type=Path, help="Report folders or directories containing reports.")
+    parser.add_argument("--repo-root", type=Path, default=Path(__file__).resolve().parents[2])
+    parser.add_argument("--theme", type=Path, default=None, help="Resolve against this custom theme instead of each report's own.")
+    parser.add_argument("--key", dest="keys", action="append", default=[], help="Only emit attribute keys matching this glob (repeatable).")
+    parser.add_argument("--visual-type", dest="visual_types", action="append", default=[], help="Only emit this visual type (repeatable).")
+    parser.add_argument("--output", type=Path, default=Path("reports/spend_cube/effective_properties.csv"))
+    args = parser.parse_args(argv)
+
+    repo_root = args.repo_root.resolve()
+    rows = (
+        row
+        for report_root in find_report_roots(args.reports)
+        for row in resolve_report(report_root, repo_root, args.theme, args.keys, args.visual_types)
+    )
+    count = write_effective_csv(rows, args.output)
+    print(f"Wrote {count} effective property rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Structural diff between theme versions using bottom-up subtree hashes."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from output_writer import open_output, write_text_if_changed
+from theme_recommendations import markdown_cell
+from theme_rules import collect_theme_files, stringify
+from theme_schema import pointer
+
+DIFF_FIELDS = ["from_theme", "to_theme", "visual_type", "change", "pointer", "old_value", "new_value"]
+TOP_LEVEL = "(top level)"
+CHANGE_KINDS = ("added", "removed", "changed")
+
+
+@dataclass(frozen=True)
+class HashNode:
+    """A JSON value with the digest of its whole subtree; containers keep hashed children by key or index."""
+
+    digest: bytes
+    value: object
+    children: Dict[str, "HashNode"] | None = None
+
+
+def hash_tree(node: object) -> HashNode:
+    """Hash bottom-up: objects by sorted key and child digest (key order is ignored), arrays in order."""
+    if isinstance(node, dict):
+        children = {str(key): hash_tree(child) for key, child in node.items()}
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(b"{")
+        for key in sorted(children):
+            digest.update(json.dumps(key).encode("utf-8"))
+            digest.update(children[key].digest)
+        return HashNode(digest.digest(), node, children)
+    if isinstance(node, list):
+        children = {str(index): hash_tree(child) for index, child in enumerate(node)}
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(b"[")
+        for child in children.values():
+            digest.update(child.digest)
+        return HashNode(digest.digest(), node, children)
+    encoded = json.dumps(node, ensure_ascii=False).encode("utf-8")
+    return HashNode(hashlib.blake2b(encoded, digest_size=16).digest(), node)
+
+
+@lru_cache(maxsize=None)
+def _load_hash_tree(path: str, size: int, mtime_ns: int) -> HashNode:
+    return hash_tree(json.loads(Path(path).read_text(encoding="utf-8-sig")))
+
+
+def load_hash_tree(path: Path) -> HashNode:
+    """Hash a theme file once per file version, so each revision is parsed once across a whole history."""
+    stat = path.stat()
+    return _load_hash_tree(str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+
+
+def pointer_visual_type(parts: Sequence[str]) -> str:
+    if len(parts) >= 2 and parts[0] == "visualStyles":
+        return parts[1]
+    return TOP_LEVEL
+
+
+@dataclass
+class PointerChange:
+    visual_type: str
+    change: str
+    pointer: str
+    old_value: object = None
+    new_value: object = None
+
+
+@dataclass
+class ThemeDiff:
+    from_theme: str
+    to_theme: str
+    changes: List[PointerChange] = field(default_factory=list)
+    nodes_compared: int = 0
+    error: str = ""
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """``{visual type: {added, removed, changed}}`` with top-level keys under ``(top level)``."""
+        grouped: Dict[str, Dict[str, int]] = {}
+        for item in self.changes:
+            grouped.setdefault(item.visual_type, dict.fromkeys(CHANGE_KINDS, 0))[item.change] += 1
+        return grouped
+
+
+def diff_trees(old: HashNode, new: HashNode) -> Tuple[List[PointerChange], int]:
+    """Changed pointers between two hashed trees, descending only into subtrees whose digests differ.
+
+    Added and removed subtrees are reported once at their root pointer; a scalar, or a value
+    whose JSON type changed, is reported as ``changed``. Returns the changes and the number of
+    node pairs compared.
+    """
+    changes: List[PointerChange] = []
+    compared = 0
+
+    def walk(left: HashNode, right: HashNode, parts: List[str]) -> None:
+        nonlocal compared
+        compared += 1
+        if left.digest == right.digest:
+            return
+        if (
+            left.children is None
+            or right.children is None
+            or isinstance(left.value, dict) != isinstance(right.value, dict)
+        ):
+            changes.append(
+                PointerChange(pointer_visual_type(parts), "changed", pointer(parts), left.value, right.value)
+            )
+            return
+        for key, child in left.children.items():
+            other = right.children.get(key)
+            if other is None:
+                changes.append(PointerChange(pointer_visual_type(parts + [key]), "removed", pointer(parts + [key]), child.value))
+            else:
+                walk(child, other, parts + [key])
+        for key, child in right.children.items():
+            if key not in left.children:
+                changes.append(
+                    PointerChange(pointer_visual_type(parts + [key]), "added", pointer(parts + [key]), None, child.value)
+                )
+
+    walk(old, new, [])
+    return changes, compared
+
+
+def diff_theme_files(old_path: Path, new_path: Path, old_label: str, new_label: str) -> ThemeDiff:
+    result = ThemeDiff(from_theme=old_label, to_theme=new_label)
+    try:
+        old, new = load_hash_tree(old_path), load_hash_tree(new_path)
+    except (OSError, UnicodeDecodeError, ValueError) as exc:
+        result.error = str(exc)
+        return result
+    result.changes, result.nodes_compared = diff_trees(old, new)
+    return result
+
+
+def natural_key(path: Path) -> List[object]:
+    """Order ``Rainwater4.1`` < ``Rainwater 4.2`` < ``Rainwater 4.10`` (spaces ignored, numbers compared as numbers)."""
+    name = path.name.lower().replace(" ", "")
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+def theme_history(paths: Iterable[Path]) -> List[Path]:
+    """Files in the order given; folders expand to their theme files in natural name order."""
+    files: List[Path] = []
+    for path in paths:
+        found = collect_theme_files([path])
+        files.extend(sorted(found, key=natural_key) if path.is_dir() else found)
+    return files
+
+
+def diff_history(files: Sequence[Path], labels: Sequence[str], baseline: int | None = None) -> List[ThemeDiff]:
+    """Diff consecutive revisions, or every revision against ``files[baseline]`` when given."""
+    if baseline is not None:
+        pairs = [(baseline, index) for index in range(len(files)) if index != baseline]
+    else:
+        pairs = [(index - 1, index) for index in range(1, len(files))]
+    return [diff_theme_files(files[old], files[new], labels[old], labels[new]) for old, new in pairs]
+
+
+def write_diff_csv(diffs: Sequence[ThemeDiff], path: Path) -> None:
+    with open_output(path, newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=DIFF_FIELDS)
+        writer.writeheader()
+        for diff in diffs:
+            for item in diff.changes:
+                writer.writerow(
+                    {
+                        "from_theme": diff.from_theme,
+                        "to_theme": diff.to_theme,
+                        "visual_type": item.visual_type,
+                        "change": item.change,
+                        "pointer": item.pointer,
+                        "old_value": stringify(item.old_value) if item.change != "added" else "",
+                        "new_value": stringify(item.new_value) if item.change != "removed" else "",
+                    }
+                )
+
+
+def render_diff_markdown(diffs: Sequence[ThemeDiff], limit: int = 25) -> str:
+    lines: List[str] = []
+    lines.append("# Theme Version Diff")
+    lines.append("")
+    lines.append("Added, removed and changed JSON pointers between theme revisions, grouped by visual type. Identical subtrees are skipped by hash.")
+    lines.append("")
+    lines.append("| From | To | Added | Removed | Changed | Nodes Compared |")
+    lines.append("| --- | --- | ---: | ---: | ---: | ---: |")
+    for diff in diffs:
+        if diff.error:
+            lines.append(f"| {diff.from_theme} | {diff.to_theme} | — | — | — | error: {markdown_cell(diff.error)} |")
+            continue
+        totals = [sum(1 for item in diff.changes if item.change == kind) for kind in CHANGE_KINDS]
+        lines.append(f"| {diff.from_theme} | {diff.to_theme} | {totals[0]} | {totals[1]} | {totals[2]} | {diff.nodes_compared} |")
+    if not diffs:
+        lines.append("| — | — | 0 | 0 | 0 | 0 |")
+    for diff in diffs:
+        if diff.error or not diff.changes:
+            continue
+        lines.append("")
+        lines.append(f"## {diff.from_theme} → {diff.to_theme}")
+        lines.append("")
+        lines.append("| Visual Type | Added | Removed | Changed |")
+        lines.append("| --- | ---: | ---: | ---: |")
+        for visual_type, counts in sorted(diff.counts().items()):
+            lines.append(f"| {visual_type} | {counts['added']} | {counts['removed']} | {counts['changed']} |")
+        lines.append("")
+        for item in diff.changes[:limit]:
+            if item.change == "changed":
+                detail = f"`{markdown_cell(stringify(item.old_value))}` → `{markdown_cell(stringify(item.new_value))}`"
+            else:
+                detail = f"`{markdown_cell(stringify(item.new_value if item.change == 'added' else item.old_value))}`"
+            lines.append(f"- {item.change} `{item.pointer or '/'}`: {detail}")
+        if len(diff.changes) > limit:
+            lines.append(f"- … {len(diff.changes) - limit} more in the CSV")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Diff theme revisions by JSON pointer, grouped by visual type.")
+    parser.add_argument("themes", nargs="+", type=Path, help="Theme files in revision order, or folders of revisions.")
+    parser.add_argument("--repo-root", type=Path, default=Path(__file__).resolve().parents[2])
+    parser.add_argument("--baseline", type=Path, default=None, help="Diff every theme against this one instead of consecutively.")
+    parser.add_argument("--csv", type=Path, default=Path("reports/diffs/theme_version_diff.csv"))
+    parser.add_argument("--report", type=Path, default=Path("reports/summaries/theme_version_diff.md"))
+    parser.add_argument("--limit", type=int, default=25, help="Pointers listed per revision pair in the report.")
+    args = parser.parse_args(argv)
+
+    repo_root = args.repo_root.resolve()
+    files = theme_history(args.themes)
+    baseline = None
+    if args.baseline is not None:
+        baseline_path = args.baseline.resolve()
+        if baseline_path not in files:
+            files.insert(0, baseline_path)
+        baseline = files.index(baseline_path)
+
+    labels: List[str] = []
+    for path in files:
+        try:
+            labels.append(path.relative_to(repo_root).as_posix())
+        except ValueError:
+            labels.append(path.name)
+    diffs = diff_history(files, labels, baseline)
+    write_diff_csv(diffs, args.csv)
+    write_text_if_changed(args.report, render_diff_markdown(diffs, args.limit))
+    changes = sum(len(diff.changes) for diff in diffs)
+    print(f"{len(diffs)} revision pair(s), {changes} changed pointer(s); report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""Inverted index from theme properties to the report visuals that inherit them, for theme-change impact."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Sequence, Set, Tuple
+
+from output_writer import open_output, write_text_if_changed
+from pbir_scanner import ScanManifest, VisualScan, scan_visual_file
+from theme_cascade import DEFAULT_BASE_THEME, DEFAULT_PRESET, ThemeCascade, load_theme_styles, report_theme_paths
+
+IMPACT_FIELDS = [
+    "report_path",
+    "page_id",
+    "visual_id",
+    "visual_type",
+    "style_preset",
+    "changed_properties",
+    "attribute_keys",
+    "source_path",
+]
+
+STYLE_PRESET_KEY = "stylePreset.name"
+
+
+@dataclass(frozen=True)
+class IndexedVisual:
+    report_path: str
+    page_id: str
+    visual_id: str
+    visual_type: str
+    style_preset: str
+    sha256: str
+    keys: Tuple[str, ...]
+
+
+class ImpactIndex:
+    """Visuals grouped by (visual type, style preset) plus an inverted index of their local overrides.
+
+    A visual depends on the theme value of ``card.property`` unless it overrides that exact key,
+    so the dependents of a key are its (type, preset) group minus the key's overriders. Storing
+    overriders rather than dependents keeps the index proportional to the catalog. Visuals are
+    keyed by source file, so a rescanned file replaces only its own entries.
+    """
+
+    VERSION = 1
+
+    def __init__(self) -> None:
+        self.visuals: Dict[str, IndexedVisual] = {}
+        self.groups: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+        self.overrides: Dict[Tuple[str, str, str], Set[str]] = defaultdict(set)
+        self.catalog_stamp: List[int] = []
+        # Hashes of scanned files that hold no visual (e.g. visual groups), so they are not re-read.
+        self.skipped: Dict[str, str] = {}
+
+    def add(self, source_path: str, visual: IndexedVisual) -> None:
+        self.remove(source_path)
+        self.visuals[source_path] = visual
+        group = (visual.visual_type, visual.style_preset)
+        self.groups[group].add(source_path)
+        for key in visual.keys:
+            self.overrides[group + (key,)].add(source_path)
+
+    def remove(self, source_path: str) -> None:
+        visual = self.visuals.pop(source_path, None)
+        if visual is None:
+            return
+        group = (visual.visual_type, visual.style_preset)
+        self.groups[group].discard(source_path)
+        for key in visual.keys:
+            self.overrides[group + (key,)].discard(source_path)
+
+    def add_scan(self, scan: VisualScan, sha256: str = "") -> None:
+        keys = tuple(sorted({path for path, _, _, _ in scan.properties}))
+        preset = next((value for path, _, value, _ in scan.properties if path == STYLE_PRESET_KEY), "") or DEFAULT_PRESET
+        self.add(
+            scan.source_file,
+            IndexedVisual(scan.report_path, scan.page_id, scan.visual_id, scan.visual_type, preset, sha256, keys),
+        )
+
+    def add_rows(self, rows: Iterable[Mapping[str, str]]) -> None:
+        """Index catalog rows (as ``build_catalog`` produces), one visual per source file."""
+        grouped: Dict[str, List[Mapping[str, str]]] = defaultdict(list)
+        for row in rows:
+            grouped[row["source_path"]].append(row)
+        for source_path, visual_rows in grouped.items():
+            first = visual_rows[0]
+            keys = tuple(sorted({row["attribute_key"] for row in visual_rows if row["attribute_key"]}))
+            preset = next((row["attribute_value"] for row in visual_rows if row["attribute_key"] == STYLE_PRESET_KEY), "")
+            self.add(
+                source_path,
+                IndexedVisual(
+                    first["report_path"], first["page_id"], first["visual_id"], first["visual_type"], preset or DEFAULT_PRESET, "", keys
+                ),
+            )
+
+    def dependents(self, visual_type: str, preset: str, attribute_key: str) -> Set[str]:
+        group = self.groups.get((visual_type, preset), set())
+        overriders = self.overrides.get((visual_type, preset, attribute_key))
+        return group - overriders if overriders else set(group)
+
+    def refresh(self, manifest: ScanManifest, repo_root: Path) -> Dict[str, int]:
+        """Re-read only visual files whose manifest hash differs from the indexed one."""
+        stats = {"rescanned": 0, "removed": 0}
+        for source_path in [name for name in self.visuals if name not in manifest.files]:
+            self.remove(source_path)
+            stats["removed"] += 1
+        self.skipped = {name: sha256 for name, sha256 in self.skipped.items() if name in manifest.files}
+        for source_path, stamp in manifest.files.items():
+            current = self.visuals.get(source_path)
+            if (current is not None and current.sha256 == stamp.sha256) or self.skipped.get(source_path) == stamp.sha256:
+                continue
+            visual_path = repo_root / source_path
+            report_root = visual_path.parents[5]
+            scan = scan_visual_file(str(visual_path), str(report_root), str(repo_root))
+            if scan is None:
+                self.remove(source_path)
+                self.skipped[source_path] = stamp.sha256
+                continue
+            self.skipped.pop(source_path, None)
+            self.add_scan(scan, stamp.sha256)
+            stats["rescanned"] += 1
+        return stats
+
+    @classmethod
+    def load(cls, path: Path) -> "ImpactIndex" | None:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != cls.VERSION:
+            return None
+        index = cls()
+        index.catalog_stamp = data.get("catalog_stamp", [])
+        index.skipped = data.get("skipped", {})
+        for source_path, values in data.get("visuals", {}).items():
+            index.add(source_path, IndexedVisual(*values[:6], tuple(values[6])))
+        return index
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": self.VERSION,
+            "catalog_stamp": self.catalog_stamp,
+            "skipped": dict(sorted(self.skipped.items())),
+            "visuals": {
+                source_path: [
+                    visual.report_path,
+                    visual.page_id,
+                    visual.visual_id,
+                    visual.visual_type,
+                    visual.style_preset,
+                    visual.sha256,
+                    list(visual.keys),
+                ]
+                for source_path, visual in sorted(self.visuals.items())
+            },
+        }
+        write_text_if_changed(path, json.dumps(payload))
+
+
+def catalog_stamp(catalog_csv: Path) -> List[int]:
+    stat = catalog_csv.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def load_impact_index(index_path: Path, catalog_csv: Path, repo_root: Path) -> ImpactIndex:
+    """Load the saved index and bring it up to date with the catalog.
+
+    With a scan manifest next to the catalog (PBIR report roots were scanned), only files whose
+    hash changed are re-read, and visuals without any override rows are indexed too. A catalog
+    built from a CSV has no manifest, so the index is rebuilt from its rows when it changes.
+    """
+    manifest = ScanManifest.load(catalog_csv.with_name(catalog_csv.stem + "_manifest.json"))
+    index = ImpactIndex.load(index_path)
+    if manifest is not None:
+        index = index or ImpactIndex()
+        index.refresh(manifest, repo_root)
+        return index
+    stamp = catalog_stamp(catalog_csv)
+    if index is None or index.catalog_stamp != stamp:
+        index = ImpactIndex()
+        with catalog_csv.open(encoding="utf-8-sig", newline="") as handle:
+            index.add_rows(csv.DictReader(handle))
+        index.catalog_stamp = stamp
+    return index
+
+
+def changed_properties(
+    base: Dict[Tuple[str, str], Dict[str, object]],
+    old: Dict[Tuple[str, str], Dict[str, object]],
+    new: Dict[Tuple[str, str], Dict[str, object]],
+    visual_type: str,
+    preset: str,
+) -> List[str]:
+    """Keys whose effective theme value for (visual type, preset) differs between two theme versions."""
+    before = ThemeCascade(base, old).layer(visual_type, preset)
+    after = ThemeCascade(base, new).layer(visual_type, preset)
+    keys = set(before) | set(after)
+    return sorted(
+        key
+        for key in keys
+        if (before[key].value if key in before else None) != (after[key].value if key in after else None)
+    )
+
+
+def affected_visuals(
+    index: ImpactIndex,
+    old_theme: Path,
+    new_theme: Path,
+    repo_root: Path,
+    default_base: Path | None = DEFAULT_BASE_THEME,
+) -> List[Dict[str, str]]:
+    """Rows for every indexed visual that inherits at least one property the theme edit changes."""
+    old_styles, new_styles = load_theme_styles(old_theme), load_theme_styles(new_theme)
+    base_by_report: Dict[str, Dict[Tuple[str, str], Dict[str, object]]] = {}
+    for visual in index.visuals.values():
+        if visual.report_path not in base_by_report:
+            base_path, _ = report_theme_paths(repo_root / visual.report_path.lstrip("/"))
+            if base_path is None or not base_path.exists():
+                base_path = repo_root / default_base if default_base is not None else None
+            base_by_report[visual.report_path] = load_theme_styles(base_path)
+
+    hits: Dict[str, List[str]] = defaultdict(list)
+    changed_by_group: Dict[Tuple[int, str, str], List[str]] = {}
+    for (visual_type, preset), members in index.groups.items():
+        if not members:
+            continue
+        for report_path in {index.visuals[source].report_path for source in members}:
+            base = base_by_report[report_path]
+            group_key = (id(base), visual_type, preset)
+            if group_key not in changed_by_group:
+                changed_by_group[group_key] = changed_properties(base, old_styles, new_styles, visual_type, preset)
+            for key in changed_by_group[group_key]:
+                for source in index.dependents(visual_type, preset, key):
+                    if index.visuals[source].report_path == report_path:
+                        hits[source].append(key)
+
+    rows: List[Dict[str, str]] = []
+    for source, keys in hits.items():
+        visual = index.visuals[source]
+        rows.append(
+            {
+                "report_path": visual.report_path,
+                "page_id": visual.page_id,
+                "visual_id": visual.visual_id,
+                "visual_type": visual.visual_type,
+                "style_preset": visual.style_preset,
+                "changed_properties": str(len(keys)),
+                "attribute_keys": ";".join(sorted(keys)),
+                "source_path": source,
+            }
+        )
+    rows.sort(key=lambda row: (row["report_path"], row["page_id"], row["visual_type"], row["visual_id"]))
+    return rows
+
+
+def write_impact_csv(rows: Sequence[Dict[str, str]], path: Path) -> None:
+    with open_output(path, newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=IMPACT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def render_impact_markdown(rows: Sequence[Dict[str, str]], old_label: str, new_label: str, indexed: int) -> str:
+    lines: List[str] = []
+    lines.append("# Theme Change Impact")
+    lines.append("")
+    lines.append(f"Visuals that inherit a property whose effective value differs between `{old_label}` and `{new_label}` (no local override).")
+    lines.append("")
+    lines.append(f"- Visuals indexed: {indexed}")
+    lines.append(f"- Visuals affected: {len(rows)}")
+    pages: Dict[Tuple[str, str], List[Dict[str, str]]] = defaultdict(list)
+    for row in rows:
+        pages[(row["report_path"], row["page_id"])].append(row)
+    for (report_path, page_id), page_rows in sorted(pages.items()):
+        lines.append("")
+        lines.append(f"## {report_path} — page {page_id}")
+        lines.append("")
+        lines.append("| Visual | Visual Type | Preset | Changed Properties |")
+        lines.append("| --- | --- | --- | ---: |")
+        for row in page_rows:
+            lines.append(f"| {row['visual_id']} | {row['visual_type']} | {row['style_preset']} | {row['changed_properties']} |")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="List report visuals whose rendering a theme edit changes.")
+    parser.add_argument("old_theme", type=Path, help="Theme version currently applied.")
+    parser.add_argument("new_theme", type=Path, help="Edited theme version.")
+    parser.add_argument("--repo-root", type=Path, default=Path(__file__).resolve().parents[2])
+    parser.add_argument("--catalog", type=Path, default=Path("reports/datasets/catalog.csv"))
+    parser.add_argument("--index", type=Path, default=Path("reports/datasets/theme_impact_index.json"))
+    parser.add_argument("--base-theme", type=Path, default=DEFAULT_BASE_THEME, help="Used for reports that name no base theme.")
+    parser.add_argument("--csv", type=Path, default=Path("reports/diffs/theme_impact.csv"))
+    parser.add_argument("--report", type=Path, default=Path("reports/summaries/theme_impact.md"))
+    args = parser.parse_args(argv)
+
+    repo_root = args.repo_root.resolve()
+    index = load_impact_index(args.index, args.catalog, repo_root)
+    index.save(args.index)
+    rows = affected_visuals(index, args.old_theme, args.new_theme, repo_root, args.base_theme)
+    write_impact_csv(rows, args.csv)
+    write_text_if_changed(
+        args.report, render_impact_markdown(rows, args.old_theme.as_posix(), args.new_theme.as_posix(), len(index.visuals))
+    )
+    print(f"{len(rows)} of {len(index.visuals)} indexed visual(s) affected; report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
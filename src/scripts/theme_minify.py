@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""Minify theme files: drop values the base theme or schema defaults already supply and write compact JSON."""
+
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from output_writer import write_bytes_if_changed, write_text_if_changed
+from pbir_scanner import stringify_scalar
+from theme_cascade import DEFAULT_BASE_THEME, DEFAULT_PRESET, GLOBAL, ResolvedValue, ThemeCascade, flatten_style_block, theme_entry_card
+from theme_rules import collect_theme_files
+from theme_schema import DEFAULT_CACHE_DIR, DEFAULT_SCHEMA, SchemaPropertyIndex, load_property_index
+
+COMPACT_SEPARATORS = (",", ":")
+
+# Identity keys are kept even when the base theme has the same value.
+PRESERVED_KEYS = {"name", "$schema", "visualStyles"}
+
+
+@dataclass
+class MinifyResult:
+    path: str
+    output: str = ""
+    bytes_before: int = 0
+    bytes_after: int = 0
+    removed: List[Dict[str, str]] = field(default_factory=list)
+    mismatches: List[str] = field(default_factory=list)
+    error: str = ""
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+
+def style_blocks(styles: object) -> Dict[Tuple[str, str], Dict[str, object]]:
+    blocks: Dict[Tuple[str, str], Dict[str, object]] = {}
+    for visual_type, presets in (styles.items() if isinstance(styles, dict) else []):
+        if isinstance(presets, dict):
+            for preset, block in presets.items():
+                blocks[(visual_type, preset)] = block
+    return blocks
+
+
+def same_value(value: ResolvedValue, inherited: ResolvedValue | None) -> bool:
+    """Equal values of the same JSON type (``1`` and ``1.0`` match, ``"true"`` and ``true`` do not)."""
+    if inherited is None:
+        return False
+    numeric = {"integer", "number"}
+    if value.value_type in numeric and inherited.value_type in numeric:
+        try:
+            return float(value.value) == float(inherited.value)
+        except ValueError:
+            return False
+    return value.value_type == inherited.value_type and value.value == inherited.value
+
+
+def lower_level(visual_type: str, preset: str) -> Tuple[str, str] | None:
+    """The level a block falls back to: ``<type>/<preset>`` -> ``<type>/*`` -> ``*/*``."""
+    if preset != DEFAULT_PRESET:
+        return visual_type, DEFAULT_PRESET
+    if visual_type != GLOBAL:
+        return GLOBAL, DEFAULT_PRESET
+    return None
+
+
+def schema_default(properties: SchemaPropertyIndex | None, visual_type: str, card: str, leaf_key: str) -> ResolvedValue | None:
+    if properties is None:
+        return None
+    _, _, rest = leaf_key.partition(".")
+    spec = properties.lookup(visual_type, card.split("[", 1)[0], rest.split(".", 1)[0])
+    if spec is None or not spec.default or "." in rest:
+        return None
+    value, value_type = stringify_scalar(spec.default[0])
+    return ResolvedValue(value, value_type, "schema:default")
+
+
+def minify_visual_styles(
+    styles: Dict[str, object],
+    base_blocks: Dict[Tuple[str, str], Dict[str, object]],
+    properties: SchemaPropertyIndex | None = None,
+) -> Tuple[Dict[str, object], List[Dict[str, str]]]:
+    """Drop properties whose every leaf equals what the block would inherit without them.
+
+    A ``<type>/<preset>`` value inherits from the base theme's block at the same level, then
+    from the merged level below it, then from a schema default. Removing an equal value never
+    changes what any level resolves to, so every decision is made against the original theme.
+    Cards, presets and visual types left empty are collapsed away.
+    """
+    cascade = ThemeCascade(base=base_blocks, custom=style_blocks(styles))
+    removed: List[Dict[str, str]] = []
+    minified: Dict[str, object] = {}
+    for visual_type, presets in styles.items():
+        if not isinstance(presets, dict):
+            minified[visual_type] = presets
+            continue
+        kept_presets: Dict[str, object] = {}
+        for preset, block in presets.items():
+            if not isinstance(block, dict):
+                kept_presets[preset] = block
+                continue
+            base_block = cascade.block("base", visual_type, preset)
+            below = lower_level(visual_type, preset)
+            lower = cascade.layer(*below) if below is not None else {}
+            kept_cards: Dict[str, object] = {}
+            for card_name, entries in block.items():
+                if not isinstance(entries, list):
+                    kept_cards[card_name] = entries
+                    continue
+                kept_entries: List[object] = []
+                for entry in entries:
+                    if not isinstance(entry, dict):
+                        kept_entries.append(entry)
+                        continue
+                    card = theme_entry_card(card_name, entry)
+                    kept: Dict[str, object] = {}
+                    for prop_name, prop_value in entry.items():
+                        if prop_name == "$id":
+                            kept[prop_name] = prop_value
+                            continue
+                        leaves = flatten_style_block({card_name: [{**({"$id": entry["$id"]} if "$id" in entry else {}), prop_name: prop_value}]}, "")
+                        inherited = {
+                            key: base_block.get(key) or lower.get(key) or schema_default(properties, visual_type, card, key)
+                            for key in leaves
+                        }
+                        if not leaves or not all(same_value(leaf, inherited[key]) for key, leaf in leaves.items()):
+                            kept[prop_name] = prop_value
+                            continue
+                        removed.extend(
+                            {
+                                "visual_type": visual_type,
+                                "preset": preset,
+                                "attribute_key": key,
+                                "value": leaf.value,
+                                "inherited_from": inherited[key].source,
+                            }
+                            for key, leaf in leaves.items()
+                        )
+                    if set(kept) - {"$id"}:
+                        kept_entries.append(kept)
+                if kept_entries:
+                    kept_cards[card_name] = kept_entries
+            if kept_cards:
+                kept_presets[preset] = kept_cards
+        if kept_presets:
+            minified[visual_type] = kept_presets
+    return minified, removed
+
+
+def minify_top_level(theme: Dict[str, object], base: Mapping[str, object]) -> Tuple[Dict[str, object], List[Dict[str, str]]]:
+    """Drop top-level values (and ``textClasses``-style sub-keys) equal to the base theme's."""
+    removed: List[Dict[str, str]] = []
+    minified: Dict[str, object] = {}
+    for key, value in theme.items():
+        if key in PRESERVED_KEYS or key not in base:
+            minified[key] = value
+            continue
+        base_value = base[key]
+        if value == base_value:
+            removed.append({"visual_type": "", "preset": "", "attribute_key": key, "value": json.dumps(value), "inherited_from": "base:theme"})
+            continue
+        if isinstance(value, dict) and isinstance(base_value, dict):
+            kept = {name: item for name, item in value.items() if base_value.get(name) != item}
+            removed.extend(
+                {"visual_type": "", "preset": "", "attribute_key": f"{key}.{name}", "value": json.dumps(item), "inherited_from": "base:theme"}
+                for name, item in value.items()
+                if name not in kept
+            )
+            if kept:
+                minified[key] = kept
+            continue
+        minified[key] = value
+    return minified, removed
+
+
+def minify_theme(
+    theme: Dict[str, object], base: Mapping[str, object], properties: SchemaPropertyIndex | None = None
+) -> Tuple[Dict[str, object], List[Dict[str, str]]]:
+    minified, removed = minify_top_level(theme, base)
+    styles = theme.get("visualStyles")
+    if isinstance(styles, dict):
+        minified_styles, style_removed = minify_visual_styles(styles, style_blocks(base.get("visualStyles")), properties)
+        removed.extend(style_removed)
+        if minified_styles:
+            minified["visualStyles"] = minified_styles
+        else:
+            minified.pop("visualStyles", None)
+    return minified, removed
+
+
+def effective_mismatches(
+    original: Dict[str, object], minified: Dict[str, object], base: Mapping[str, object], removed: Iterable[Dict[str, str]]
+) -> List[str]:
+    """Keys whose effective value differs between the original and minified theme over the base theme."""
+    base_blocks = style_blocks(base.get("visualStyles"))
+    before = ThemeCascade(base=base_blocks, custom=style_blocks(original.get("visualStyles")))
+    after = ThemeCascade(base=base_blocks, custom=style_blocks(minified.get("visualStyles")))
+    defaulted = {
+        (row["visual_type"], row["attribute_key"]) for row in removed if row["inherited_from"] == "schema:default"
+    }
+    mismatches: List[str] = []
+    for visual_type, preset in sorted(set(style_blocks(original.get("visualStyles"))) | set(base_blocks)):
+        old_layer, new_layer = before.layer(visual_type, preset), after.layer(visual_type, preset)
+        for key, old in old_layer.items():
+            new = new_layer.get(key)
+            if new is None and (visual_type, key) in defaulted:
+                continue
+            if not same_value(old, new):
+                mismatches.append(f"{visual_type}/{preset}: {key}")
+    merged_before = {**base, **original}
+    merged_after = {**base, **minified}
+    for key in sorted(set(merged_before) - {"visualStyles"}):
+        old, new = merged_before.get(key), merged_after.get(key)
+        if isinstance(old, dict) and isinstance(base.get(key), dict):
+            old, new = {**base[key], **old}, {**base[key], **(new or {})}
+        if old != new:
+            mismatches.append(key)
+    return mismatches
+
+
+def render_compact(data: object) -> str:
+    return json.dumps(data, separators=COMPACT_SEPARATORS, ensure_ascii=False)
+
+
+def pretty_path(output_path: Path) -> Path:
+    return output_path.with_name(f"{output_path.stem}_pretty{output_path.suffix}")
+
+
+def minify_file(
+    theme_path: Path,
+    label: str,
+    output_path: Path,
+    base: Mapping[str, object],
+    properties: SchemaPropertyIndex | None = None,
+    keep_pretty: bool = False,
+) -> MinifyResult:
+    result = MinifyResult(path=label, output=output_path.as_posix())
+    try:
+        raw = theme_path.read_bytes()
+        theme = json.loads(raw.decode("utf-8-sig"))
+    except (OSError, UnicodeDecodeError, ValueError) as exc:
+        result.error = str(exc)
+        return result
+    if not isinstance(theme, dict):
+        result.error = "theme root is not an object"
+        return result
+    minified, result.removed = minify_theme(theme, base, properties)
+    result.mismatches = effective_mismatches(theme, minified, base, result.removed)
+    if result.mismatches:
+        # Never ship a theme that renders differently; keep every value and only compact it.
+        minified, result.removed = theme, []
+    compact = render_compact(minified).encode("utf-8")
+    result.bytes_before, result.bytes_after = len(raw), len(compact)
+    write_bytes_if_changed(output_path, compact)
+    if keep_pretty:
+        write_text_if_changed(pretty_path(output_path), json.dumps(minified, indent=2, ensure_ascii=False))
+    return result
+
+
+def render_minify_report(results: Sequence[MinifyResult], base_label: str) -> str:
+    lines: List[str] = []
+    lines.append("# Theme Minify Report")
+    lines.append("")
+    lines.append(f"Values equal to the base theme (`{base_label}`) or a schema default are dropped, emptied blocks are collapsed, and output uses compact separators.")
+    lines.append("")
+    lines.append("| Theme | Removed Values | Bytes Before | Bytes After | Saved |")
+    lines.append("| --- | ---: | ---: | ---: | ---: |")
+    done = [result for result in results if not result.error]
+    for result in done:
+        share = result.bytes_saved / result.bytes_before if result.bytes_before else 0.0
+        lines.append(
+            f"| {result.path} | {len(result.removed)} | {result.bytes_before:,} | {result.bytes_after:,} | {result.bytes_saved:,} ({share:.1%}) |"
+        )
+    if not done:
+        lines.append("| — | 0 | 0 | 0 | 0 |")
+    before = sum(result.bytes_before for result in done)
+    saved = sum(result.bytes_saved for result in done)
+    lines.append("")
+    lines.append(f"- Total: {saved:,} of {before:,} bytes saved ({saved / before if before else 0.0:.1%})")
+    unsafe = [result for result in done if result.mismatches]
+    if unsafe:
+        lines.append("")
+        lines.append("## Themes Compacted Without Value Removal")
+        lines.append("")
+        for result in unsafe:
+            lines.append(f"- {result.path}: effective value check failed for {len(result.mismatches)} key(s), e.g. `{result.mismatches[0]}`")
+    failed = [result for result in results if result.error]
+    if failed:
+        lines.append("")
+        lines.append("## Themes Not Processed")
+        lines.append("")
+        lines.extend(f"- {result.path}: {result.error}" for result in failed)
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Minify theme files against a base theme and the theme schema.")
+    parser.add_argument("themes", nargs="+", type=Path, help="Theme files or folders of theme files.")
+    parser.add_argument("--repo-root", type=Path, default=Path(__file__).resolve().parents[2])
+    parser.add_argument("--base-theme", type=Path, default=DEFAULT_BASE_THEME)
+    parser.add_argument("--schema", type=Path, default=DEFAULT_SCHEMA)
+    parser.add_argument("--output-dir", type=Path, default=Path("themes/outputs/minified"))
+    parser.add_argument("--pretty", action="store_true", help="Also write an indented <name>_pretty.json copy.")
+    parser.add_argument("--report", type=Path, default=Path("reports/summaries/theme_minify_report.md"))
+    args = parser.parse_args(argv)
+
+    repo_root = args.repo_root.resolve()
+    base = json.loads(args.base_theme.read_text(encoding="utf-8-sig")) if args.base_theme.exists() else {}
+    properties = load_property_index(args.schema, repo_root / DEFAULT_CACHE_DIR)
+    results: List[MinifyResult] = []
+    for theme_path in collect_theme_files(args.themes):
+        try:
+            label = theme_path.relative_to(repo_root).as_posix()
+        except ValueError:
+            label = theme_path.name
+        results.append(minify_file(theme_path, label, args.output_dir / label, base, properties, args.pretty))
+
+    write_text_if_changed(args.report, render_minify_report(results, args.base_theme.as_posix()))
+    saved = sum(result.bytes_saved for result in results if not result.error)
+    print(f"Minified {len(results)} theme(s), {saved:,} bytes saved; report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
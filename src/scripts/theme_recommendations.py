@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""Recommend theme additions that would make the most visual-level overrides redundant."""
+
+from __future__ import annotations
+
+import json
+from array import array
+from collections import Counter
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Dict, List, Mapping, Protocol, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional: the pure-Python counter produces identical results
+    np = None
+
+from theme_cascade import ThemeCascade, split_card
+from theme_schema import NOT_THEMEABLE, UNKNOWN_THEMEABILITY, SchemaPropertyIndex
+
+DEFAULT_MIN_SHARE = 0.5
+DEFAULT_MIN_COUNT = 2
+
+PROMOTABLE_TYPES = {"string", "integer", "number", "boolean"}
+
+# Depth of a property inside visual.json: root > visual > objects > card > [entry] > properties > property.
+VISUAL_PROPERTY_DEPTH = 6
+
+PROMOTION_FIELDS = [
+    "rank",
+    "visual_type",
+    "attribute_key",
+    "value",
+    "value_type",
+    "action",
+    "current_value",
+    "overrides",
+    "visuals",
+    "key_overrides",
+    "share",
+    "estimated_bytes",
+    "themeable",
+]
+
+
+class CodedCatalog(Protocol):
+    """The parts of ``CatalogStore`` used here: interned string codes per column."""
+
+    strings: object
+    columns: Mapping[str, array]
+    key_codes: array
+
+
+@dataclass
+class ValueCount:
+    visual_code: int
+    key_code: int
+    value_code: int
+    count: int
+    visuals: int
+    first_row: int
+
+
+@dataclass
+class Promotion:
+    visual_type: str
+    attribute_key: str
+    value: str
+    value_type: str
+    action: str
+    current_value: str
+    overrides: int
+    visuals: int
+    key_overrides: int
+    share: float
+    estimated_bytes: int
+    themeable: str
+    rank: int = 0
+
+
+def _as_numpy(column: array) -> "np.ndarray":
+    kind = "i" if column.typecode.islower() else "u"
+    return np.frombuffer(column, dtype=f"{kind}{column.itemsize}").astype(np.int64)
+
+
+def count_values_numpy(store: CodedCatalog) -> List[ValueCount]:
+    """Count (visual type, attribute key, value) combinations over the interned code columns."""
+    keep = _as_numpy(store.key_codes) >= 0
+    rows = np.flatnonzero(keep)
+    if not len(rows):
+        return []
+    visual, key, value, source = (
+        _as_numpy(store.columns[name])[keep] for name in ("visual_type", "attribute_key", "attribute_value", "source_path")
+    )
+    width = len(store.strings)
+    pairs, pair_ids = np.unique(visual * width + key, return_inverse=True)
+    combos, first, combo_ids, counts = np.unique(
+        pair_ids * width + value, return_index=True, return_inverse=True, return_counts=True
+    )
+    distinct_visuals = np.unique(combo_ids * width + source) // width
+    visuals = np.bincount(distinct_visuals, minlength=len(combos))
+    pair_codes = pairs[combos // width]
+    return [
+        ValueCount(int(pair // width), int(pair % width), int(combo % width), int(count), int(seen), int(rows[row]))
+        for pair, combo, count, seen, row in zip(pair_codes, combos, counts, visuals, first)
+    ]
+
+
+def count_values_python(store: CodedCatalog) -> List[ValueCount]:
+    width = len(store.strings)
+    counts: Counter = Counter()
+    first: Dict[int, int] = {}
+    seen: set[int] = set()
+    columns = store.columns
+    for row, (key_code, visual, key, value, source) in enumerate(
+        zip(store.key_codes, columns["visual_type"], columns["attribute_key"], columns["attribute_value"], columns["source_path"])
+    ):
+        if key_code < 0:
+            continue
+        combo = (visual * width + key) * width + value
+        counts[combo] += 1
+        if combo not in first:
+            first[combo] = row
+        seen.add(combo * width + source)
+    visuals = Counter(packed // width for packed in seen)
+    results: List[ValueCount] = []
+    for combo, count in counts.items():
+        pair, value = divmod(combo, width)
+        visual, key = divmod(pair, width)
+        results.append(ValueCount(visual, key, value, count, visuals[combo], first[combo]))
+    return results
+
+
+def count_values(store: CodedCatalog) -> Tuple[List[ValueCount], str]:
+    """Return value counts and the backend used (``numpy`` when installed, else ``python``)."""
+    if np is not None:
+        return count_values_numpy(store), "numpy"
+    return count_values_python(store), "python"
+
+
+def literal_value(value: str, value_type: str) -> str:
+    if value_type == "string":
+        return f"'{value}'"
+    if value_type in {"integer", "number"}:
+        return f"{value}D"
+    return value
+
+
+@lru_cache(maxsize=None)
+def override_bytes(attribute_key: str, value: str, value_type: str, indent: int = 2) -> int:
+    """Estimated bytes one visual-level override of ``attribute_key`` occupies in a pretty-printed visual.json."""
+    _, rest = split_card(attribute_key)
+    node: object = {"expr": {"Literal": {"Value": literal_value(value, value_type)}}}
+    for part in reversed(rest.split(".")):
+        node = {part: node}
+    lines = json.dumps(node, indent=indent).splitlines()[1:-1]
+    padding = " " * (indent * (VISUAL_PROPERTY_DEPTH - 1))
+    return sum(len(padding) + len(line) + 1 for line in lines) + 1
+
+
+def unescape_literal(value: str, value_type: str) -> str:
+    """PBIR string literals double embedded single quotes; theme JSON strings do not."""
+    return value.replace("''", "'") if value_type == "string" else value
+
+
+def native_value(value: str, value_type: str) -> object:
+    if value_type == "string":
+        return unescape_literal(value, value_type)
+    if value_type == "boolean":
+        return value == "true"
+    if value_type == "integer":
+        return int(value)
+    if value_type == "number":
+        return float(value)
+    return value
+
+
+def promotable(attribute_key: str, value: str, value_type: str) -> bool:
+    """Themes hold literals and ``$id`` selectors only; field-bound selectors and expressions stay on visuals."""
+    card, _ = split_card(attribute_key)
+    if "[" in card and "[id=" not in card:
+        return False
+    return value_type in PROMOTABLE_TYPES and not value.startswith("ThemeDataColor(")
+
+
+def recommend_promotions(
+    store: CodedCatalog,
+    cascade: ThemeCascade | None = None,
+    properties: SchemaPropertyIndex | None = None,
+    min_share: float = DEFAULT_MIN_SHARE,
+    min_count: int = DEFAULT_MIN_COUNT,
+) -> Tuple[List[Promotion], Dict[str, object]]:
+    """Rank the dominant value per (visual type, property) by the overrides a theme entry would absorb.
+
+    Keys whose dominant value the theme already resolves to are skipped (those overrides are
+    strippable today). Values the theme cannot express (ThemeDataColor expressions, field-bound
+    selectors) and keys the schema marks not themeable are never proposed.
+    """
+    value_counts, backend = count_values(store)
+    strings = store.strings
+    value_type_column = store.columns["value_type"]
+    by_pair: Dict[Tuple[int, int], List[ValueCount]] = {}
+    for item in value_counts:
+        by_pair.setdefault((item.visual_code, item.key_code), []).append(item)
+
+    promotions: List[Promotion] = []
+    already_in_theme = 0
+    for (visual_code, key_code), items in by_pair.items():
+        total = sum(item.count for item in items)
+        top = min(items, key=lambda item: (-item.count, item.value_code))
+        visual_type, attribute_key = strings[visual_code], strings[key_code]
+        value, value_type = strings[top.value_code], strings[value_type_column[top.first_row]]
+        if top.count < min_count or top.count / total < min_share or not promotable(attribute_key, value, value_type):
+            continue
+        themeable = properties.classify(visual_type, attribute_key) if properties is not None else UNKNOWN_THEMEABILITY
+        if themeable == NOT_THEMEABLE:
+            continue
+        current = cascade.resolve(visual_type, attribute_key) if cascade is not None else None
+        if current is not None and current.value == unescape_literal(value, value_type):
+            already_in_theme += 1
+            continue
+        promotions.append(
+            Promotion(
+                visual_type=visual_type,
+                attribute_key=attribute_key,
+                value=value,
+                value_type=value_type,
+                action="change" if current is not None else "add",
+                current_value=current.value if current is not None else "",
+                overrides=top.count,
+                visuals=top.visuals,
+                key_overrides=total,
+                share=round(top.count / total, 4),
+                estimated_bytes=top.count * override_bytes(attribute_key, value, value_type),
+                themeable=themeable,
+            )
+        )
+
+    promotions.sort(key=lambda item: (-item.estimated_bytes, -item.visuals, item.visual_type, item.attribute_key))
+    for rank, promotion in enumerate(promotions, start=1):
+        promotion.rank = rank
+    stats = {
+        "backend": backend,
+        "rows": sum(item.count for item in value_counts),
+        "keys": len(by_pair),
+        "already_in_theme": already_in_theme,
+        "min_share": min_share,
+        "min_count": min_count,
+    }
+    return promotions, stats
+
+
+def theme_patch(promotions: Sequence[Promotion]) -> Dict[str, object]:
+    """A ``visualStyles`` fragment that applies every promotion to the ``*`` preset of its visual type."""
+    styles: Dict[str, Dict[str, Dict[str, List[Dict[str, object]]]]] = {}
+    for promotion in promotions:
+        card, rest = split_card(promotion.attribute_key)
+        card_name, _, selector = card.partition("[")
+        entries = styles.setdefault(promotion.visual_type, {}).setdefault("*", {}).setdefault(card_name, [])
+        selector_id = selector[3:-1] if selector.startswith("id=") else None
+        entry = next((item for item in entries if item.get("$id") == selector_id), None)
+        if entry is None:
+            entry = {"$id": selector_id} if selector_id is not None else {}
+            entries.append(entry)
+        parts = rest.split(".")
+        node = entry
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = native_value(promotion.value, promotion.value_type)
+    return {"visualStyles": styles}
+
+
+def promotions_payload(promotions: Sequence[Promotion], stats: Mapping[str, object]) -> Dict[str, object]:
+    return {
+        "stats": dict(stats),
+        "promotions": [asdict(promotion) for promotion in promotions],
+        "theme_patch": theme_patch(promotions),
+    }
+
+
+def markdown_cell(value: str, limit: int = 60) -> str:
+    text = " ".join(value.split()).replace("|", "\\|")
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def render_promotions_markdown(promotions: Sequence[Promotion], stats: Mapping[str, object], limit: int = 20) -> str:
+    lines: List[str] = []
+    lines.append("# Theme Promotion Recommendations")
+    lines.append("")
+    lines.append(
+        "Dominant visual-level values per visual type and property, ranked by the estimated visual.json bytes a theme entry would make redundant."
+    )
+    lines.append("")
+    lines.append("## Overview")
+    lines.append("")
+    lines.append(f"- Catalog rows counted: {stats['rows']} ({stats['backend']} backend)")
+    lines.append(f"- Visual type / property keys: {stats['keys']}")
+    lines.append(f"- Keys already resolved by the theme: {stats['already_in_theme']}")
+    lines.append(f"- Promotions proposed: {len(promotions)} (dominant share >= {stats['min_share']:.0%}, at least {stats['min_count']} overrides)")
+    lines.append(f"- Overrides made redundant: {sum(promotion.overrides for promotion in promotions)}")
+    lines.append(f"- Estimated bytes saved: {sum(promotion.estimated_bytes for promotion in promotions):,}")
+    lines.append("")
+    lines.append("## Top Promotions")
+    lines.append("")
+    lines.append("| Rank | Visual Type | Property | Value | Action | Overrides | Visuals | Share | Est. Bytes |")
+    lines.append("| ---: | --- | --- | --- | --- | ---: | ---: | ---: | ---: |")
+    for promotion in promotions[:limit]:
+        action = promotion.action if promotion.action == "add" else f"change from `{markdown_cell(promotion.current_value)}`"
+        lines.append(
+            f"| {promotion.rank} | {promotion.visual_type} | {promotion.attribute_key} | `{markdown_cell(unescape_literal(promotion.value, promotion.value_type))}` | {action} | "
+            f"{promotion.overrides} | {promotion.visuals} | {promotion.share:.0%} | {promotion.estimated_bytes:,} |"
+        )
+    if not promotions:
+        lines.append("| — | — | — | — | — | 0 | 0 | — | 0 |")
+    lines.append("")
+    return "\n".join(lines)
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""Apply declarative property rewrite rules to theme files in a single traversal per file."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import fnmatch
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from output_writer import open_output, write_text_if_changed
+
+CHANGE_LOG_FIELDS = ["path", "json_pointer", "key", "old_value", "new_value", "note", "rule"]
+
+VALUE_TYPES = {
+    "string": lambda value: isinstance(value, str),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+}
+
+class _Missing:
+    """Unset-condition sentinel that unpickles to the module instance, so rules keep working in workers."""
+
+    def __reduce__(self) -> str:
+        return "_MISSING"
+
+
+_MISSING = _Missing()
+
+
+@dataclass
+class RewriteRule:
+    """One rewrite: leaf key pattern, optional visual types, a value predicate and a replacement.
+
+    ``key`` is matched case-insensitively against the property name; glob characters (``*?[``)
+    make it a pattern, otherwise it is an exact name. ``visual_types`` restricts the rule to
+    ``/visualStyles/<visual type>/...`` pointers. A leaf is rewritten to ``set`` or, when
+    ``mapping`` is given, to ``mapping[value]`` for values listed there.
+    """
+
+    name: str
+    key: str
+    visual_types: Tuple[str, ...] = ()
+    value_type: str | None = None
+    equals: object = _MISSING
+    not_equals: object = _MISSING
+    one_of: Tuple[object, ...] = ()
+    pattern: str | None = None
+    set: object = _MISSING
+    mapping: Dict[str, object] = field(default_factory=dict)
+    note: str = ""
+
+    def __post_init__(self) -> None:
+        if self.value_type is not None and self.value_type not in VALUE_TYPES:
+            raise ValueError(f"Rule '{self.name}': unknown value_type '{self.value_type}'.")
+        if self.set is _MISSING and not self.mapping:
+            raise ValueError(f"Rule '{self.name}' needs either 'set' or 'mapping'.")
+        self._regex = re.compile(self.pattern) if self.pattern else None
+
+    @property
+    def is_pattern(self) -> bool:
+        return any(char in self.key for char in "*?[")
+
+    def accepts(self, value: object, visual_type: str | None) -> bool:
+        if self.visual_types and visual_type not in self.visual_types:
+            return False
+        if self.value_type is not None and not VALUE_TYPES[self.value_type](value):
+            return False
+        if self.equals is not _MISSING and value != self.equals:
+            return False
+        if self.not_equals is not _MISSING and value == self.not_equals:
+            return False
+        if self.one_of and value not in self.one_of:
+            return False
+        if self._regex is not None and not (isinstance(value, str) and self._regex.search(value)):
+            return False
+        if self.mapping and (not isinstance(value, str) or value not in self.mapping):
+            return False
+        return True
+
+    def replacement(self, value: object) -> object:
+        if self.mapping:
+            return self.mapping[value]
+        return self.set
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "RewriteRule":
+        when = data.get("when") or {}
+        return cls(
+            name=str(data.get("name") or data["key"]),
+            key=str(data["key"]),
+            visual_types=tuple(data.get("visual_types") or ()),
+            value_type=when.get("type"),
+            equals=when.get("equals", _MISSING),
+            not_equals=when.get("not_equals", _MISSING),
+            one_of=tuple(when.get("in") or ()),
+            pattern=when.get("regex"),
+            set=data.get("set", _MISSING),
+            mapping=dict(data.get("map") or {}),
+            note=str(data.get("note", "")),
+        )
+
+
+class RuleSet:
+    """Rules compiled into a dispatch table keyed by lower-cased property name.
+
+    Exact-name rules are bucketed directly; pattern rules are resolved once per distinct key
+    and memoized, so each leaf costs a single dictionary lookup after warm-up.
+    """
+
+    def __init__(self, rules: Sequence[RewriteRule]) -> None:
+        self.rules = list(rules)
+        self._exact: Dict[str, List[Tuple[int, RewriteRule]]] = {}
+        self._patterns: List[Tuple[int, re.Pattern[str], RewriteRule]] = []
+        for order, rule in enumerate(self.rules):
+            if rule.is_pattern:
+                regex = re.compile(fnmatch.translate(rule.key.lower()))
+                self._patterns.append((order, regex, rule))
+            else:
+                self._exact.setdefault(rule.key.lower(), []).append((order, rule))
+        self._dispatch: Dict[str, Tuple[RewriteRule, ...]] = {}
+
+    def rules_for(self, key: str) -> Tuple[RewriteRule, ...]:
+        rules = self._dispatch.get(key)
+        if rules is None:
+            lowered = key.lower()
+            matched = list(self._exact.get(lowered, []))
+            matched.extend((order, rule) for order, regex, rule in self._patterns if regex.match(lowered))
+            rules = tuple(rule for _, rule in sorted(matched, key=lambda item: item[0]))
+            self._dispatch[key] = rules
+        return rules
+
+    @classmethod
+    def from_file(cls, path: Path) -> "RuleSet":
+        data = json.loads(path.read_text(encoding="utf-8-sig"))
+        entries = data.get("rules", []) if isinstance(data, dict) else data
+        return cls([RewriteRule.from_dict(entry) for entry in entries])
+
+
+CALIBRI_FONT_RULE = RewriteRule(
+    name="calibri-fonts",
+    key="*font*",
+    value_type="string",
+    not_equals="Calibri",
+    set="Calibri",
+    note="standardized font string to Calibri",
+)
+
+
+LeafObserver = Callable[[List[str], str, object], None]
+
+
+@dataclass
+class RewriteResult:
+    data: object
+    changes: List[Dict[str, object]]
+
+
+def rewrite_tree(data: object, ruleset: RuleSet, observer: LeafObserver | None = None) -> RewriteResult:
+    """Apply ``ruleset`` in one walk without mutating ``data``.
+
+    The first matching rule wins per leaf. Containers are copied only on the path to a change,
+    so untouched subtrees are shared with the input. ``observer`` is called for every scalar
+    leaf with the pointer parts, the nearest non-numeric key, and the (rewritten) value.
+    """
+    changes: List[Dict[str, object]] = []
+    parts: List[str] = []
+
+    def visual_type() -> str | None:
+        if len(parts) >= 2 and parts[0] == "visualStyles":
+            return parts[1]
+        return None
+
+    def visit(node: object, last_key: str) -> object:
+        if isinstance(node, dict):
+            replaced: Dict[str, object] | None = None
+            for key, value in node.items():
+                parts.append(key)
+                child_last = last_key if key.isdigit() else key
+                if isinstance(value, (dict, list)):
+                    new_value = visit(value, child_last)
+                else:
+                    new_value = value
+                    for rule in ruleset.rules_for(key):
+                        if rule.accepts(value, visual_type()):
+                            candidate = rule.replacement(value)
+                            if candidate != value or type(candidate) is not type(value):
+                                new_value = candidate
+                                changes.append(
+                                    {
+                                        "json_pointer": "/" + "/".join(parts),
+                                        "key": key,
+                                        "old_value": value,
+                                        "new_value": candidate,
+                                        "note": rule.note,
+                                        "rule": rule.name,
+                                    }
+                                )
+                            break
+                    if observer is not None:
+                        observer(parts, child_last, new_value)
+                parts.pop()
+                if new_value is not value and replaced is None:
+                    replaced = dict(node)
+                if replaced is not None:
+                    replaced[key] = new_value
+            return node if replaced is None else replaced
+        if isinstance(node, list):
+            replaced_items: List[object] | None = None
+            for idx, item in enumerate(node):
+                parts.append(str(idx))
+                if isinstance(item, (dict, list)):
+                    new_item = visit(item, last_key)
+                else:
+                    new_item = item
+                    if observer is not None:
+                        observer(parts, last_key, item)
+                parts.pop()
+                if new_item is not item:
+                    if replaced_items is None:
+                        replaced_items = list(node)
+                    replaced_items[idx] = new_item
+            return node if replaced_items is None else replaced_items
+        if observer is not None:
+            observer(parts, last_key, node)
+        return node
+
+    return RewriteResult(data=visit(data, ""), changes=changes)
+
+
+def detect_newline(text: str) -> str:
+    if "\r\n" in text:
+        return "\r\n"
+    return "\n"
+
+
+def detect_indent(text: str, default: int = 4) -> int:
+    for line in text.splitlines()[1:]:
+        stripped = line.lstrip(" ")
+        if stripped and len(stripped) != len(line):
+            return len(line) - len(stripped)
+    return default
+
+
+def render_theme(data: object, original_text: str) -> str:
+    newline = detect_newline(original_text)
+    text = json.dumps(data, indent=detect_indent(original_text))
+    if newline != "\n":
+        text = text.replace("\n", newline)
+    if not text.endswith(newline):
+        text += newline
+    return text
+
+
+@dataclass
+class RuleFileResult:
+    path: str
+    changes: List[Dict[str, object]] = field(default_factory=list)
+    error: str = ""
+
+
+def _rewrite_file_task(task: Tuple[str, str, str | None, RuleSet]) -> RuleFileResult:
+    theme_path, label, output_path, ruleset = task
+    file_result = RuleFileResult(path=label)
+    try:
+        original_text = Path(theme_path).read_text(encoding="utf-8-sig")
+        result = rewrite_tree(json.loads(original_text), ruleset)
+        if output_path and result.changes:
+            write_text_if_changed(Path(output_path), render_theme(result.data, original_text))
+    except (OSError, ValueError) as exc:
+        file_result.error = str(exc)
+        return file_result
+    file_result.changes = [{"path": label, **change} for change in result.changes]
+    return file_result
+
+
+def apply_rules(
+    theme_files: Sequence[Path],
+    ruleset: RuleSet,
+    repo_root: Path,
+    output_dir: Path | None = None,
+    in_place: bool = False,
+    workers: int | None = None,
+) -> List[RuleFileResult]:
+    """Rewrite every theme with all rules at once; a file that cannot be read or parsed gets an error result."""
+    tasks: List[Tuple[str, str, str | None, RuleSet]] = []
+    for theme_path in theme_files:
+        try:
+            relative = theme_path.relative_to(repo_root)
+            label = relative.as_posix()
+        except ValueError:
+            # Mirror files outside the repo under output_dir too, instead of joining an absolute path.
+            relative = theme_path.relative_to(theme_path.anchor)
+            label = theme_path.as_posix()
+        if in_place:
+            output_path: str | None = str(theme_path)
+        elif output_dir is not None:
+            output_path = str(output_dir / relative)
+        else:
+            output_path = None
+        tasks.append((str(theme_path), label, output_path, ruleset))
+
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            return list(executor.map(_rewrite_file_task, tasks))
+    return [_rewrite_file_task(task) for task in tasks]
+
+
+def write_change_log(rows: Iterable[Dict[str, object]], path: Path) -> None:
+    with open_output(path, newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=CHANGE_LOG_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(
+                {
+                    **row,
+                    "old_value": stringify(row["old_value"]),
+                    "new_value": stringify(row["new_value"]),
+                }
+            )
+
+
+def stringify(value: object) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+def collect_theme_files(paths: Iterable[Path]) -> List[Path]:
+    files: List[Path] = []
+    for path in paths:
+        path = path.resolve()
+        files.extend(sorted(path.rglob("*.json")) if path.is_dir() else [path])
+    return files
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Apply declarative property rewrite rules to theme files.")
+    parser.add_argument("themes", nargs="+", type=Path, help="Theme files or folders of theme files.")
+    parser.add_argument("--rules", type=Path, default=Path("themes/inputs/rewrite_rules/standard_rules.json"))
+    parser.add_argument("--repo-root", type=Path, default=Path(__file__).resolve().parents[2])
+    parser.add_argument("--output-dir", type=Path, default=None, help="Write rewritten themes under this folder.")
+    parser.add_argument("--in-place", action="store_true", help="Overwrite the theme files that changed.")
+    parser.add_argument("--change-log", type=Path, default=Path("reports/datasets/rule_change_log.csv"))
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    ruleset = RuleSet.from_file(args.rules)
+    theme_files = collect_theme_files(args.themes)
+    results = apply_rules(
+        theme_files,
+        ruleset,
+        args.repo_root.resolve(),
+        output_dir=args.output_dir.resolve() if args.output_dir else None,
+        in_place=args.in_place,
+        workers=args.workers,
+    )
+    rows = [row for result in results for row in result.changes]
+    write_change_log(rows, args.change_log)
+    print(f"{len(rows)} change(s) across {len(theme_files)} theme file(s); log written to {args.change_log}")
+    for result in results:
+        if result.error:
+            print(f"Skipped {result.path}: {result.error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,694 @@
+#!/usr/bin/env python3
+"""Validate theme files against the report theme JSON schema with a compiled, cached validator."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from output_writer import write_text_if_changed
+
+COMPILED_SCHEMA_VERSION = 1
+DEFAULT_SCHEMA = Path("themes/inputs/schemas/report_theme_schema-2_114.json")
+DEFAULT_CACHE_DIR = Path("reports/datasets/schema_cache")
+
+TYPE_CHECKS: Dict[str, Callable[[object], bool]] = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "integer": lambda value: (isinstance(value, int) and not isinstance(value, bool))
+    or (isinstance(value, float) and value.is_integer()),
+}
+
+# Keywords carried into the compiled form; annotations such as title/description are dropped.
+SCALAR_KEYWORDS = ("enum", "const", "pattern", "minimum", "maximum", "minLength", "maxLength", "minItems", "maxItems", "required")
+
+
+@dataclass
+class SchemaError:
+    pointer: str
+    message: str
+
+    def render(self) -> str:
+        return f"{self.pointer or '/'}: {self.message}"
+
+
+def schema_fingerprint(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def json_type_name(value: object) -> str:
+    if isinstance(value, bool):
+        return "boolean"
+    if value is None:
+        return "null"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    return "object"
+
+
+def resolve_ref(root: Dict[str, object], ref: str) -> object:
+    if not ref.startswith("#"):
+        raise ValueError(f"Only local schema references are supported: {ref}")
+    node: object = root
+    for part in ref[1:].lstrip("/").split("/") if ref != "#" else []:
+        part = part.replace("~1", "/").replace("~0", "~")
+        if isinstance(node, list):
+            node = node[int(part)]
+        elif isinstance(node, dict) and part in node:
+            node = node[part]
+        else:
+            raise ValueError(f"Unresolvable schema reference: {ref}")
+    return node
+
+
+def compile_nodes(schema: Dict[str, object]) -> List[Dict[str, object]]:
+    """Flatten ``schema`` into a node table: refs become node ids and annotations are dropped.
+
+    Each distinct subschema object compiles to one node, so a definition referenced from many
+    visual types is shared rather than expanded. Node 0 is the root.
+    """
+    nodes: List[Dict[str, object]] = []
+    seen: Dict[int, int] = {}
+
+    def compile_node(subschema: object) -> int | bool:
+        if isinstance(subschema, bool):
+            return subschema
+        if not isinstance(subschema, dict):
+            raise ValueError(f"Schema node must be an object or boolean, got {json_type_name(subschema)}")
+        while "$ref" in subschema and len(subschema.keys() - {"$ref", "title", "description"}) == 0:
+            subschema = resolve_ref(schema, subschema["$ref"])
+        key = id(subschema)
+        if key in seen:
+            return seen[key]
+        node_id = len(nodes)
+        seen[key] = node_id
+        node: Dict[str, object] = {}
+        nodes.append(node)
+
+        if "$ref" in subschema:
+            node["all"] = [compile_node(resolve_ref(schema, subschema["$ref"]))]
+        types = subschema.get("type")
+        if types is not None:
+            node["type"] = [types] if isinstance(types, str) else list(types)
+        for keyword in SCALAR_KEYWORDS:
+            if keyword in subschema:
+                node[keyword] = subschema[keyword]
+        if "properties" in subschema:
+            node["properties"] = {name: compile_node(child) for name, child in subschema["properties"].items()}
+        if "patternProperties" in subschema:
+            node["patternProperties"] = [
+                [pattern, compile_node(child)] for pattern, child in subschema["patternProperties"].items()
+            ]
+        if "additionalProperties" in subschema:
+            node["additionalProperties"] = compile_node(subschema["additionalProperties"])
+        if "items" in subschema:
+            items = subschema["items"]
+            if isinstance(items, list):
+                node["prefixItems"] = [compile_node(child) for child in items]
+            else:
+                node["items"] = compile_node(items)
+        for keyword, target in (("allOf", "all"), ("anyOf", "any"), ("oneOf", "one")):
+            if keyword in subschema:
+                node.setdefault(target, []).extend(compile_node(child) for child in subschema[keyword])
+        if "not" in subschema:
+            node["not"] = compile_node(subschema["not"])
+        return node_id
+
+    root = compile_node(schema)
+    if root is not True and root is not False and root != 0:
+        raise ValueError("Schema root did not compile to node 0")
+    return nodes
+
+
+Validator = Callable[[object, List[str], List[SchemaError]], None]
+
+
+class CompiledSchema:
+    """Node table plus one validation closure per node, built once per schema fingerprint."""
+
+    def __init__(self, nodes: List[Dict[str, object]], fingerprint: str = "") -> None:
+        self.nodes = nodes
+        self.fingerprint = fingerprint
+        self.validators: List[Validator] = []
+        # Child validators are looked up by node id at call time, so recursive refs need no ordering.
+        self.validators.extend(self.build_validator(node) for node in nodes)
+
+    @classmethod
+    def from_schema(cls, schema: Dict[str, object], fingerprint: str = "") -> "CompiledSchema":
+        return cls(compile_nodes(schema), fingerprint)
+
+    def to_json(self) -> Dict[str, object]:
+        return {"version": COMPILED_SCHEMA_VERSION, "fingerprint": self.fingerprint, "nodes": self.nodes}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, object]) -> "CompiledSchema":
+        return cls(list(data["nodes"]), str(data.get("fingerprint", "")))
+
+    def validator_for(self, target: int | bool) -> Validator:
+        if target is True:
+            return lambda value, parts, errors: None
+        if target is False:
+            return lambda value, parts, errors: errors.append(SchemaError(pointer(parts), "No value is allowed here"))
+        validators = self.validators
+        return lambda value, parts, errors: validators[target](value, parts, errors)
+
+    def build_validator(self, node: Dict[str, object]) -> Validator:
+        checks: List[Validator] = []
+
+        types = node.get("type")
+        if types:
+            type_checks = [TYPE_CHECKS[name] for name in types if name in TYPE_CHECKS]
+            expected = " or ".join(types)
+
+            def check_type(value: object, parts: List[str], errors: List[SchemaError]) -> bool:
+                if not any(check(value) for check in type_checks):
+                    errors.append(SchemaError(pointer(parts), f"Expected {expected}, got {json_type_name(value)}"))
+                    return False
+                return True
+        else:
+            check_type = None
+
+        if "enum" in node:
+            allowed = node["enum"]
+            hashable = {json.dumps(item, sort_keys=True) for item in allowed}
+
+            def check_enum(value: object, parts: List[str], errors: List[SchemaError]) -> None:
+                if json.dumps(value, sort_keys=True) not in hashable:
+                    errors.append(SchemaError(pointer(parts), f"{value!r} is not one of {allowed!r}"))
+
+            checks.append(check_enum)
+        if "const" in node:
+            const = node["const"]
+
+            def check_const(value: object, parts: List[str], errors: List[SchemaError]) -> None:
+                if value != const or json_type_name(value) != json_type_name(const):
+                    errors.append(SchemaError(pointer(parts), f"Expected constant {const!r}"))
+
+            checks.append(check_const)
+        if "pattern" in node:
+            regex = re.compile(node["pattern"])
+
+            def check_pattern(value: object, parts: List[str], errors: List[SchemaError]) -> None:
+                if isinstance(value, str) and not regex.search(value):
+                    errors.append(SchemaError(pointer(parts), f"{value!r} does not match {regex.pattern!r}"))
+
+            checks.append(check_pattern)
+        for keyword, compare, label in (
+            ("minimum", lambda value, bound: value < bound, "less than minimum"),
+            ("maximum", lambda value, bound: value > bound, "greater than maximum"),
+        ):
+            if keyword in node:
+                checks.append(numeric_bound(node[keyword], compare, label))
+        for keyword, kind, compare, label in (
+            ("minLength", str, lambda size, bound: size < bound, "shorter than"),
+            ("maxLength", str, lambda size, bound: size > bound, "longer than"),
+            ("minItems", list, lambda size, bound: size < bound, "fewer items than"),
+            ("maxItems", list, lambda size, bound: size > bound, "more items than"),
+        ):
+            if keyword in node:
+                checks.append(size_bound(node[keyword], kind, compare, label))
+
+        if "required" in node and isinstance(node["required"], list):
+            required = list(node["required"])
+
+            def check_required(value: object, parts: List[str], errors: List[SchemaError]) -> None:
+                if isinstance(value, dict):
+                    for name in required:
+                        if name not in value:
+                            errors.append(SchemaError(pointer(parts), f"Missing required property '{name}'"))
+
+            checks.append(check_required)
+
+        if "properties" in node or "patternProperties" in node or "additionalProperties" in node:
+            properties = {name: self.validator_for(target) for name, target in node.get("properties", {}).items()}
+            patterns = [(re.compile(pattern), self.validator_for(target)) for pattern, target in node.get("patternProperties", [])]
+            additional_target = node.get("additionalProperties", True)
+            additional = None if additional_target is True else self.validator_for(additional_target)
+            forbid_additional = additional_target is False
+            named_preset = named_preset_validator(properties["*"]) if "*" in properties else None
+
+            def check_properties(value: object, parts: List[str], errors: List[SchemaError]) -> None:
+                if not isinstance(value, dict):
+                    return
+                # Named style presets under visualStyles/<type> follow the "*" preset, as in the theme cascade.
+                presets = named_preset if len(parts) == 2 and parts[0] == "visualStyles" else None
+                for name, child in value.items():
+                    validator = properties.get(name, presets)
+                    matched = validator is not None
+                    parts.append(name)
+                    if validator is not None:
+                        validator(child, parts, errors)
+                    for regex, pattern_validator in patterns:
+                        if regex.search(name):
+                            matched = True
+                            pattern_validator(child, parts, errors)
+                    if not matched and additional is not None:
+                        if forbid_additional:
+                            errors.append(SchemaError(pointer(parts), f"Additional property '{name}' is not allowed"))
+                        else:
+                            additional(child, parts, errors)
+                    parts.pop()
+
+            checks.append(check_properties)
+
+        if "items" in node or "prefixItems" in node:
+            item_validator = self.validator_for(node["items"]) if "items" in node else None
+            prefix = [self.validator_for(target) for target in node.get("prefixItems", [])]
+
+            def check_items(value: object, parts: List[str], errors: List[SchemaError]) -> None:
+                if not isinstance(value, list):
+                    return
+                for index, item in enumerate(value):
+                    validator = prefix[index] if index < len(prefix) else item_validator
+                    if validator is not None:
+                        parts.append(str(index))
+                        validator(item, parts, errors)
+                        parts.pop()
+
+            checks.append(check_items)
+
+        for target in node.get("all", []):
+            checks.append(self.validator_for(target))
+        if "any" in node or "one" in node:
+            any_of = [self.validator_for(target) for target in node.get("any", [])]
+            one_of = [self.validator_for(target) for target in node.get("one", [])]
+
+            def check_alternatives(value: object, parts: List[str], errors: List[SchemaError]) -> None:
+                if any_of and not any(not run_isolated(validator, value, parts) for validator in any_of):
+                    errors.append(SchemaError(pointer(parts), "Value does not match any allowed schema"))
+                if one_of:
+                    matches = sum(1 for validator in one_of if not run_isolated(validator, value, parts))
+                    if matches != 1:
+                        errors.append(SchemaError(pointer(parts), f"Value matches {matches} schemas, expected exactly one"))
+
+            checks.append(check_alternatives)
+        if "not" in node:
+            negated = self.validator_for(node["not"])
+
+            def check_not(value: object, parts: List[str], errors: List[SchemaError]) -> None:
+                if not run_isolated(negated, value, parts):
+                    errors.append(SchemaError(pointer(parts), "Value matches a disallowed schema"))
+
+            checks.append(check_not)
+
+        def validate(value: object, parts: List[str], errors: List[SchemaError]) -> None:
+            if check_type is not None and not check_type(value, parts, errors):
+                return
+            for check in checks:
+                check(value, parts, errors)
+
+        return validate
+
+    def validate(self, instance: object) -> List[SchemaError]:
+        errors: List[SchemaError] = []
+        if self.validators:
+            self.validators[0](instance, [], errors)
+        return errors
+
+
+def pointer(parts: Sequence[str]) -> str:
+    if not parts:
+        return ""
+    return "/" + "/".join(part.replace("~", "~0").replace("/", "~1") for part in parts)
+
+
+def named_preset_validator(preset: Validator) -> Validator:
+    """Check a named ``visualStyles/<type>/<name>`` preset against the ``*`` preset schema.
+
+    Generated template presets wrap their cards in a single ``"*"`` object; that block is checked instead.
+    """
+
+    def check(value: object, parts: List[str], errors: List[SchemaError]) -> None:
+        if isinstance(value, dict) and list(value) == ["*"] and isinstance(value["*"], dict):
+            parts.append("*")
+            preset(value["*"], parts, errors)
+            parts.pop()
+        else:
+            preset(value, parts, errors)
+
+    return check
+
+
+def run_isolated(validator: Validator, value: object, parts: List[str]) -> List[SchemaError]:
+    errors: List[SchemaError] = []
+    validator(value, list(parts), errors)
+    return errors
+
+
+def numeric_bound(bound: float, compare: Callable[[float, float], bool], label: str) -> Validator:
+    def check(value: object, parts: List[str], errors: List[SchemaError]) -> None:
+        if TYPE_CHECKS["number"](value) and compare(value, bound):
+            errors.append(SchemaError(pointer(parts), f"{value!r} is {label} {bound!r}"))
+
+    return check
+
+
+def size_bound(bound: int, kind: type, compare: Callable[[int, int], bool], label: str) -> Validator:
+    def check(value: object, parts: List[str], errors: List[SchemaError]) -> None:
+        if isinstance(value, kind) and compare(len(value), bound):
+            errors.append(SchemaError(pointer(parts), f"Value is {label} {bound}"))
+
+    return check
+
+
+_COMPILED: Dict[str, CompiledSchema] = {}
+
+
+def load_compiled_schema(schema_path: Path, cache_dir: Path | None = None) -> CompiledSchema:
+    """Return the compiled schema for ``schema_path``, memoized in-process and on disk by SHA-256."""
+    fingerprint = schema_fingerprint(schema_path)
+    compiled = _COMPILED.get(fingerprint)
+    if compiled is not None:
+        return compiled
+    cache_path = cache_dir / f"{fingerprint}.json" if cache_dir is not None else None
+    if cache_path is not None and cache_path.exists():
+        try:
+            data = json.loads(cache_path.read_text(encoding="utf-8"))
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and data.get("version") == COMPILED_SCHEMA_VERSION and data.get("fingerprint") == fingerprint:
+            compiled = CompiledSchema.from_json(data)
+    if compiled is None:
+        schema = json.loads(schema_path.read_text(encoding="utf-8-sig"))
+        compiled = CompiledSchema.from_schema(schema, fingerprint)
+        if cache_path is not None:
+            write_text_if_changed(cache_path, json.dumps(compiled.to_json(), separators=(",", ":")))
+    _COMPILED[fingerprint] = compiled
+    return compiled
+
+
+SCHEMA_PROPERTY_INDEX_VERSION = 2
+THEMEABLE = "themeable"
+NOT_THEMEABLE = "not_themeable"
+UNKNOWN_THEMEABILITY = "unknown"
+GLOBAL_VISUAL_TYPE = "*"
+
+
+@dataclass(frozen=True)
+class PropertySpec:
+    """Allowed types and enum of one property; ``default`` holds the schema default, if declared, as a 1-tuple."""
+
+    types: Tuple[str, ...]
+    enum: Tuple[object, ...] = ()
+    definition: str = ""
+    default: Tuple[object, ...] = ()
+
+
+def split_attribute_key(attribute_key: str) -> Tuple[str, str]:
+    """Return (card, property) from a dotted key, ignoring ``[...]`` selectors on either segment."""
+    segments: List[str] = []
+    current: List[str] = []
+    depth = 0
+    for char in attribute_key:
+        if char == "[":
+            depth += 1
+        elif char == "]" and depth:
+            depth -= 1
+        elif char == "." and depth == 0:
+            segments.append("".join(current))
+            current = []
+            if len(segments) == 2:
+                break
+            continue
+        if depth == 0 and char != "]":
+            current.append(char)
+    if len(segments) < 2:
+        segments.append("".join(current))
+    card = segments[0]
+    return card, segments[1] if len(segments) > 1 else ""
+
+
+class SchemaPropertyIndex:
+    """(visual type, card, property) -> allowed type and enum, derived once from the theme schema.
+
+    Keys are lower-cased; ``*`` holds the common cards every visual type accepts, which is also
+    the fallback for visual types the schema does not list (custom visuals). A global (``*``)
+    theme entry is themeable when any visual type accepts its card and property.
+    """
+
+    def __init__(self, entries: Dict[Tuple[str, str, str], PropertySpec], fingerprint: str = "") -> None:
+        self.entries = entries
+        self.fingerprint = fingerprint
+        self.visual_types = {visual_type for visual_type, _, _ in entries}
+        self.any_visual = {(card, name) for _, card, name in entries}
+
+    @classmethod
+    def from_schema(cls, schema: Dict[str, object], fingerprint: str = "") -> "SchemaPropertyIndex":
+        def resolve(node: object) -> object:
+            while isinstance(node, dict) and "$ref" in node:
+                node = resolve_ref(schema, node["$ref"])
+            return node
+
+        def merged_properties(node: object) -> Dict[str, object]:
+            node = resolve(node)
+            properties: Dict[str, object] = {}
+            if not isinstance(node, dict):
+                return properties
+            for part in node.get("allOf", []):
+                properties.update(merged_properties(part))
+            properties.update(node.get("properties", {}))
+            return properties
+
+        def spec_for(node: object) -> PropertySpec:
+            definition = ""
+            default: Tuple[object, ...] = ()
+            if isinstance(node, dict):
+                if "$ref" in node:
+                    definition = node["$ref"].rsplit("/", 1)[-1]
+                if "default" in node:
+                    default = (node["default"],)
+            node = resolve(node)
+            if not default and isinstance(node, dict) and "default" in node:
+                default = (node["default"],)
+            if not isinstance(node, dict):
+                return PropertySpec(types=(), definition=definition)
+            types: List[str] = []
+            for candidate in [node] + [resolve(option) for option in node.get("oneOf", []) + node.get("anyOf", [])]:
+                declared = candidate.get("type") if isinstance(candidate, dict) else None
+                for name in [declared] if isinstance(declared, str) else declared or []:
+                    if name not in types:
+                        types.append(name)
+            return PropertySpec(
+                types=tuple(types), enum=tuple(node.get("enum", ())), definition=definition, default=default
+            )
+
+        entries: Dict[Tuple[str, str, str], PropertySpec] = {}
+
+        def add_cards(visual_type: str, style_node: object) -> None:
+            for card, card_node in merged_properties(style_node).items():
+                items = resolve(card_node).get("items", {}) if isinstance(resolve(card_node), dict) else {}
+                for name, property_node in merged_properties(items).items():
+                    entries[(visual_type, card.lower(), name.lower())] = spec_for(property_node)
+
+        definitions = schema.get("definitions", {})
+        if "commonCards" in definitions:
+            add_cards(GLOBAL_VISUAL_TYPE, definitions["commonCards"])
+        visual_styles = resolve(schema.get("properties", {}).get("visualStyles", {}))
+        for visual_type, visual_node in visual_styles.get("properties", {}).items():
+            style_node = merged_properties(visual_node).get("*")
+            if style_node is not None:
+                add_cards(visual_type.lower(), style_node)
+        return cls(entries, fingerprint)
+
+    def lookup(self, visual_type: str, card: str, property_name: str) -> PropertySpec | None:
+        return self.entries.get((self.visual_key(visual_type), card.lower(), property_name.lower()))
+
+    def visual_key(self, visual_type: str) -> str:
+        if visual_type in (GLOBAL_VISUAL_TYPE, "__global__"):
+            return GLOBAL_VISUAL_TYPE
+        return visual_type.lower()
+
+    def classify(self, visual_type: str, attribute_key: str) -> str:
+        card, property_name = split_attribute_key(attribute_key)
+        if not card or not property_name:
+            return UNKNOWN_THEMEABILITY
+        key = (card.lower(), property_name.lower())
+        visual_key = self.visual_key(visual_type)
+        if visual_key == GLOBAL_VISUAL_TYPE:
+            return THEMEABLE if key in self.any_visual else NOT_THEMEABLE
+        if visual_key in self.visual_types:
+            return THEMEABLE if (visual_key,) + key in self.entries else NOT_THEMEABLE
+        if (GLOBAL_VISUAL_TYPE,) + key in self.entries:
+            return THEMEABLE
+        return UNKNOWN_THEMEABILITY
+
+    def to_json(self) -> Dict[str, object]:
+        return {
+            "version": SCHEMA_PROPERTY_INDEX_VERSION,
+            "fingerprint": self.fingerprint,
+            "entries": [
+                [visual_type, card, name, list(spec.types), list(spec.enum), spec.definition, list(spec.default)]
+                for (visual_type, card, name), spec in self.entries.items()
+            ],
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, object]) -> "SchemaPropertyIndex":
+        entries = {
+            (visual_type, card, name): PropertySpec(tuple(types), tuple(enum), definition, tuple(default))
+            for visual_type, card, name, types, enum, definition, default in data.get("entries", [])
+        }
+        return cls(entries, str(data.get("fingerprint", "")))
+
+
+_PROPERTY_INDEXES: Dict[str, SchemaPropertyIndex] = {}
+
+
+def load_property_index(schema_path: Path, cache_dir: Path | None = None) -> SchemaPropertyIndex | None:
+    """Return the property index for ``schema_path`` (``None`` if it is missing), cached by SHA-256."""
+    if not schema_path.exists():
+        return None
+    fingerprint = schema_fingerprint(schema_path)
+    index = _PROPERTY_INDEXES.get(fingerprint)
+    if index is not None:
+        return index
+    cache_path = cache_dir / f"{fingerprint}.properties.json" if cache_dir is not None else None
+    if cache_path is not None and cache_path.exists():
+        try:
+            data = json.loads(cache_path.read_text(encoding="utf-8"))
+        except ValueError:
+            data = None
+        if (
+            isinstance(data, dict)
+            and data.get("version") == SCHEMA_PROPERTY_INDEX_VERSION
+            and data.get("fingerprint") == fingerprint
+        ):
+            index = SchemaPropertyIndex.from_json(data)
+    if index is None:
+        schema = json.loads(schema_path.read_text(encoding="utf-8-sig"))
+        index = SchemaPropertyIndex.from_schema(schema, fingerprint)
+        if cache_path is not None:
+            write_text_if_changed(cache_path, json.dumps(index.to_json(), separators=(",", ":")))
+    _PROPERTY_INDEXES[fingerprint] = index
+    return index
+
+
+def validate_theme(data: object, schema_path: Path, cache_dir: Path | None = None) -> List[SchemaError] | None:
+    """Validate parsed theme ``data``; ``None`` means the schema file is missing and nothing ran."""
+    if not schema_path.exists():
+        return None
+    return load_compiled_schema(schema_path, cache_dir).validate(data)
+
+
+def schema_summary_line(errors: Sequence[SchemaError] | None, schema_path: Path) -> str:
+    if errors is None:
+        return f"- Schema validation: not executed ({schema_path.name} not found)."
+    return f"- Schema validation against {schema_path.name}: {len(errors)} error(s)."
+
+
+def render_schema_section(errors: Sequence[SchemaError], heading: str = "## Schema Errors", limit: int = 50) -> List[str]:
+    """Markdown lines listing schema errors by JSON Pointer, shared by the validation reports."""
+    lines = [heading, ""]
+    if not errors:
+        lines.append("No schema errors detected.")
+        return lines
+    lines.extend(f"- `{error.pointer or '/'}`: {error.message}" for error in errors[:limit])
+    if len(errors) > limit:
+        lines.append(f"- ... {len(errors) - limit} additional errors truncated ...")
+    return lines
+
+
+_WORKER_SCHEMA: CompiledSchema | None = None
+
+
+def _init_worker(schema_path: str, cache_dir: str | None) -> None:
+    global _WORKER_SCHEMA
+    _WORKER_SCHEMA = load_compiled_schema(Path(schema_path), Path(cache_dir) if cache_dir else None)
+
+
+def _validate_task(theme_path: str) -> Tuple[str, List[Tuple[str, str]]]:
+    try:
+        data = json.loads(Path(theme_path).read_text(encoding="utf-8-sig"))
+    except OSError as exc:
+        return theme_path, [("", f"Unreadable file: {exc}")]
+    except ValueError as exc:
+        return theme_path, [("", f"Invalid JSON: {exc}")]
+    return theme_path, [(error.pointer, error.message) for error in _WORKER_SCHEMA.validate(data)]
+
+
+def validate_files(
+    theme_files: Sequence[Path], schema_path: Path, cache_dir: Path | None = None, workers: int | None = None
+) -> Dict[Path, List[SchemaError]]:
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    initargs = (str(schema_path), str(cache_dir) if cache_dir else None)
+    tasks = [str(path) for path in theme_files]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_init_worker, initargs=initargs) as executor:
+            results = list(executor.map(_validate_task, tasks, chunksize=16))
+    else:
+        _init_worker(*initargs)
+        results = [_validate_task(task) for task in tasks]
+    return {Path(path): [SchemaError(pointer, message) for pointer, message in errors] for path, errors in results}
+
+
+def collect_theme_files(paths: Iterable[Path]) -> List[Path]:
+    files: List[Path] = []
+    for path in paths:
+        path = path.resolve()
+        files.extend(sorted(path.rglob("*.json")) if path.is_dir() else [path])
+    return files
+
+
+def write_report(results: Dict[Path, List[SchemaError]], path: Path, repo_root: Path) -> None:
+    lines = ["# Theme Schema Validation", ""]
+    invalid = sum(1 for errors in results.values() if errors)
+    lines.append(f"- Themes validated: {len(results)}")
+    lines.append(f"- Themes with errors: {invalid}")
+    lines.append("")
+    for theme_path, errors in results.items():
+        if not errors:
+            continue
+        try:
+            label = theme_path.relative_to(repo_root).as_posix()
+        except ValueError:
+            label = theme_path.as_posix()
+        lines.append(f"### {label}")
+        lines.append("")
+        lines.extend(render_schema_section(errors)[2:])
+        lines.append("")
+    write_text_if_changed(path, "\n".join(lines))
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Validate theme files against the report theme JSON schema.")
+    parser.add_argument("themes", nargs="+", type=Path, help="Theme files or folders of theme files.")
+    parser.add_argument("--schema", type=Path, default=DEFAULT_SCHEMA)
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR, help="Folder for compiled schemas keyed by hash.")
+    parser.add_argument("--repo-root", type=Path, default=Path(__file__).resolve().parents[2])
+    parser.add_argument("--report", type=Path, default=None, help="Write a markdown report of errors per theme.")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    theme_files = collect_theme_files(args.themes)
+    results = validate_files(theme_files, args.schema.resolve(), args.cache_dir.resolve(), args.workers)
+    invalid = 0
+    for theme_path, errors in results.items():
+        if errors:
+            invalid += 1
+            print(f"{theme_path}: {len(errors)} error(s)")
+            for error in errors[:5]:
+                print(f"  {error.render()}")
+    print(f"{len(results) - invalid}/{len(results)} theme file(s) valid")
+    if args.report:
+        write_report(results, args.report, args.repo_root.resolve())
+    if invalid:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,72 @@
 from __future__ import annotations
 
 import argparse
-import copy
 import csv
+import hashlib
+import heapq
 import json
+import os
+import re
+import tempfile
 import xml.etree.ElementTree as ET
+from array import array
 from collections import Counter, defaultdict
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Sequence, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from bookmark_scanner import bookmark_files, scan_bookmarks, write_bookmark_csv
+from output_writer import open_output, write_text_if_changed
+from pbir_scanner import (
+    ScanManifest,
+    assign_style_variants,
+    find_report_roots,
+    iter_visual_files,
+    plan_rescan,
+    scan_files,
+    scan_reports,
+    scan_rows,
+    signature_digest,
+)
+from pipeline_metrics import MetricsLog, add_metrics_arguments, metrics_log_from_args, record_rows
+from stage_runner import Stage, StageRunner
+from theme_cascade import ThemeCascade, load_theme_styles
+from theme_recommendations import (
+    PROMOTION_FIELDS,
+    promotions_payload,
+    recommend_promotions,
+    render_promotions_markdown,
+)
+from theme_rules import CALIBRI_FONT_RULE, RuleSet, rewrite_tree
+from theme_schema import (
+    DEFAULT_CACHE_DIR,
+    NOT_THEMEABLE,
+    THEMEABLE,
+    UNKNOWN_THEMEABILITY,
+    SchemaPropertyIndex,
+    load_property_index,
+    render_schema_section,
+    schema_summary_line,
+    validate_theme,
+)
+
+CATALOG_FIELDNAMES = [
+    'report_path',
+    'page_id',
+    'visual_id',
+    'visual_type',
+    'style_variant',
+    'attribute_family',
+    'attribute_key',
+    'attribute_name',
+    'attribute_value',
+    'value_type',
+    'source_path',
+]
+
+DEFAULT_SORT_CHUNK_SIZE = 200_000
 
 VISUAL_TYPE_SYNONYMS = {
     'advancedslivervisual': 'slicer',
@@ -47,6 +105,11 @@ def normalize_attribute_key(key: str) -> str:
     return (key or '').lower()
 
 
+@lru_cache(maxsize=None)
+def normalized_attribute_pair(visual_type: str, attribute_key: str) -> Tuple[str, str]:
+    return normalized_visual_type_key(visual_type), normalize_attribute_key(attribute_key)
+
+
 def stringify_value(value: object) -> str:
     if isinstance(value, (dict, list)):
         return json.dumps(value, sort_keys=True)
@@ -66,9 +129,15 @@ class PipelineConfig:
     inventory_path: Path
     schema_file: Path
     outputs: Dict[str, Path]
+    report_roots: List[Path] = field(default_factory=list)
+    scan_workers: int | None = None
+    stream_ingestion: bool = False
+    sort_chunk_size: int = DEFAULT_SORT_CHUNK_SIZE
+    incremental: bool = False
+    prompt_path: Path | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ThemeAttribute:
     visual_type: str
     style_variant: str
@@ -77,7 +146,7 @@ class ThemeAttribute:
     value: object
 
     def normalized_key(self) -> Tuple[str, str]:
-        return normalized_visual_type_key(self.visual_type), normalize_attribute_key(self.attribute_key)
+        return normalized_attribute_pair(self.visual_type, self.attribute_key)
 
     def display_visual_type(self) -> str:
         return display_visual_type_label(self.visual_type)
@@ -86,7 +155,7 @@ class ThemeAttribute:
         return stringify_value(self.value)
 
 
-@dataclass
+@dataclass(slots=True)
 class CatalogAttribute:
     report_path: str
     page_id: str
@@ -99,7 +168,7 @@ class CatalogAttribute:
     source_path: str
 
     def normalized_key(self) -> Tuple[str, str]:
-        return normalized_visual_type_key(self.visual_type), normalize_attribute_key(self.attribute_key)
+        return normalized_attribute_pair(self.visual_type, self.attribute_key)
 
     def display_visual_type(self) -> str:
         return display_visual_type_label(self.visual_type)
@@ -108,6 +177,132 @@ class CatalogAttribute:
         return self.attribute_value or ''
 
 
+class StringPool:
+    """Intern strings to dense integer codes so repeated catalog values are stored once."""
+
+    __slots__ = ('codes', 'values')
+
+    def __init__(self) -> None:
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def __getitem__(self, code: int) -> str:
+        return self.values[code]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+CATALOG_STORE_COLUMNS = (
+    'report_path',
+    'page_id',
+    'visual_id',
+    'visual_type',
+    'style_variant',
+    'attribute_key',
+    'attribute_value',
+    'value_type',
+    'source_path',
+)
+
+
+class CatalogStore:
+    """Column-oriented catalog attributes held as interned integer codes.
+
+    Every string column is an ``array`` of codes into one shared ``StringPool``. The normalized
+    (visual type, attribute key) join key is computed once per distinct pair at load time and stored
+    as a code in ``key_codes`` (``-1`` when the row has no attribute key).
+    """
+
+    def __init__(self) -> None:
+        self.strings = StringPool()
+        self.columns: Dict[str, array] = {name: array('I') for name in CATALOG_STORE_COLUMNS}
+        self.key_codes = array('i')
+        self.keys: List[Tuple[str, str]] = []
+        self._key_lookup: Dict[Tuple[str, str], int] = {}
+        self._pair_lookup: Dict[Tuple[int, int], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.key_codes)
+
+    def key_code(self, normalized: Tuple[str, str]) -> int:
+        code = self._key_lookup.get(normalized)
+        if code is None:
+            code = len(self.keys)
+            self._key_lookup[normalized] = code
+            self.keys.append(normalized)
+        return code
+
+    def append(self, values: Sequence[str]) -> None:
+        """Append one row given in ``CATALOG_STORE_COLUMNS`` order."""
+        codes = [self.strings.code(value or '') for value in values]
+        for name, code in zip(CATALOG_STORE_COLUMNS, codes):
+            self.columns[name].append(code)
+        visual_code, key_code = codes[3], codes[5]
+        if not values[5]:
+            self.key_codes.append(-1)
+            return
+        pair = (visual_code, key_code)
+        normalized_code = self._pair_lookup.get(pair)
+        if normalized_code is None:
+            normalized_code = self.key_code(normalized_attribute_pair(values[3], values[5]))
+            self._pair_lookup[pair] = normalized_code
+        self.key_codes.append(normalized_code)
+
+    def value(self, column: str, index: int) -> str:
+        return self.strings[self.columns[column][index]]
+
+    def attribute(self, index: int) -> CatalogAttribute:
+        strings = self.strings
+        return CatalogAttribute(*(strings[self.columns[name][index]] for name in CATALOG_STORE_COLUMNS))
+
+    def rows_by_key(self) -> Dict[int, array]:
+        groups: Dict[int, array] = {}
+        for index, code in enumerate(self.key_codes):
+            if code < 0:
+                continue
+            bucket = groups.get(code)
+            if bucket is None:
+                bucket = groups[code] = array('I')
+            bucket.append(index)
+        return groups
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, str]]) -> 'CatalogStore':
+        store = cls()
+        for row in rows:
+            store.append([row.get(name, '') for name in CATALOG_STORE_COLUMNS])
+        return store
+
+    @classmethod
+    def from_attributes(cls, attributes: Iterable[CatalogAttribute]) -> 'CatalogStore':
+        store = cls()
+        for attr in attributes:
+            store.append([getattr(attr, name) for name in CATALOG_STORE_COLUMNS])
+        return store
+
+    @classmethod
+    def from_csv(cls, csv_path: Path) -> 'CatalogStore':
+        store = cls()
+        with csv_path.open(encoding='utf-8-sig', newline='') as handle:
+            reader = csv.reader(handle)
+            header = next(reader, [])
+            positions = [header.index(name) if name in header else None for name in CATALOG_STORE_COLUMNS]
+            for values in reader:
+                store.append(
+                    [values[pos] if pos is not None and pos < len(values) else '' for pos in positions]
+                )
+        return store
+
+
 def load_config(prompt_path: Path) -> PipelineConfig:
     tree = ET.parse(prompt_path)
     root = tree.getroot()
@@ -132,6 +327,12 @@ def load_config(prompt_path: Path) -> PipelineConfig:
             raw = node.text.strip()
             outputs[Path(raw).name] = repo_root / raw
 
+    report_roots = [
+        repo_root / node.text.strip()
+        for node in root.findall('./context/scanArtifacts/reportRoot')
+        if node.text and node.text.strip()
+    ]
+
     return PipelineConfig(
         repo_root=repo_root,
         theme_file=theme_file,
@@ -140,13 +341,18 @@ def load_config(prompt_path: Path) -> PipelineConfig:
         inventory_path=inventory_path,
         schema_file=schema_file,
         outputs=outputs,
+        report_roots=report_roots,
+        prompt_path=prompt_path.resolve(),
     )
 
 
 def load_visual_properties(csv_path: Path) -> List[Dict[str, str]]:
+    return list(iter_visual_properties(csv_path))
+
+
+def iter_visual_properties(csv_path: Path) -> Iterator[Dict[str, str]]:
     with csv_path.open(encoding='utf-8-sig', newline='') as handle:
-        reader = csv.DictReader(handle)
-        return list(reader)
+        yield from csv.DictReader(handle)
 
 
 def derive_attribute_family(property_path: str) -> str:
@@ -157,96 +363,173 @@ def derive_attribute_family(property_path: str) -> str:
     return property_path
 
 
-def build_catalog(rows: Sequence[Dict[str, str]]) -> List[Dict[str, str]]:
-    catalog: List[Dict[str, str]] = []
-    for row in rows:
-        family = derive_attribute_family(row.get('property_path', ''))
-        catalog.append(
-            {
-                'report_path': row.get('report_path', ''),
-                'page_id': row.get('page_id', ''),
-                'visual_id': row.get('visual_id', ''),
-                'visual_type': row.get('visual_type', ''),
-                'style_variant': row.get('style_variant', ''),
-                'attribute_family': family,
-                'attribute_key': row.get('property_path', ''),
-                'attribute_name': row.get('property_name', ''),
-                'attribute_value': row.get('property_value', ''),
-                'value_type': row.get('value_type', ''),
-                'source_path': row.get('source_file', ''),
-            }
-        )
-    catalog.sort(
-        key=lambda item: (
-            item['report_path'],
-            item['page_id'],
-            item['visual_id'],
-            item['attribute_key'],
-        )
-    )
-    return catalog
+def load_source_rows(config: PipelineConfig, manifest: ScanManifest | None = None) -> Iterable[Dict[str, str]]:
+    if config.report_roots:
+        return scan_reports(config.report_roots, config.repo_root, workers=config.scan_workers, manifest=manifest)
+    if config.stream_ingestion:
+        return iter_visual_properties(config.catalog_csv_input)
+    return load_visual_properties(config.catalog_csv_input)
 
 
-def validate_catalog_sources(catalog: Sequence[Dict[str, str]], repo_root: Path) -> Dict[str, List[str]]:
-    missing_sources: set[str] = set()
-    missing_reports: set[str] = set()
-    checked_reports: set[str] = set()
-    for item in catalog:
-        report = item['report_path'].lstrip('/')
-        if report and report not in checked_reports:
-            checked_reports.add(report)
-            report_dir = repo_root / report
-            if not report_dir.exists():
-                missing_reports.add(report)
-        source_rel = item['source_path']
-        if source_rel:
-            source_path = repo_root / source_rel
-            if not source_path.exists():
-                missing_sources.add(source_rel)
+def catalog_row(row: Dict[str, str]) -> Dict[str, str]:
     return {
-        'missing_reports': sorted(missing_reports),
-        'missing_sources': sorted(missing_sources),
+        'report_path': row.get('report_path', ''),
+        'page_id': row.get('page_id', ''),
+        'visual_id': row.get('visual_id', ''),
+        'visual_type': row.get('visual_type', ''),
+        'style_variant': row.get('style_variant', ''),
+        'attribute_family': derive_attribute_family(row.get('property_path', '')),
+        'attribute_key': row.get('property_path', ''),
+        'attribute_name': row.get('property_name', ''),
+        'attribute_value': row.get('property_value', ''),
+        'value_type': row.get('value_type', ''),
+        'source_path': row.get('source_file', ''),
     }
 
 
-def write_catalog(catalog: Sequence[Dict[str, str]], csv_path: Path, json_path: Path) -> None:
-    csv_path.parent.mkdir(parents=True, exist_ok=True)
-    fieldnames = [
-        'report_path',
-        'page_id',
-        'visual_id',
-        'visual_type',
-        'style_variant',
-        'attribute_family',
-        'attribute_key',
-        'attribute_name',
-        'attribute_value',
-        'value_type',
-        'source_path',
-    ]
-    with csv_path.open('w', encoding='utf-8', newline='') as handle:
-        writer = csv.DictWriter(handle, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in catalog:
-            writer.writerow({field: row.get(field, '') for field in fieldnames})
-    with json_path.open('w', encoding='utf-8') as handle:
-        json.dump(list(catalog), handle, indent=2)
+def catalog_sort_key(item: Dict[str, str]) -> Tuple[str, str, str, str]:
+    return (
+        item['report_path'],
+        item['page_id'],
+        item['visual_id'],
+        item['attribute_key'],
+    )
 
 
-def summarise_visual_attributes(catalog: Sequence[Dict[str, str]]) -> Dict[str, object]:
-    visuals = {(item['report_path'], item['page_id'], item['visual_id']) for item in catalog}
-    families = Counter(item['attribute_family'] or 'unknown' for item in catalog)
-    by_visual_type: Dict[str, Counter[str]] = defaultdict(Counter)
-    for item in catalog:
-        visual_type = item['visual_type'] or 'unknown'
+def build_catalog(rows: Iterable[Dict[str, str]]) -> List[Dict[str, str]]:
+    catalog = [catalog_row(row) for row in rows]
+    catalog.sort(key=catalog_sort_key)
+    return catalog
+
+
+def iter_catalog_rows(rows: Iterable[Dict[str, str]]) -> Iterator[Dict[str, str]]:
+    for row in rows:
+        yield catalog_row(row)
+
+
+def _spill_chunk(chunk: List[Dict[str, str]], spill_dir: Path, index: int) -> Path:
+    chunk.sort(key=catalog_sort_key)
+    path = spill_dir / f'chunk_{index:05d}.csv'
+    with path.open('w', encoding='utf-8', newline='') as handle:
+        writer = csv.writer(handle)
+        for item in chunk:
+            writer.writerow([item[field] for field in CATALOG_FIELDNAMES])
+    return path
+
+
+def _read_chunk(path: Path) -> Iterator[Dict[str, str]]:
+    with path.open(encoding='utf-8', newline='') as handle:
+        for values in csv.reader(handle):
+            yield dict(zip(CATALOG_FIELDNAMES, values))
+
+
+def iter_sorted_catalog(
+    rows: Iterable[Dict[str, str]], chunk_size: int = DEFAULT_SORT_CHUNK_SIZE
+) -> Iterator[Dict[str, str]]:
+    """Sort catalog rows in bounded memory: sorted runs spill to disk and are k-way merged.
+
+    Ordering matches ``build_catalog`` exactly (stable sort on the same key).
+    """
+    chunk: List[Dict[str, str]] = []
+    with tempfile.TemporaryDirectory(prefix='catalog_sort_') as tmp:
+        spill_dir = Path(tmp)
+        spilled: List[Path] = []
+        for item in iter_catalog_rows(rows):
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                spilled.append(_spill_chunk(chunk, spill_dir, len(spilled)))
+                chunk = []
+        if not spilled:
+            chunk.sort(key=catalog_sort_key)
+            yield from chunk
+            return
+        if chunk:
+            spilled.append(_spill_chunk(chunk, spill_dir, len(spilled)))
+            chunk = []
+        yield from heapq.merge(*(_read_chunk(path) for path in spilled), key=catalog_sort_key)
+
+
+class SourceChecker:
+    """Incrementally record catalog report directories and source files missing from the repo."""
+
+    def __init__(self, repo_root: Path) -> None:
+        self.repo_root = repo_root
+        self.missing_sources: set[str] = set()
+        self.missing_reports: set[str] = set()
+        self.checked_reports: set[str] = set()
+        self.checked_sources: set[str] = set()
+
+    def add(self, item: Dict[str, str]) -> None:
+        report = item['report_path'].lstrip('/')
+        if report and report not in self.checked_reports:
+            self.checked_reports.add(report)
+            if not (self.repo_root / report).exists():
+                self.missing_reports.add(report)
+        source_rel = item['source_path']
+        if source_rel and source_rel not in self.checked_sources:
+            self.checked_sources.add(source_rel)
+            if not (self.repo_root / source_rel).exists():
+                self.missing_sources.add(source_rel)
+
+    def results(self) -> Dict[str, List[str]]:
+        return {
+            'missing_reports': sorted(self.missing_reports),
+            'missing_sources': sorted(self.missing_sources),
+        }
+
+
+class AttributeSummary:
+    """Incrementally accumulate the statistics rendered in the visual attribute summary."""
+
+    def __init__(self) -> None:
+        self.total_rows = 0
+        self.visuals: set[Tuple[str, str, str]] = set()
+        self.families: Counter[str] = Counter()
+        self.by_visual_type: Dict[str, Counter[str]] = defaultdict(Counter)
+
+    def add(self, item: Dict[str, str]) -> None:
+        self.total_rows += 1
+        self.visuals.add((item['report_path'], item['page_id'], item['visual_id']))
         family = item['attribute_family'] or 'unknown'
-        by_visual_type[visual_type][family] += 1
-    return {
-        'total_rows': len(catalog),
-        'unique_visuals': len(visuals),
-        'families': families,
-        'by_visual_type': by_visual_type,
-    }
+        self.families[family] += 1
+        self.by_visual_type[item['visual_type'] or 'unknown'][family] += 1
+
+    def results(self) -> Dict[str, object]:
+        return {
+            'total_rows': self.total_rows,
+            'unique_visuals': len(self.visuals),
+            'families': self.families,
+            'by_visual_type': self.by_visual_type,
+        }
+
+
+def write_catalog(catalog: Iterable[Dict[str, str]], csv_path: Path, json_path: Path) -> int:
+    """Write catalog CSV and JSON in one pass over ``catalog``, which may be a generator.
+
+    Both files stream to temp files and are swapped in only once the pass completes, and only
+    when their content changed.
+    """
+    count = 0
+    with open_output(csv_path, newline='') as csv_handle, open_output(json_path) as json_handle:
+        writer = csv.DictWriter(csv_handle, fieldnames=CATALOG_FIELDNAMES)
+        writer.writeheader()
+        for row in catalog:
+            writer.writerow({field: row.get(field, '') for field in CATALOG_FIELDNAMES})
+            # Matches json.dump(list, indent=2) byte for byte without holding the list.
+            json_handle.write('[\n  ' if count == 0 else ',\n  ')
+            json_handle.write(json.dumps(row, indent=2).replace('\n', '\n  '))
+            count += 1
+        json_handle.write('\n]' if count else '[]')
+    return count
+
+
+def observe_catalog(
+    catalog: Iterable[Dict[str, str]], *observers: SourceChecker | AttributeSummary
+) -> Iterator[Dict[str, str]]:
+    for item in catalog:
+        for observer in observers:
+            observer.add(item)
+        yield item
 
 
 def truncate_label(value: str, limit: int = 48) -> str:
@@ -311,22 +594,139 @@ def render_summary_markdown(stats: Dict[str, object], check_results: Dict[str, L
     return '\n'.join(lines)
 
 
-def run_ingestion(config: PipelineConfig) -> None:
-    rows = load_visual_properties(config.catalog_csv_input)
-    catalog = build_catalog(rows)
-    outputs = config.outputs
-    csv_path = outputs.get('catalog.csv')
-    json_path = outputs.get('catalog.json')
+def catalog_output_paths(config: PipelineConfig) -> Tuple[Path, Path]:
+    csv_path = config.outputs.get('catalog.csv')
+    json_path = config.outputs.get('catalog.json')
     if not csv_path or not json_path:
         raise ValueError('Output paths for catalog CSV/JSON not found in prompt outputs block')
-    write_catalog(catalog, csv_path, json_path)
-    checks = validate_catalog_sources(catalog, config.repo_root)
-    stats = summarise_visual_attributes(catalog)
-    summary_md = render_summary_markdown(stats, checks, config.human_summary)
-    summary_path = outputs.get('summary_visual_attributes.md')
+    return csv_path, json_path
+
+
+def catalog_manifest_path(catalog_csv: Path) -> Path:
+    return catalog_csv.with_name(catalog_csv.stem + '_manifest.json')
+
+
+def publish_catalog(config: PipelineConfig, sorted_rows: Iterable[Dict[str, str]]) -> None:
+    """Write catalog CSV/JSON and the summary from sorted rows in one pass, swapping files in at the end."""
+    csv_path, json_path = catalog_output_paths(config)
+    summary_path = config.outputs.get('summary_visual_attributes.md')
     if not summary_path:
         raise ValueError('Summary output path not defined in prompt outputs')
-    summary_path.write_text(summary_md, encoding='utf-8')
+    checker = SourceChecker(config.repo_root)
+    summary = AttributeSummary()
+    record_rows(write_catalog(observe_catalog(sorted_rows, checker, summary), csv_path, json_path))
+    summary_md = render_summary_markdown(summary.results(), checker.results(), config.human_summary)
+    write_text_if_changed(summary_path, summary_md)
+
+
+def bookmark_output_path(config: PipelineConfig) -> Path | None:
+    """Bookmark states are scanned alongside PBIR report roots when the prompt lists an output for them."""
+    return config.outputs.get('bookmark_formatting.csv') if config.report_roots else None
+
+
+def publish_bookmark_states(config: PipelineConfig) -> None:
+    output_path = bookmark_output_path(config)
+    if output_path is None:
+        return
+    write_bookmark_csv(scan_bookmarks(config.report_roots, config.repo_root).rows(), output_path)
+
+
+def run_ingestion(config: PipelineConfig) -> None:
+    if config.incremental:
+        run_incremental_ingestion(config)
+        publish_bookmark_states(config)
+        return
+    manifest = ScanManifest() if config.report_roots else None
+    rows = load_source_rows(config, manifest)
+    if config.stream_ingestion:
+        publish_catalog(config, iter_sorted_catalog(rows, config.sort_chunk_size))
+    else:
+        publish_catalog(config, build_catalog(rows))
+    if manifest is not None:
+        manifest.save(catalog_manifest_path(catalog_output_paths(config)[0]))
+    publish_bookmark_states(config)
+
+
+def iter_catalog_visuals(rows: Iterable[Dict[str, str]]) -> Iterator[Tuple[str, str, str, str, str]]:
+    """Group sorted catalog rows per visual into (report, page, visual_type, visual_id, signature)."""
+    current: Tuple[str, str, str] | None = None
+    visual_type = ''
+    pairs: List[Tuple[str, str]] = []
+    for row in rows:
+        key = (row['report_path'], row['page_id'], row['visual_id'])
+        if key != current:
+            if current is not None:
+                yield current[0], current[1], visual_type, current[2], signature_digest(pairs)
+            current = key
+            visual_type = row['visual_type']
+            pairs = []
+        pairs.append((row['attribute_key'], row['attribute_value']))
+    if current is not None:
+        yield current[0], current[1], visual_type, current[2], signature_digest(pairs)
+
+
+def run_incremental_ingestion(config: PipelineConfig) -> bool:
+    """Re-scan only changed, added or deleted report files and splice their rows into the sorted catalog.
+
+    Returns ``False`` when nothing changed and the catalog outputs were left untouched.
+    """
+    if not config.report_roots:
+        raise ValueError('Incremental ingestion requires PBIR report roots (--scan-reports or reportRoot nodes)')
+    csv_path, _ = catalog_output_paths(config)
+    manifest_path = catalog_manifest_path(csv_path)
+    manifest = ScanManifest.load(manifest_path) if csv_path.exists() else None
+    if manifest is None:
+        manifest = ScanManifest()
+        rows = load_source_rows(config, manifest)
+        publish_catalog(config, iter_sorted_catalog(rows, config.sort_chunk_size))
+        manifest.save(manifest_path)
+        return True
+
+    plan = plan_rescan(config.report_roots, config.repo_root, manifest)
+    if not plan.tasks and not plan.deleted:
+        manifest.save(manifest_path)
+        return False
+
+    results = scan_files(plan.tasks, config.scan_workers)
+    stale = set(plan.deleted)
+    for name in plan.deleted:
+        manifest.files.pop(name, None)
+    for result in results:
+        stale.add(result.source_file)
+        if result.stamp is not None:
+            manifest.files[result.source_file] = result.stamp
+        else:
+            manifest.files.pop(result.source_file, None)
+    fresh_scans = [result.scan for result in results if result.scan is not None and result.scan.properties]
+
+    def retained_rows() -> Iterator[Dict[str, str]]:
+        return (row for row in iter_visual_properties(csv_path) if row['source_path'] not in stale)
+
+    # Style variants are numbered per report and visual type, so re-derive them over every visual.
+    visuals = list(iter_catalog_visuals(retained_rows()))
+    visuals.extend(
+        (scan.report_path, scan.page_id, scan.visual_type, scan.visual_id, scan.signature()) for scan in fresh_scans
+    )
+    visuals.sort(key=lambda item: (item[0], item[1], item[3]))
+    labels = assign_style_variants([(report, vtype, visual, sig) for report, _, vtype, visual, sig in visuals])
+    del visuals
+
+    def relabelled(rows: Iterable[Dict[str, str]]) -> Iterator[Dict[str, str]]:
+        for row in rows:
+            row['style_variant'] = labels.get((row['report_path'], row['visual_id']), row['style_variant'])
+            yield row
+
+    fresh_rows = sorted(
+        (
+            catalog_row(row)
+            for scan in fresh_scans
+            for row in scan_rows(scan, labels[(scan.report_path, scan.visual_id)])
+        ),
+        key=catalog_sort_key,
+    )
+    publish_catalog(config, heapq.merge(relabelled(retained_rows()), fresh_rows, key=catalog_sort_key))
+    manifest.save(manifest_path)
+    return True
 
 
 def flatten_theme_visual_styles(theme_data: Dict[str, object]) -> List[ThemeAttribute]:
@@ -362,82 +762,198 @@ def flatten_theme_visual_styles(theme_data: Dict[str, object]) -> List[ThemeAttr
     return entries
 
 
-def load_catalog_attributes(config: PipelineConfig) -> List[CatalogAttribute]:
+CATALOG_INDEX_VERSION = 1
+CATALOG_SAMPLE_LIMIT = 5
+
+
+def file_fingerprint(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open('rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass(slots=True)
+class CatalogKeyEntry:
+    attribute_key: str
+    display_visual_type: str
+    count: int
+    style_variants: List[str]
+    value_counts: List[Tuple[str, int]]
+    samples: List[Dict[str, str]]
+
+
+class CatalogIndex:
+    """Catalog aggregated per normalized (visual type, attribute key), persisted next to ``catalog.csv``.
+
+    The index is keyed by a SHA-256 fingerprint of the catalog CSV, so diffing another theme
+    revision against an unchanged catalog is a lookup-only join.
+    """
+
+    def __init__(self, entries: Dict[Tuple[str, str], CatalogKeyEntry], fingerprint: str = '') -> None:
+        self.entries = entries
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def from_store(cls, store: CatalogStore, fingerprint: str = '') -> 'CatalogIndex':
+        strings = store.strings
+        key_column = store.columns['attribute_key']
+        visual_column = store.columns['visual_type']
+        value_column = store.columns['attribute_value']
+        style_column = store.columns['style_variant']
+        empty_code = strings.codes.get('')
+
+        entries: Dict[Tuple[str, str], CatalogKeyEntry] = {}
+        for key_code, rows in store.rows_by_key().items():
+            first = rows[0]
+            value_code_counts = Counter(value_column[index] for index in rows)
+            style_codes = {style_column[index] for index in rows}
+            entries[store.keys[key_code]] = CatalogKeyEntry(
+                attribute_key=strings[key_column[first]],
+                display_visual_type=display_visual_type_label(strings[visual_column[first]]),
+                count=len(rows),
+                style_variants=sorted(strings[code] for code in style_codes if code != empty_code),
+                value_counts=[(strings[code], count) for code, count in value_code_counts.most_common()],
+                samples=[
+                    {
+                        'report_path': attr.report_path,
+                        'page_id': attr.page_id,
+                        'visual_id': attr.visual_id,
+                        'style_variant': attr.style_variant,
+                        'attribute_value': attr.attribute_value,
+                        'source_path': attr.source_path,
+                    }
+                    for attr in (store.attribute(index) for index in rows[:CATALOG_SAMPLE_LIMIT])
+                ],
+            )
+        return cls(entries, fingerprint)
+
+    def to_json(self) -> Dict[str, object]:
+        return {
+            'version': CATALOG_INDEX_VERSION,
+            'fingerprint': self.fingerprint,
+            'entries': [
+                [
+                    key[0],
+                    key[1],
+                    {
+                        'attribute_key': entry.attribute_key,
+                        'display_visual_type': entry.display_visual_type,
+                        'count': entry.count,
+                        'style_variants': entry.style_variants,
+                        'value_counts': entry.value_counts,
+                        'samples': entry.samples,
+                    },
+                ]
+                for key, entry in self.entries.items()
+            ],
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, object]) -> 'CatalogIndex':
+        entries: Dict[Tuple[str, str], CatalogKeyEntry] = {}
+        for visual_key, attribute_key, payload in data.get('entries', []):
+            entries[(visual_key, attribute_key)] = CatalogKeyEntry(
+                attribute_key=payload['attribute_key'],
+                display_visual_type=payload['display_visual_type'],
+                count=payload['count'],
+                style_variants=payload['style_variants'],
+                value_counts=[(value, count) for value, count in payload['value_counts']],
+                samples=payload['samples'],
+            )
+        return cls(entries, str(data.get('fingerprint', '')))
+
+    def save(self, path: Path) -> None:
+        write_text_if_changed(path, json.dumps(self.to_json(), separators=(',', ':')))
+
+    @classmethod
+    def load(cls, path: Path) -> 'CatalogIndex' | None:
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('version') != CATALOG_INDEX_VERSION:
+            return None
+        return cls.from_json(data)
+
+
+def catalog_index_path(catalog_csv: Path) -> Path:
+    return catalog_csv.with_name(catalog_csv.stem + '_index.json')
+
+
+def load_catalog_store(config: PipelineConfig) -> CatalogStore:
     output_csv = config.outputs.get('catalog.csv')
-    rows: List[Dict[str, str]]
     if output_csv and output_csv.exists():
-        with output_csv.open(encoding='utf-8', newline='') as handle:
-            rows = list(csv.DictReader(handle))
-    else:
-        source_rows = load_visual_properties(config.catalog_csv_input)
-        rows = build_catalog(source_rows)
-    attributes: List[CatalogAttribute] = []
-    for row in rows:
-        attributes.append(
-            CatalogAttribute(
-                report_path=row.get('report_path', ''),
-                page_id=row.get('page_id', ''),
-                visual_id=row.get('visual_id', ''),
-                visual_type=row.get('visual_type', ''),
-                style_variant=row.get('style_variant', ''),
-                attribute_key=row.get('attribute_key', ''),
-                attribute_value=row.get('attribute_value', ''),
-                value_type=row.get('value_type', ''),
-                source_path=row.get('source_path', ''),
-            )
-        )
-    return attributes
+        return CatalogStore.from_csv(output_csv)
+    return CatalogStore.from_rows(build_catalog(load_source_rows(config)))
 
 
-def build_diff_records(theme_attrs: List[ThemeAttribute], catalog_attrs: List[CatalogAttribute]) -> List[Dict[str, object]]:
+def load_catalog_index(config: PipelineConfig) -> CatalogIndex:
+    """Return the catalog index, reusing the persisted copy when ``catalog.csv`` is unchanged."""
+    output_csv = config.outputs.get('catalog.csv')
+    if not output_csv or not output_csv.exists():
+        return CatalogIndex.from_store(load_catalog_store(config))
+    fingerprint = file_fingerprint(output_csv)
+    index_path = catalog_index_path(output_csv)
+    cached = CatalogIndex.load(index_path)
+    if cached is not None and cached.fingerprint == fingerprint:
+        return cached
+    index = CatalogIndex.from_store(CatalogStore.from_csv(output_csv), fingerprint)
+    index.save(index_path)
+    return index
+
+
+def build_diff_records(
+    theme_attrs: List[ThemeAttribute],
+    catalog: CatalogIndex | CatalogStore | Sequence[CatalogAttribute],
+    properties: SchemaPropertyIndex | None = None,
+) -> List[Dict[str, object]]:
+    """Pair theme and catalog keys; ``properties`` marks each key themeable / not themeable per the schema."""
+    if isinstance(catalog, CatalogIndex):
+        index = catalog
+    elif isinstance(catalog, CatalogStore):
+        index = CatalogIndex.from_store(catalog)
+    else:
+        index = CatalogIndex.from_store(CatalogStore.from_attributes(catalog))
+
     theme_map: Dict[Tuple[str, str], List[ThemeAttribute]] = defaultdict(list)
     for attr in theme_attrs:
         if attr.attribute_key:
             theme_map[attr.normalized_key()].append(attr)
-    catalog_map: Dict[Tuple[str, str], List[CatalogAttribute]] = defaultdict(list)
-    for attr in catalog_attrs:
-        if attr.attribute_key:
-            catalog_map[attr.normalized_key()].append(attr)
 
     diff_records: List[Dict[str, object]] = []
-    for key in sorted(theme_map.keys() | catalog_map.keys()):
+    for key in sorted(theme_map.keys() | index.entries.keys()):
         theme_list = theme_map.get(key, [])
-        catalog_list = catalog_map.get(key, [])
+        entry = index.entries.get(key)
         classification = 'in_both'
-        if theme_list and not catalog_list:
+        if theme_list and entry is None:
             classification = 'only_in_theme'
-        elif catalog_list and not theme_list:
+        elif entry is not None and not theme_list:
             classification = 'only_in_scans'
 
-        attribute_key = theme_list[0].attribute_key if theme_list else (catalog_list[0].attribute_key if catalog_list else '')
-        display_visual = theme_list[0].display_visual_type() if theme_list else (catalog_list[0].display_visual_type() if catalog_list else '')
+        if theme_list:
+            attribute_key = theme_list[0].attribute_key
+            display_visual = theme_list[0].display_visual_type()
+        else:
+            attribute_key = entry.attribute_key
+            display_visual = entry.display_visual_type
         theme_values = [attr.serialized_value() for attr in theme_list]
         theme_pointers = [attr.pointer for attr in theme_list]
         theme_styles = sorted({attr.style_variant for attr in theme_list})
 
-        catalog_values = [attr.serialized_value() for attr in catalog_list]
-        catalog_styles = sorted({attr.style_variant for attr in catalog_list if attr.style_variant})
-        value_counts = Counter(catalog_values)
-        value_counts_list = [{'value': val, 'count': cnt} for val, cnt in value_counts.most_common()]
+        value_counts = entry.value_counts if entry is not None else []
+        value_counts_list = [{'value': val, 'count': cnt} for val, cnt in value_counts]
         dominant_value = value_counts_list[0]['value'] if value_counts_list else ''
         dominant_count = value_counts_list[0]['count'] if value_counts_list else 0
 
         if classification == 'in_both':
-            match_status = 'aligned' if set(theme_values) & set(value_counts.keys()) else 'mismatch'
+            catalog_values = {val for val, _ in value_counts}
+            match_status = 'aligned' if set(theme_values) & catalog_values else 'mismatch'
         else:
             match_status = 'n/a'
 
-        catalog_samples = [
-            {
-                'report_path': attr.report_path,
-                'page_id': attr.page_id,
-                'visual_id': attr.visual_id,
-                'style_variant': attr.style_variant,
-                'attribute_value': attr.attribute_value,
-                'source_path': attr.source_path,
-            }
-            for attr in catalog_list[:5]
-        ]
+        themeable = properties.classify(key[0], attribute_key) if properties is not None else UNKNOWN_THEMEABILITY
 
         diff_records.append(
             {
@@ -452,25 +968,31 @@ def build_diff_records(theme_attrs: List[ThemeAttribute], catalog_attrs: List[Ca
                     'pointers': theme_pointers,
                 },
                 'catalog': {
-                    'count': len(catalog_list),
-                    'style_variants': catalog_styles,
+                    'count': entry.count if entry is not None else 0,
+                    'style_variants': list(entry.style_variants) if entry is not None else [],
                     'value_counts': value_counts_list,
-                    'samples': catalog_samples,
+                    'samples': [dict(sample) for sample in entry.samples] if entry is not None else [],
                 },
                 'match_status': match_status,
                 'dominant_catalog_value': dominant_value,
                 'dominant_catalog_count': dominant_count,
+                'themeable': themeable,
             }
         )
     return diff_records
 
 
-def render_diff_summary(diff_records: List[Dict[str, object]]) -> str:
+def render_diff_summary(diff_records: List[Dict[str, object]], title: str = 'Rainwater Theme v4.1 vs Catalog') -> str:
     counts = Counter(record['classification'] for record in diff_records)
     total = sum(counts.values())
+    themeability = Counter(record.get('themeable', UNKNOWN_THEMEABILITY) for record in diff_records)
     mismatches = [record for record in diff_records if record['match_status'] == 'mismatch']
     missing = sorted(
-        (record for record in diff_records if record['classification'] == 'only_in_scans'),
+        (
+            record
+            for record in diff_records
+            if record['classification'] == 'only_in_scans' and record.get('themeable') != NOT_THEMEABLE
+        ),
         key=lambda rec: rec['catalog']['count'],
         reverse=True,
     )
@@ -512,7 +1034,7 @@ def render_diff_summary(diff_records: List[Dict[str, object]]) -> str:
             recommendations.append(item)
 
     lines: List[str] = []
-    lines.append('# Rainwater Theme v4.1 vs Catalog')
+    lines.append(f'# {title}')
     lines.append('')
     lines.append('## Overview')
     lines.append('')
@@ -521,6 +1043,11 @@ def render_diff_summary(diff_records: List[Dict[str, object]]) -> str:
     lines.append(f"- Only in theme: {counts.get('only_in_theme', 0)}")
     lines.append(f"- Only in scans: {counts.get('only_in_scans', 0)}")
     lines.append(f'- Mismatched values: {len(mismatches)}')
+    lines.append(
+        f"- Schema themeability: {themeability.get(THEMEABLE, 0)} themeable, "
+        f"{themeability.get(NOT_THEMEABLE, 0)} not themeable, {themeability.get(UNKNOWN_THEMEABILITY, 0)} unknown"
+    )
+    lines.append(f'- Only in scans and themeable: {sum(1 for record in missing if record.get("themeable") == THEMEABLE)}')
     lines.append('')
     lines.append('## Recommendations')
     lines.append('')
@@ -558,17 +1085,25 @@ def render_diff_summary(diff_records: List[Dict[str, object]]) -> str:
 
 
 def write_diff_outputs(diff_records: List[Dict[str, object]], config: PipelineConfig) -> None:
-    json_path = config.outputs.get('diff_rainwater_v4_1_vs_catalog.json')
-    csv_path = config.outputs.get('diff_rainwater_v4_1_vs_catalog.csv')
-    summary_path = config.outputs.get('exec_summary_diff.md')
+    write_diff_files(
+        diff_records,
+        config.outputs.get('diff_rainwater_v4_1_vs_catalog.json'),
+        config.outputs.get('diff_rainwater_v4_1_vs_catalog.csv'),
+        config.outputs.get('exec_summary_diff.md'),
+    )
+
 
+def write_diff_files(
+    diff_records: List[Dict[str, object]],
+    json_path: Path | None,
+    csv_path: Path | None,
+    summary_path: Path | None,
+    title: str = 'Rainwater Theme v4.1 vs Catalog',
+) -> None:
     if json_path:
-        json_path.parent.mkdir(parents=True, exist_ok=True)
-        with json_path.open('w', encoding='utf-8') as handle:
-            json.dump(diff_records, handle, indent=2)
+        write_text_if_changed(json_path, json.dumps(diff_records, indent=2))
 
     if csv_path:
-        csv_path.parent.mkdir(parents=True, exist_ok=True)
         fieldnames = [
             'classification',
             'visual_type',
@@ -582,8 +1117,9 @@ def write_diff_outputs(diff_records: List[Dict[str, object]], config: PipelineCo
             'catalog_sample_value',
             'catalog_sample_source',
             'match_status',
+            'themeable',
         ]
-        with csv_path.open('w', encoding='utf-8', newline='') as handle:
+        with open_output(csv_path, newline='') as handle:
             writer = csv.DictWriter(handle, fieldnames=fieldnames)
             writer.writeheader()
             for record in diff_records:
@@ -604,103 +1140,345 @@ def write_diff_outputs(diff_records: List[Dict[str, object]], config: PipelineCo
                         'catalog_sample_value': sample_value,
                         'catalog_sample_source': sample_source,
                         'match_status': record['match_status'],
+                        'themeable': record.get('themeable', UNKNOWN_THEMEABILITY),
                     }
                 )
 
     if summary_path:
-        summary_path.parent.mkdir(parents=True, exist_ok=True)
-        summary_path.write_text(render_diff_summary(diff_records), encoding='utf-8')
+        write_text_if_changed(summary_path, render_diff_summary(diff_records, title))
+
+
+def load_schema_properties(config: PipelineConfig) -> SchemaPropertyIndex | None:
+    return load_property_index(config.schema_file, config.repo_root / DEFAULT_CACHE_DIR)
 
 
 def run_comparison(config: PipelineConfig) -> None:
     theme_text = config.theme_file.read_text(encoding='utf-8-sig')
     theme_data = json.loads(theme_text)
     theme_attrs = flatten_theme_visual_styles(theme_data)
-    catalog_attrs = load_catalog_attributes(config)
-    diff_records = build_diff_records(theme_attrs, catalog_attrs)
+    catalog_index = load_catalog_index(config)
+    diff_records = build_diff_records(theme_attrs, catalog_index, load_schema_properties(config))
+    record_rows(len(diff_records))
     write_diff_outputs(diff_records, config)
 
 
-def detect_newline_style(text: str) -> str:
-    if '\r\n' in text:
-        return '\r\n'
-    return '\n'
+def run_recommendations(config: PipelineConfig) -> None:
+    json_path, csv_path, summary_path = required_outputs(
+        config, ['theme_promotions.json', 'theme_promotions.csv', 'theme_promotions.md']
+    )
+    store = load_catalog_store(config)
+    cascade = ThemeCascade(custom=load_theme_styles(config.theme_file))
+    promotions, stats = recommend_promotions(store, cascade, load_schema_properties(config))
+    record_rows(int(stats['rows']))
+
+    write_text_if_changed(json_path, json.dumps(promotions_payload(promotions, stats), indent=2))
+    with open_output(csv_path, newline='') as handle:
+        writer = csv.DictWriter(handle, fieldnames=PROMOTION_FIELDS)
+        writer.writeheader()
+        for promotion in promotions:
+            writer.writerow({name: getattr(promotion, name) for name in PROMOTION_FIELDS})
+    write_text_if_changed(summary_path, render_promotions_markdown(promotions, stats))
+
+
+def resolve_theme_files(paths: Iterable[Path]) -> List[Path]:
+    files: List[Path] = []
+    seen: set[Path] = set()
+    for path in paths:
+        path = path.resolve()
+        candidates = sorted(path.rglob('*.json')) if path.is_dir() else [path]
+        for candidate in candidates:
+            if candidate not in seen:
+                seen.add(candidate)
+                files.append(candidate)
+    return files
+
+
+def theme_slug(theme_path: Path, repo_root: Path) -> str:
+    try:
+        relative = theme_path.relative_to(repo_root / 'themes' / 'outputs')
+    except ValueError:
+        try:
+            relative = theme_path.relative_to(repo_root)
+        except ValueError:
+            relative = Path(theme_path.name)
+    parts = [re.sub(r'[^0-9a-z]+', '_', part.lower()).strip('_') for part in relative.with_suffix('').parts]
+    return '__'.join(part for part in parts if part) or 'theme'
+
+
+def alignment_metrics(diff_records: List[Dict[str, object]]) -> Dict[str, object]:
+    """Usage-weighted alignment: catalog instances whose key the theme sets, and whose value it matches."""
+    counts = Counter(record['classification'] for record in diff_records)
+    catalog_total = 0
+    covered = 0
+    matched = 0
+    for record in diff_records:
+        catalog_count = record['catalog']['count']
+        catalog_total += catalog_count
+        if record['classification'] != 'in_both':
+            continue
+        covered += catalog_count
+        theme_values = set(record['theme']['values'])
+        matched += sum(item['count'] for item in record['catalog']['value_counts'] if item['value'] in theme_values)
+    return {
+        'keys_compared': sum(counts.values()),
+        'in_both': counts.get('in_both', 0),
+        'only_in_theme': counts.get('only_in_theme', 0),
+        'only_in_scans': counts.get('only_in_scans', 0),
+        'aligned_keys': sum(1 for record in diff_records if record['match_status'] == 'aligned'),
+        'mismatched_keys': sum(1 for record in diff_records if record['match_status'] == 'mismatch'),
+        'catalog_instances': catalog_total,
+        'coverage': round(covered / catalog_total, 4) if catalog_total else 0.0,
+        'alignment': round(matched / catalog_total, 4) if catalog_total else 0.0,
+    }
+
 
+_BATCH_INDEX: CatalogIndex | None = None
+_BATCH_PROPERTIES: SchemaPropertyIndex | None = None
+
+
+def _init_batch_worker(index: CatalogIndex, properties: SchemaPropertyIndex | None = None) -> None:
+    global _BATCH_INDEX, _BATCH_PROPERTIES
+    _BATCH_INDEX = index
+    _BATCH_PROPERTIES = properties
+
+
+def _diff_theme_task(task: Tuple[str, str, str, str]) -> Dict[str, object]:
+    theme_path, slug, label, output_dir = task
+    result: Dict[str, object] = {'theme': label, 'slug': slug}
+    try:
+        theme_data = json.loads(Path(theme_path).read_text(encoding='utf-8-sig'))
+    except (OSError, ValueError) as exc:
+        result['error'] = str(exc)
+        return result
+    if not isinstance(theme_data, dict):
+        result['error'] = 'theme root is not an object'
+        return result
+    if not isinstance(theme_data.get('visualStyles'), dict):
+        # Visual templates and other JSON under the theme folders are listed, not ranked at 0%.
+        result['skipped'] = 'no visualStyles object'
+        return result
+    diff_records = build_diff_records(flatten_theme_visual_styles(theme_data), _BATCH_INDEX, _BATCH_PROPERTIES)
+    out = Path(output_dir)
+    write_diff_files(
+        diff_records,
+        out / f'diff_{slug}_vs_catalog.json',
+        out / f'diff_{slug}_vs_catalog.csv',
+        out / f'exec_summary_{slug}.md',
+        title=f'{label} vs Catalog',
+    )
+    result.update(alignment_metrics(diff_records))
+    result['key_status'] = {
+        f"{record['display_visual_type']}.{record['attribute_key']}": (
+            record['match_status'] if record['classification'] == 'in_both' else record['classification']
+        )
+        for record in diff_records
+    }
+    return result
 
-def apply_calibri_fonts(data: object) -> List[Dict[str, str]]:
-    changes: List[Dict[str, str]] = []
 
-    def recurse(node: object, pointer_parts: List[str]) -> None:
-        if isinstance(node, dict):
-            for key, value in node.items():
-                new_pointer = pointer_parts + [key]
-                if isinstance(value, (dict, list)):
-                    recurse(value, new_pointer)
-                else:
-                    if 'font' in key.lower() and isinstance(value, str) and value != 'Calibri':
-                        node[key] = 'Calibri'
-                        changes.append(
-                            {
-                                'json_pointer': '/' + '/'.join(new_pointer),
-                                'key': key,
-                                'old_value': value,
-                                'new_value': 'Calibri',
-                                'note': 'standardized font string to Calibri',
-                            }
-                        )
-        elif isinstance(node, list):
-            for idx, item in enumerate(node):
-                recurse(item, pointer_parts + [str(idx)])
+def is_ranked(result: Dict[str, object]) -> bool:
+    return 'error' not in result and 'skipped' not in result
 
-    recurse(data, [])
-    return changes
 
+def render_alignment_matrix(results: List[Dict[str, object]]) -> str:
+    lines: List[str] = []
+    lines.append('# Theme Alignment Matrix')
+    lines.append('')
+    lines.append('Themes ranked by usage-weighted alignment: the share of catalog attribute instances whose value the theme sets identically. Coverage counts instances whose key the theme sets at all.')
+    lines.append('')
+    lines.append('| Rank | Theme | Alignment | Coverage | In both | Only in theme | Only in scans | Mismatched keys |')
+    lines.append('| ---: | --- | ---: | ---: | ---: | ---: | ---: | ---: |')
+    ranked = [result for result in results if is_ranked(result)]
+    for rank, result in enumerate(ranked, start=1):
+        lines.append(
+            f"| {rank} | {result['theme']} | {result['alignment']:.1%} | {result['coverage']:.1%} | {result['in_both']} | "
+            f"{result['only_in_theme']} | {result['only_in_scans']} | {result['mismatched_keys']} |"
+        )
+    failed = [result for result in results if 'error' in result]
+    if failed:
+        lines.append('')
+        lines.append('## Themes Not Compared')
+        lines.append('')
+        lines.extend(f"- {result['theme']}: {result['error']}" for result in failed)
+    skipped = [result for result in results if 'skipped' in result]
+    if skipped:
+        lines.append('')
+        lines.append('## Files Skipped')
+        lines.append('')
+        lines.extend(f"- {result['theme']}: {result['skipped']}" for result in skipped)
+    lines.append('')
+    return '\n'.join(lines)
 
-def flatten_for_verification(node: object) -> Dict[str, Tuple[object, bool]]:
-    results: Dict[str, Tuple[object, bool]] = {}
 
-    def recurse(current: object, pointer_parts: List[str]) -> None:
-        if isinstance(current, dict):
-            for key, value in current.items():
-                recurse(value, pointer_parts + [key])
-        elif isinstance(current, list):
-            for idx, value in enumerate(current):
-                recurse(value, pointer_parts + [str(idx)])
-        else:
-            pointer = '/' + '/'.join(pointer_parts)
-            last_key = next((part for part in reversed(pointer_parts) if not part.isdigit()), '')
-            has_font = 'font' in last_key.lower()
-            results[pointer] = (current, has_font)
+def write_alignment_matrix(results: List[Dict[str, object]], output_dir: Path) -> None:
+    metric_fields = [
+        'theme',
+        'alignment',
+        'coverage',
+        'keys_compared',
+        'in_both',
+        'only_in_theme',
+        'only_in_scans',
+        'aligned_keys',
+        'mismatched_keys',
+        'catalog_instances',
+    ]
+    ranked = [result for result in results if is_ranked(result)]
+    with open_output(output_dir / 'theme_alignment_matrix.csv', newline='') as handle:
+        writer = csv.DictWriter(handle, fieldnames=metric_fields)
+        writer.writeheader()
+        for result in ranked:
+            writer.writerow({field: result[field] for field in metric_fields})
+
+    all_keys = sorted({key for result in ranked for key in result['key_status']})
+    with open_output(output_dir / 'theme_key_matrix.csv', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(['attribute'] + [result['theme'] for result in ranked])
+        for key in all_keys:
+            writer.writerow([key] + [result['key_status'].get(key, '') for result in ranked])
+
+    write_text_if_changed(output_dir / 'theme_alignment_matrix.md', render_alignment_matrix(results))
+
+
+def batch_tasks(config: PipelineConfig, theme_paths: Iterable[Path], output_dir: Path) -> List[Tuple[str, str, str, str]]:
+    """One (theme path, unique slug, label, output folder) task per theme file."""
+    tasks: List[Tuple[str, str, str, str]] = []
+    used_slugs: Counter[str] = Counter()
+    for theme_path in resolve_theme_files(theme_paths):
+        slug = theme_slug(theme_path, config.repo_root)
+        used_slugs[slug] += 1
+        if used_slugs[slug] > 1:
+            slug = f'{slug}_{used_slugs[slug]}'
+        try:
+            label = theme_path.relative_to(config.repo_root).as_posix()
+        except ValueError:
+            label = theme_path.name
+        tasks.append((str(theme_path), slug, label, str(output_dir)))
+    return tasks
+
+
+def batch_output_paths(config: PipelineConfig, theme_paths: Iterable[Path], output_dir: Path) -> List[Path]:
+    paths = [output_dir / name for name in ('theme_alignment_matrix.csv', 'theme_key_matrix.csv', 'theme_alignment_matrix.md')]
+    for _, slug, _, _ in batch_tasks(config, theme_paths, output_dir):
+        paths += [
+            output_dir / f'diff_{slug}_vs_catalog.json',
+            output_dir / f'diff_{slug}_vs_catalog.csv',
+            output_dir / f'exec_summary_{slug}.md',
+        ]
+    return paths
+
+
+def run_batch_comparison(
+    config: PipelineConfig, theme_paths: Iterable[Path], output_dir: Path, workers: int | None = None
+) -> List[Dict[str, object]]:
+    """Diff many themes against one catalog aggregation, fanning themes out to worker processes."""
+    catalog_index = load_catalog_index(config)
+    properties = load_schema_properties(config)
+    tasks = batch_tasks(config, theme_paths, output_dir)
+
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(tasks)), initializer=_init_batch_worker, initargs=(catalog_index, properties)
+        ) as executor:
+            results = list(executor.map(_diff_theme_task, tasks))
+    else:
+        _init_batch_worker(catalog_index, properties)
+        results = [_diff_theme_task(task) for task in tasks]
 
-    recurse(node, [])
+    results.sort(key=lambda result: (-result.get('alignment', -1.0), result['theme']))
+    record_rows(len(results))
+    write_alignment_matrix(results, output_dir)
     return results
 
 
+def detect_newline_style(text: str) -> str:
+    if '\r\n' in text:
+        return '\r\n'
+    return '\n'
+
+
+def pointer_resolves(data: object, parts: Sequence[str]) -> bool:
+    node = data
+    for part in parts:
+        if isinstance(node, dict) and part in node:
+            node = node[part]
+        elif isinstance(node, list) and part.isdigit() and int(part) < len(node):
+            node = node[int(part)]
+        else:
+            return False
+    return True
+
+
+@dataclass
+class FontRewrite:
+    data: object
+    changes: List[Dict[str, str]]
+    font_total: int
+    font_violations: List[str]
+    non_font_diffs: List[str]
+    missing_pointers: List[str]
+
+
+CALIBRI_RULES = RuleSet([CALIBRI_FONT_RULE])
+
+
+def rewrite_calibri_fonts(data: object) -> FontRewrite:
+    """Enforce Calibri in one rule-engine traversal without mutating ``data``.
+
+    Verification facts (font pointer totals and violations) are recorded by a leaf observer
+    during the same walk. Untouched subtrees are shared with ``data``, so only the font leaves
+    the walk saw need resolving in the updated tree to find missing pointers, and the change
+    list alone shows whether a non-font key was altered.
+    """
+    violations: List[str] = []
+    font_leaves: List[List[str]] = []
+    font_total = 0
+
+    def observe(parts: List[str], last_key: str, value: object) -> None:
+        nonlocal font_total
+        if 'font' in last_key.lower():
+            font_total += 1
+            font_leaves.append(list(parts))
+            if isinstance(value, str) and value != 'Calibri':
+                violations.append('/' + '/'.join(parts))
+
+    result = rewrite_tree(data, CALIBRI_RULES, observer=observe)
+    changes = [{key: value for key, value in change.items() if key != 'rule'} for change in result.changes]
+    return FontRewrite(
+        data=result.data,
+        changes=changes,
+        font_total=font_total,
+        font_violations=violations,
+        non_font_diffs=[str(change['json_pointer']) for change in changes if 'font' not in str(change['key']).lower()],
+        missing_pointers=['/' + '/'.join(parts) for parts in font_leaves if not pointer_resolves(result.data, parts)],
+    )
+
+
 def run_calibri_standardization(config: PipelineConfig) -> None:
     original_text = config.theme_file.read_text(encoding='utf-8-sig')
     newline_style = detect_newline_style(original_text)
     original_data = json.loads(original_text)
-    updated_data = copy.deepcopy(original_data)
-
-    changes = apply_calibri_fonts(updated_data)
+    rewrite = rewrite_calibri_fonts(original_data)
+    updated_data = rewrite.data
+    changes = rewrite.changes
+    record_rows(len(changes))
 
     output_path = config.outputs.get('rainwater_theme_v4_1_calibri.json')
     if not output_path:
         raise ValueError('Calibri theme output path missing in prompt outputs')
-    output_path.parent.mkdir(parents=True, exist_ok=True)
 
     json_text = json.dumps(updated_data, indent=4)
     if newline_style != '\n':
         json_text = json_text.replace('\n', newline_style)
     if not json_text.endswith(newline_style):
         json_text += newline_style
-    output_path.write_text(json_text, encoding='utf-8')
+    write_text_if_changed(output_path, json_text)
 
     change_log_path = config.outputs.get('calibri_change_log.csv')
     if not change_log_path:
         raise ValueError('Change log output path missing in prompt outputs')
-    change_log_path.parent.mkdir(parents=True, exist_ok=True)
-    with change_log_path.open('w', encoding='utf-8', newline='') as handle:
+    with open_output(change_log_path, newline='') as handle:
         fieldnames = ['path', 'json_pointer', 'key', 'old_value', 'new_value', 'note']
         writer = csv.DictWriter(handle, fieldnames=fieldnames)
         writer.writeheader()
@@ -714,26 +1492,11 @@ def run_calibri_standardization(config: PipelineConfig) -> None:
     if not verification_path:
         raise ValueError('Verification report output path missing in prompt outputs')
 
-    original_flat = flatten_for_verification(original_data)
-    updated_flat = flatten_for_verification(updated_data)
-
-    non_font_diffs = []
-    font_violations = []
-    for pointer, (new_value, has_font) in updated_flat.items():
-        old_value, _ = original_flat.get(pointer, (None, has_font))
-        if has_font:
-            if isinstance(new_value, str):
-                if new_value != 'Calibri':
-                    font_violations.append(pointer)
-            else:
-                if old_value != new_value:
-                    font_violations.append(pointer)
-        else:
-            if old_value != new_value:
-                non_font_diffs.append(pointer)
-
-    missing_pointers = sorted(set(original_flat) - set(updated_flat))
-    font_total = sum(1 for _, has_font in original_flat.values() if has_font)
+    non_font_diffs = rewrite.non_font_diffs
+    font_violations = rewrite.font_violations
+    missing_pointers = rewrite.missing_pointers
+    font_total = rewrite.font_total
+    schema_errors = validate_theme(updated_data, config.schema_file, config.repo_root / DEFAULT_CACHE_DIR)
 
     lines: List[str] = []
     lines.append('# Calibri Standardization Verification')
@@ -745,12 +1508,14 @@ def run_calibri_standardization(config: PipelineConfig) -> None:
     lines.append(f'- Non-font keys altered: {len(non_font_diffs)}')
     lines.append(f'- Font verification issues: {len(font_violations)}')
     lines.append(f'- Missing pointers in updated theme: {len(missing_pointers)}')
+    lines.append(schema_summary_line(schema_errors, config.schema_file))
     lines.append('')
     lines.append('## Checks Performed')
     lines.append('')
     lines.append('- Traversed theme JSON to enforce Calibri on string values where key names include `font`.')
     lines.append('- Compared original and updated trees to ensure non-font keys remain unchanged.')
     lines.append('- Validated every font-designated pointer resolves to the string `Calibri` or retains non-string values.')
+    lines.append('- Validated the updated theme against the report theme schema with JSON Pointer-located errors.')
     lines.append('')
 
     if non_font_diffs:
@@ -780,29 +1545,194 @@ def run_calibri_standardization(config: PipelineConfig) -> None:
             lines.append(f'- ... {len(missing_pointers) - 20} additional entries truncated ...')
         lines.append('')
 
+    if schema_errors:
+        lines.extend(render_schema_section(schema_errors, heading='### Schema Errors'))
+        lines.append('')
+
     lines.append(f'Source theme: `{config.theme_file.relative_to(config.repo_root)}`')
     lines.append(f'Output theme: `{output_path.relative_to(config.repo_root)}`')
     lines.append(f'Change log: `{change_log_path.relative_to(config.repo_root)}`')
     lines.append('')
 
-    verification_path.parent.mkdir(parents=True, exist_ok=True)
-    verification_path.write_text('\n'.join(lines), encoding='utf-8')
+    write_text_if_changed(verification_path, '\n'.join(lines))
+
+
+def required_outputs(config: PipelineConfig, names: Sequence[str]) -> List[Path]:
+    paths = [config.outputs.get(name) for name in names]
+    missing = [name for name, path in zip(names, paths) if path is None]
+    if missing:
+        raise ValueError(f"Output paths missing in prompt outputs: {', '.join(missing)}")
+    return paths
+
+
+def pipeline_state_path(config: PipelineConfig) -> Path:
+    return catalog_output_paths(config)[0].with_name('pipeline_state.json')
+
+
+STAGE_OUTPUT_NAMES = {
+    'diff': ['diff_rainwater_v4_1_vs_catalog.json', 'diff_rainwater_v4_1_vs_catalog.csv', 'exec_summary_diff.md'],
+    'fonts': ['rainwater_theme_v4_1_calibri.json', 'calibri_change_log.csv', 'verification_report.md'],
+    'recommend': ['theme_promotions.json', 'theme_promotions.csv', 'theme_promotions.md'],
+}
+
+
+def stage_outputs(config: PipelineConfig, stage: str) -> List[Path]:
+    """Output paths of one stage; only that stage's outputs have to be declared in the prompt."""
+    if stage == 'ingest':
+        catalog_csv, catalog_json = catalog_output_paths(config)
+        bookmark_csv = bookmark_output_path(config)
+        return (
+            [catalog_csv, catalog_json]
+            + required_outputs(config, ['summary_visual_attributes.md'])
+            + ([bookmark_csv] if bookmark_csv else [])
+        )
+    return required_outputs(config, STAGE_OUTPUT_NAMES[stage])
+
+
+STAGE_ACTIONS = {
+    'ingest': run_ingestion,
+    'diff': run_comparison,
+    'fonts': run_calibri_standardization,
+    'recommend': run_recommendations,
+}
+
+
+def ingest_inputs(config: PipelineConfig) -> List[Path]:
+    """Files ingestion reads: every visual and bookmark under ``reportRoot``, else the catalog input CSV."""
+    if config.report_roots:
+        inputs = [path for root in find_report_roots(config.report_roots) for path in iter_visual_files(root)]
+        return inputs + bookmark_files(config.report_roots)
+    return [config.catalog_csv_input]
+
+
+def pipeline_stages(config: PipelineConfig, metrics: MetricsLog | None = None) -> List[Stage]:
+    """Model ``--task all`` as ingest -> diff and ingest -> recommend, with fonts independent of all three."""
+    metrics = metrics or MetricsLog()
+    script_dir = Path(__file__).resolve().parent
+    code = [
+        script_dir / name
+        for name in (
+            'theme_summary_comparison.py',
+            'pbir_scanner.py',
+            'theme_rules.py',
+            'theme_schema.py',
+            'theme_cascade.py',
+            'theme_recommendations.py',
+            'bookmark_scanner.py',
+        )
+    ]
+    shared = ([config.prompt_path] if config.prompt_path else []) + code
+    catalog_csv, _ = catalog_output_paths(config)
+    scan_inputs = ingest_inputs(config)
+    outputs = {name: stage_outputs(config, name) for name in STAGE_ACTIONS}
+
+    def action(name: str) -> Callable[[], object]:
+        return metrics.wrap(name, STAGE_ACTIONS[name], config, outputs=outputs[name])
+
+    return [
+        Stage(
+            name='ingest',
+            action=action('ingest'),
+            inputs=shared + scan_inputs,
+            outputs=outputs['ingest'],
+            params={'report_roots': sorted(str(path) for path in config.report_roots)},
+        ),
+        Stage(
+            name='diff',
+            action=action('diff'),
+            inputs=shared + [config.theme_file, catalog_csv, config.schema_file],
+            outputs=outputs['diff'],
+            depends=('ingest',),
+        ),
+        Stage(
+            name='recommend',
+            action=action('recommend'),
+            inputs=shared + [config.theme_file, catalog_csv, config.schema_file],
+            outputs=outputs['recommend'],
+            depends=('ingest',),
+        ),
+        Stage(
+            name='fonts',
+            action=action('fonts'),
+            inputs=shared + [config.theme_file, config.schema_file],
+            outputs=outputs['fonts'],
+        ),
+    ]
+
+
+def run_pipeline(
+    config: PipelineConfig, force: bool = False, workers: int | None = None, metrics: MetricsLog | None = None
+) -> Dict[str, str]:
+    runner = StageRunner(pipeline_stages(config, metrics), pipeline_state_path(config), config.repo_root, workers, force)
+    status = runner.run()
+    if metrics is not None:
+        metrics.collect(runner.results.values())
+    return status
 
 
 def main(argv: Sequence[str] | None = None) -> None:
     parser = argparse.ArgumentParser(description='Theme Summary Comparison pipeline helper.')
     parser.add_argument('--prompt', default='docs/prompts/theme_summary_comparison.xml', type=Path)
-    parser.add_argument('--task', choices=['ingest', 'diff', 'fonts', 'all'], default='all')
+    parser.add_argument('--task', choices=['ingest', 'diff', 'batch-diff', 'fonts', 'recommend', 'all'], default='all')
+    parser.add_argument(
+        '--scan-reports',
+        nargs='+',
+        type=Path,
+        help='PBIR report folders to scan directly instead of reading the catalogCsv scan artifact.',
+    )
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for PBIR scanning and batch diffs.')
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Stream ingestion with a bounded-memory external sort instead of loading the scan in memory.',
+    )
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_SORT_CHUNK_SIZE, help='Rows per sorted run when streaming.')
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Re-scan only report files whose content hash changed since the last scan and splice them into the catalog.',
+    )
+    parser.add_argument(
+        '--themes',
+        nargs='+',
+        type=Path,
+        help='Theme files or folders to compare with --task batch-diff (defaults to themes/outputs).',
+    )
+    parser.add_argument('--batch-output', type=Path, default=None, help='Output folder for --task batch-diff.')
+    parser.add_argument('--force', action='store_true', help='Rerun every --task all stage even when its outputs are current.')
+    add_metrics_arguments(parser)
     args = parser.parse_args(argv)
+    metrics = metrics_log_from_args(args)
 
     config = load_config(args.prompt.resolve())
-
-    if args.task in {'ingest', 'all'}:
-        run_ingestion(config)
-    if args.task in {'diff', 'all'}:
-        run_comparison(config)
-    if args.task in {'fonts', 'all'}:
-        run_calibri_standardization(config)
+    if args.scan_reports:
+        config.report_roots = [path.resolve() for path in args.scan_reports]
+    config.scan_workers = args.workers
+    config.stream_ingestion = args.stream
+    config.sort_chunk_size = args.chunk_size
+    config.incremental = args.incremental
+
+    if args.task == 'all':
+        for name, status in run_pipeline(config, force=args.force, workers=args.workers, metrics=metrics).items():
+            print(f'{name}: {status}')
+        metrics.save()
+        return
+    if args.task in STAGE_ACTIONS:
+        metrics.run(args.task, STAGE_ACTIONS[args.task], config, outputs=stage_outputs(config, args.task))
+    if args.task == 'batch-diff':
+        theme_paths = args.themes or [config.repo_root / 'themes' / 'outputs']
+        output_dir = args.batch_output or (config.repo_root / 'reports' / 'diffs' / 'batch')
+        output_dir = output_dir.resolve()
+        metrics.run(
+            'batch-diff',
+            run_batch_comparison,
+            config,
+            theme_paths,
+            output_dir,
+            args.workers,
+            outputs=batch_output_paths(config, theme_paths, output_dir) if metrics.enabled else (),
+        )
+    metrics.save()
 
 
 if __name__ == '__main__':
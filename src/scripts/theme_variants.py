@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Build table/matrix template sets for many theme families from a palette spec, one process per family."""
+
+from __future__ import annotations
+
+import argparse
+import inspect
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from build_table_matrix_templates import TemplateSpec, matrix_properties, table_properties, write_template_set
+from output_writer import write_text_if_changed
+from theme_schema import DEFAULT_CACHE_DIR, DEFAULT_SCHEMA, load_compiled_schema
+
+DEFAULT_SPEC = Path("themes/inputs/variant_specs/table_matrix_families.json")
+
+BUILDERS: Dict[str, Callable[..., Dict[str, object]]] = {
+    "pivotTable": matrix_properties,
+    "tableEx": table_properties,
+}
+
+
+@dataclass
+class FamilySpec:
+    """A resolved family: ``extends`` applied, palette names still unresolved in template styles."""
+
+    name: str
+    theme_name: str
+    font_family: str
+    palette: Dict[str, str]
+    templates: List[Dict[str, object]]
+
+    @property
+    def slug(self) -> str:
+        return re.sub(r"[^a-z0-9]+", "_", self.name.lower()).strip("_")
+
+
+@dataclass
+class VariantResult:
+    family: str
+    templates: int = 0
+    change_rows: int = 0
+    theme_path: str = ""
+    seconds: float = 0.0
+    error: str = ""
+
+
+def resolve_families(spec: Dict[str, object]) -> List[FamilySpec]:
+    """Apply ``extends``: a family inherits its parent's palette (merged), templates and font."""
+    raw = {str(family["name"]): family for family in spec.get("families", [])}
+    resolved: Dict[str, FamilySpec] = {}
+
+    def resolve(name: str, chain: Tuple[str, ...] = ()) -> FamilySpec:
+        if name in resolved:
+            return resolved[name]
+        if name in chain:
+            raise ValueError(f"Family inheritance cycle: {' -> '.join(chain + (name,))}")
+        family = raw.get(name)
+        if family is None:
+            raise ValueError(f"Unknown family in spec: {name}")
+        parent = resolve(str(family["extends"]), chain + (name,)) if family.get("extends") else None
+        resolved[name] = FamilySpec(
+            name=name,
+            theme_name=str(family.get("theme_name") or f"{name} TableMatrix Templates"),
+            font_family=str(family.get("font_family") or (parent.font_family if parent else "Calibri")),
+            palette={**(parent.palette if parent else {}), **family.get("palette", {})},
+            templates=list(family.get("templates") or (parent.templates if parent else [])),
+        )
+        return resolved[name]
+
+    return [resolve(name) for name in raw]
+
+
+def build_family_templates(family: FamilySpec) -> List[TemplateSpec]:
+    """Turn spec template entries into ``TemplateSpec`` objects, replacing palette names with colors."""
+    templates: List[TemplateSpec] = []
+    for entry in family.templates:
+        visual_type = str(entry["visual_type"])
+        builder = BUILDERS.get(visual_type)
+        if builder is None:
+            raise ValueError(f"{family.name}: no template builder for visual type {visual_type}")
+        style = {
+            key: family.palette.get(value, value) if isinstance(value, str) else value
+            for key, value in dict(entry.get("style", {})).items()
+        }
+        unknown = set(style) - set(inspect.signature(builder).parameters)
+        if unknown:
+            raise ValueError(f"{family.name}/{entry['name']}: unknown style options {', '.join(sorted(unknown))}")
+        templates.append(
+            TemplateSpec(
+                visual_type=visual_type,
+                style_variant=str(entry["style_variant"]),
+                name=str(entry["name"]),
+                description=str(entry.get("description", "")),
+                features=list(entry.get("features", [])),
+                properties=builder(name=str(entry["name"]), font_family=family.font_family, **style),
+            )
+        )
+    return templates
+
+
+def family_paths(family: FamilySpec, theme_dir: Path, report_dir: Path) -> Dict[str, Path]:
+    reports = report_dir / family.slug
+    return {
+        "manifest_json": reports / "template_manifest.json",
+        "manifest_md": reports / "template_manifest.md",
+        "template_json": theme_dir / family.slug / f"{family.slug}_table_matrix_templates.json",
+        "change_log_csv": reports / "template_changes.csv",
+        "validation_md": reports / "template_validation.md",
+    }
+
+
+def _family_task(task: Tuple[FamilySpec, str, str, str, str]) -> VariantResult:
+    family, repo_root, schema_file, theme_dir, report_dir = task
+    result = VariantResult(family=family.name)
+    started = time.perf_counter()
+    try:
+        templates = build_family_templates(family)
+        paths = family_paths(family, Path(theme_dir), Path(report_dir))
+        result.change_rows = write_template_set(
+            Path(repo_root),
+            Path(schema_file),
+            templates,
+            theme_name=family.theme_name,
+            font_family=family.font_family,
+            family=family.name,
+            **paths,
+        )
+        result.templates = len(templates)
+        result.theme_path = paths["template_json"].as_posix()
+    except (OSError, KeyError, TypeError, ValueError) as exc:
+        result.error = f"{type(exc).__name__}: {exc}"
+    result.seconds = round(time.perf_counter() - started, 3)
+    return result
+
+
+def generate_variants(
+    families: Sequence[FamilySpec],
+    repo_root: Path,
+    schema_file: Path,
+    theme_dir: Path,
+    report_dir: Path,
+    workers: int | None = None,
+) -> List[VariantResult]:
+    """Build every family's template set; families are independent, so they fan out to a process pool."""
+    # Compile the schema once up front so workers read the cache instead of racing to write it.
+    load_compiled_schema(schema_file, repo_root / DEFAULT_CACHE_DIR)
+    tasks = [(family, str(repo_root), str(schema_file), str(theme_dir), str(report_dir)) for family in families]
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            return list(executor.map(_family_task, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    return [_family_task(task) for task in tasks]
+
+
+def render_variant_summary(results: Sequence[VariantResult], spec_label: str) -> str:
+    lines: List[str] = []
+    lines.append("# Template Variant Generation")
+    lines.append("")
+    lines.append(f"Spec: `{spec_label}`")
+    lines.append("")
+    lines.append("| Family | Templates | Change Rows | Theme | Seconds |")
+    lines.append("| --- | ---: | ---: | --- | ---: |")
+    for result in results:
+        if result.error:
+            lines.append(f"| {result.family} | — | — | error: {result.error} | {result.seconds} |")
+        else:
+            lines.append(f"| {result.family} | {result.templates} | {result.change_rows} | {result.theme_path} | {result.seconds} |")
+    if not results:
+        lines.append("| — | 0 | 0 | — | 0 |")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate table/matrix template sets for every family in a palette spec.")
+    parser.add_argument("--spec", type=Path, default=DEFAULT_SPEC)
+    parser.add_argument("--repo-root", type=Path, default=Path(__file__).resolve().parents[2])
+    parser.add_argument("--schema", type=Path, default=DEFAULT_SCHEMA)
+    parser.add_argument("--family", action="append", default=[], help="Only build these families (repeatable).")
+    parser.add_argument("--theme-dir", type=Path, default=Path("themes/outputs/variants"))
+    parser.add_argument("--report-dir", type=Path, default=Path("reports/table_matrix/variants"))
+    parser.add_argument("--summary", type=Path, default=Path("reports/table_matrix/variants/variant_summary.md"))
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    families = resolve_families(json.loads(args.spec.read_text(encoding="utf-8-sig")))
+    if args.family:
+        wanted = set(args.family)
+        families = [family for family in families if family.name in wanted or family.slug in wanted]
+    results = generate_variants(
+        families, args.repo_root.resolve(), args.schema, args.theme_dir, args.report_dir, workers=args.workers
+    )
+    write_text_if_changed(args.summary, render_variant_summary(results, args.spec.as_posix()))
+    failed = sum(1 for result in results if result.error)
+    print(f"Built {len(results) - failed} of {len(results)} famil{'y' if len(results) == 1 else 'ies'}; summary written to {args.summary}")
+
+
+if __name__ == "__main__":
+    main()
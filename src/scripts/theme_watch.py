@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""Watch theme, template and catalog inputs and regenerate only the affected outputs."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import traceback
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import build_table_matrix_templates
+import integrate_table_matrix_templates
+import table_matrix_style_report
+import theme_summary_comparison as summary
+
+Stamp = Tuple[int, int]
+
+
+def file_stamp(path: Path) -> Stamp | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class WarmCache:
+    """Parsed file contents kept in memory and reloaded only when size or mtime moves."""
+
+    def __init__(self) -> None:
+        self.entries: Dict[Tuple[Path, str], Tuple[Stamp | None, object]] = {}
+
+    def get(self, path: Path, loader: Callable[[Path], object], kind: str = "") -> object:
+        stamp = file_stamp(path)
+        key = (path, kind or getattr(loader, "__name__", ""))
+        cached = self.entries.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        value = loader(path)
+        self.entries[key] = (stamp, value)
+        return value
+
+    def json(self, path: Path) -> object:
+        return self.get(path, lambda item: json.loads(item.read_text(encoding="utf-8-sig")), "json")
+
+
+@dataclass
+class WatchJob:
+    name: str
+    inputs: List[Path]
+    action: Callable[[], None]
+    warm: Callable[[], object] | None = None
+    discover: Callable[[], List[Path]] | None = None
+
+
+@dataclass
+class WatchGroup:
+    """Jobs derived from one prompt; the prompt itself is watched and rebuilds the group on change."""
+
+    prompt: Path
+    build: Callable[[Path, WarmCache], List[WatchJob]]
+    jobs: List[WatchJob]
+    stamp: Stamp | None = None
+
+
+def summary_jobs(prompt: Path, cache: WarmCache) -> List[WatchJob]:
+    config = summary.load_config(prompt)
+    catalog_csv, _ = summary.catalog_output_paths(config)
+
+    def catalog_index() -> summary.CatalogIndex:
+        return cache.get(catalog_csv, lambda _: summary.load_catalog_index(config), "catalog_index")
+
+    def diff() -> None:
+        theme_attrs = summary.flatten_theme_visual_styles(cache.json(config.theme_file))
+        records = summary.build_diff_records(theme_attrs, catalog_index(), summary.load_schema_properties(config))
+        summary.write_diff_outputs(records, config)
+
+    return [
+        WatchJob(
+            "ingest",
+            summary.ingest_inputs(config),
+            lambda: summary.run_ingestion(config),
+            discover=lambda: summary.ingest_inputs(config),
+        ),
+        WatchJob("diff", [config.theme_file, catalog_csv, config.schema_file], diff, warm=catalog_index),
+        WatchJob("fonts", [config.theme_file], lambda: summary.run_calibri_standardization(config)),
+        WatchJob(
+            "recommend",
+            [config.theme_file, catalog_csv, config.schema_file],
+            lambda: summary.run_recommendations(config),
+        ),
+    ]
+
+
+def style_report_jobs(prompt: Path, cache: WarmCache) -> List[WatchJob]:
+    config = table_matrix_style_report.load_prompt(prompt)
+
+    def catalog_rows() -> List[Dict[str, str]]:
+        return cache.get(config.catalog_json_path, table_matrix_style_report.load_catalog_rows)
+
+    def report() -> None:
+        table_matrix_style_report.generate_report(config, cache.json(config.theme_path), catalog_rows())
+
+    return [WatchJob("style-report", [config.theme_path, config.catalog_json_path], report, warm=catalog_rows)]
+
+
+def integration_jobs(prompt: Path, cache: WarmCache) -> List[WatchJob]:
+    config = integrate_table_matrix_templates.load_config(prompt)
+    return [
+        WatchJob(
+            "integration",
+            [config.base_theme, config.template_source],
+            lambda: integrate_table_matrix_templates.run_integration(config),
+        )
+    ]
+
+
+def template_jobs(prompt: Path, cache: WarmCache) -> List[WatchJob]:
+    config = build_table_matrix_templates.load_config(prompt)
+    return [WatchJob("templates", [config.schema_file], lambda: build_table_matrix_templates.run_build(config))]
+
+
+PROMPT_BUILDERS: Dict[str, Callable[[Path, WarmCache], List[WatchJob]]] = {
+    "theme_summary_comparison.xml": summary_jobs,
+    "table_matrix_style_report.xml": style_report_jobs,
+    "table_matrix_integration.xml": integration_jobs,
+    "table_matrix_template_creation.xml": template_jobs,
+}
+
+
+def log(message: str) -> None:
+    print(f"[{time.strftime('%H:%M:%S')}] {message}", flush=True)
+
+
+class Watcher:
+    """Poll job inputs and rerun only the jobs whose inputs changed.
+
+    Outputs written by one job (for example ``catalog.csv`` from ingest) are picked up as input
+    changes of downstream jobs on the next poll, so regeneration cascades without a full rerun.
+    Jobs with ``discover`` re-list their inputs on every poll, so added or deleted report files
+    count as changes too.
+    """
+
+    def __init__(self, prompts: Sequence[Path]) -> None:
+        self.cache = WarmCache()
+        self.groups: List[WatchGroup] = []
+        for prompt in prompts:
+            builder = PROMPT_BUILDERS.get(prompt.name)
+            if builder is None:
+                raise ValueError(f"No watch jobs are defined for prompt '{prompt.name}'.")
+            self.groups.append(WatchGroup(prompt=prompt, build=builder, jobs=[]))
+        self.stamps: Dict[Path, Stamp | None] = {}
+
+    def load_group(self, group: WatchGroup) -> bool:
+        group.stamp = file_stamp(group.prompt)
+        try:
+            group.jobs = group.build(group.prompt, self.cache)
+        except (OSError, ValueError, SystemExit, ET.ParseError) as exc:
+            group.jobs = []
+            log(f"{group.prompt.name}: not watched ({exc})")
+            return False
+        for job in group.jobs:
+            for path in job.inputs:
+                self.stamps[path] = file_stamp(path)
+        return True
+
+    def warm(self) -> None:
+        """Load prompts and prime the parsed theme, catalog and index caches."""
+        for group in self.groups:
+            self.load_group(group)
+            for job in group.jobs:
+                for path in job.inputs:
+                    if path.suffix == ".json" and path.exists():
+                        try:
+                            self.cache.json(path)
+                        except ValueError:
+                            pass
+                if job.warm is not None:
+                    try:
+                        job.warm()
+                    except (OSError, ValueError) as exc:
+                        log(f"{job.name}: could not prime cache ({exc})")
+
+    def refresh_inputs(self, job: WatchJob) -> bool:
+        """Re-list a discovering job's inputs; returns ``True`` when files were added or removed."""
+        if job.discover is None:
+            return False
+        try:
+            inputs = job.discover()
+        except OSError as exc:
+            log(f"{job.name}: could not list inputs ({exc})")
+            return False
+        changed = set(inputs) != set(job.inputs)
+        job.inputs = inputs
+        return changed
+
+    def poll(self) -> List[str]:
+        """Run every job with a changed input once and return the names of the jobs that ran."""
+        due: List[WatchJob] = []
+        for group in self.groups:
+            if file_stamp(group.prompt) != group.stamp:
+                if self.load_group(group):
+                    due.extend(group.jobs)
+                continue
+            for job in group.jobs:
+                if self.refresh_inputs(job) or any(file_stamp(path) != self.stamps.get(path) for path in job.inputs):
+                    due.append(job)
+        for job in due:
+            for path in job.inputs:
+                self.stamps[path] = file_stamp(path)
+        ran: List[str] = []
+        for job in due:
+            started = time.perf_counter()
+            try:
+                job.action()
+            except Exception:
+                log(f"{job.name}: failed\n{traceback.format_exc().rstrip()}")
+                continue
+            ran.append(job.name)
+            log(f"{job.name}: regenerated in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return ran
+
+    def run(self, interval: float) -> None:
+        self.warm()
+        log(f"watching {len(self.stamps)} input(s) across {len(self.groups)} prompt(s); Ctrl+C to stop")
+        try:
+            while True:
+                self.poll()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            log("stopped")
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Watch theme and template inputs and regenerate affected outputs.")
+    parser.add_argument(
+        "--prompt",
+        dest="prompts",
+        action="append",
+        type=Path,
+        help="Prompt XML to watch (repeatable). Defaults to every prompt with watch jobs in docs/prompts.",
+    )
+    parser.add_argument("--interval", type=float, default=0.25, help="Polling interval in seconds.")
+    args = parser.parse_args(argv)
+
+    prompts = args.prompts or [Path("docs/prompts") / name for name in PROMPT_BUILDERS]
+    Watcher([prompt.resolve() for prompt in prompts]).run(args.interval)
+
+
+if __name__ == "__main__":
+    main()